@@ -0,0 +1,93 @@
+"""Load test of the threaded server against the grpc.aio server for an I/O-bound handler.
+
+Both servers serve SearchDocuments with a handler that only waits on a simulated backend
+call, which is what dataset, transactions, search and user_identity spend their time on.
+
+    python benchmarks/aio_load.py [concurrency] [latency_ms]
+"""
+import os
+import sys
+import time
+import asyncio
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(root, "search"))
+sys.path.insert(0, root)
+
+import grpc
+
+from search_pb2 import SearchDocumentsRequest, SearchDocumentsResponse
+from search_pb2_grpc import (
+    SearchDocumentsServicer,
+    SearchDocumentsStub,
+    add_SearchDocumentsServicer_to_server,
+)
+
+from common.server import make_server, make_aio_server
+
+concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+
+class ThreadedSearch(SearchDocumentsServicer):
+    def simpleSearch(self, request, context):
+        time.sleep(latency)
+        return SearchDocumentsResponse(ids=["id"])
+
+
+class AsyncSearch(SearchDocumentsServicer):
+    async def simpleSearch(self, request, context):
+        await asyncio.sleep(latency)
+        return SearchDocumentsResponse(ids=["id"])
+
+
+async def load(port):
+    async with grpc.aio.insecure_channel("localhost:%d" % port) as channel:
+        stub = SearchDocumentsStub(channel)
+        request = SearchDocumentsRequest(searchTerms=["invoice"], index="documents")
+
+        async def call():
+            try:
+                await stub.simpleSearch(request, timeout=60)
+                return True
+            except grpc.RpcError:
+                return False
+
+        await call()
+        start = time.perf_counter()
+        results = await asyncio.gather(*[call() for _ in range(concurrency)])
+        return time.perf_counter() - start, sum(results)
+
+
+def run_threaded():
+    server = make_server()
+    add_SearchDocumentsServicer_to_server(ThreadedSearch(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        return asyncio.run(load(port))
+    finally:
+        server.stop(None)
+
+
+async def run_aio():
+    server = make_aio_server()
+    add_SearchDocumentsServicer_to_server(AsyncSearch(), server)
+    port = server.add_insecure_port("localhost:0")
+    await server.start()
+    try:
+        return await load(port)
+    finally:
+        await server.stop(None)
+
+
+def main():
+    print("%d concurrent calls, %d ms backend latency" % (concurrency, latency * 1000))
+    # Threaded calls beyond max_workers + queue_depth are rejected with RESOURCE_EXHAUSTED.
+    print("%-10s %10s %10s %12s" % ("server", "ok", "seconds", "calls/sec"))
+    for name, (elapsed, ok) in [("threaded", run_threaded()), ("aio", asyncio.run(run_aio()))]:
+        print("%-10s %10d %10.2f %12.0f" % (name, ok, elapsed, ok / elapsed))
+
+
+if __name__ == "__main__":
+    main()
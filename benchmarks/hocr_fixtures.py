@@ -0,0 +1,77 @@
+import os
+import sys
+import uuid
+import random
+import datetime
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(root, "ocr"))
+sys.path.insert(0, root)
+
+from bson import ObjectId
+
+
+def make_bbox(x, y, width, height):
+    return {"top_left": {"x": x, "y": y}, "bottom_right": {"x": x + width, "y": y + height}}
+
+
+def make_node(text, x, y, width, height, hocr_id):
+    return {
+        "text": text,
+        "confidence": random.uniform(0.5, 1.0),
+        "bbox": make_bbox(x, y, width, height),
+        "hocr_id": hocr_id,
+        "uuid": str(uuid.uuid4()),
+    }
+
+
+def make_document(pages=5, areas=4, paragraphs=3, lines=8, words=8):
+    """Synthetic hOCR document shaped like the documents collection, a 5-page invoice by default."""
+    document = {
+        "_id": ObjectId(),
+        "created_at": datetime.datetime.utcnow().replace(microsecond=0),
+        "updated_at": datetime.datetime.utcnow().replace(microsecond=0),
+        "src": "invoice.pdf",
+        "uuid": str(uuid.uuid4()),
+        "signature": uuid.uuid4().hex,
+        "user_id": "user@example.com",
+        "pages": [],
+    }
+    for p in range(pages):
+        page = make_node("", 0, 0, 2480, 3508, "page_%d" % p)
+        page["areas"] = []
+        for a in range(areas):
+            area = make_node("", 10, a * 800, 2400, 780, "block_%d_%d" % (p, a))
+            area["paragraphs"] = []
+            for g in range(paragraphs):
+                paragraph = make_node("", 10, a * 800 + g * 260, 2400, 250, "par_%d_%d_%d" % (p, a, g))
+                paragraph["lines"] = []
+                for l in range(lines):
+                    y = a * 800 + g * 260 + l * 30
+                    line = make_node("", 10, y, 2400, 28, "line_%d_%d_%d_%d" % (p, a, g, l))
+                    line["line_class"] = random.randint(0, 5)
+                    line["words"] = [
+                        make_node("word%d" % w, 10 + w * 120, y, 110, 28, "word_%d_%d_%d_%d_%d" % (p, a, g, l, w))
+                        for w in range(words)
+                    ]
+                    line["text"] = " ".join(word["text"] for word in line["words"])
+                    paragraph["lines"].append(line)
+                paragraph["text"] = "\n".join(line["text"] for line in paragraph["lines"])
+                area["paragraphs"].append(paragraph)
+            area["text"] = "\n\n".join(paragraph["text"] for paragraph in area["paragraphs"])
+            page["areas"].append(area)
+        page["text"] = "\n\n".join(area["text"] for area in page["areas"])
+        document["pages"].append(page)
+    return document
+
+
+def timeit(fn, repeat=20):
+    """Best-of-repeat wall time in milliseconds."""
+    import time
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
@@ -0,0 +1,72 @@
+"""Compares the compiled make_pb converter against the original recursive one on a realistic
+hOCR document (5 pages, 3840 words).
+
+    python benchmarks/make_pb.py
+"""
+import copy
+import datetime
+
+from bson import ObjectId
+
+from hocr_fixtures import make_document, timeit
+
+from dataset_pb2 import (
+    DocumentResponse,
+    PageResponse,
+    AreaResponse,
+    ParagraphResponse,
+    LineResponse,
+    WordResponse,
+    BoundingBoxResponse,
+    PointResponse,
+    MatchResponse,
+)
+from common.converters import make_pb, dt_to_pb
+
+nested_fields = {
+    "pages": PageResponse,
+    "areas": AreaResponse,
+    "paragraphs": ParagraphResponse,
+    "lines": LineResponse,
+    "words": WordResponse,
+    "matches": MatchResponse,
+}
+
+nested_field = {
+    "bbox": BoundingBoxResponse,
+    "top_left": PointResponse,
+    "bottom_right": PointResponse,
+}
+
+
+def legacy_make_pb(d, message_type):
+    for key, value in d.items():
+        if key in nested_fields:
+            d[key] = [legacy_make_pb(item, nested_fields[key]) for item in d[key]]
+        if key in nested_field:
+            d[key] = legacy_make_pb(value, nested_field[key])
+        if isinstance(value, ObjectId):
+            d[key] = str(value)
+        if isinstance(value, datetime.datetime):
+            d[key] = dt_to_pb(value)
+    return message_type(**d)
+
+
+def main():
+    document = make_document()
+    repeat = 10
+
+    # The legacy converter rewrites the document in place, so it gets a fresh copy per run.
+    copies = [copy.deepcopy(document) for _ in range(repeat)]
+    legacy = timeit(lambda: legacy_make_pb(copies.pop(), DocumentResponse), repeat)
+    compiled = timeit(lambda: make_pb(document, DocumentResponse), repeat)
+
+    assert legacy_make_pb(copy.deepcopy(document), DocumentResponse) == make_pb(document, DocumentResponse)
+    print("%-10s %10s" % ("converter", "ms"))
+    print("%-10s %10.2f" % ("legacy", legacy))
+    print("%-10s %10.2f" % ("compiled", compiled))
+    print("speedup    %9.1fx" % (legacy / compiled))
+
+
+if __name__ == "__main__":
+    main()
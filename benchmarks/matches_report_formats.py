@@ -0,0 +1,64 @@
+"""Compares the matches report formats on a synthetic report of 1M rows, encoded batch by batch
+as StreamMatchesReport does: build time and output size of each.
+
+    python benchmarks/matches_report_formats.py [rows]
+"""
+import os
+import sys
+import time
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "transactions"))
+
+import numpy
+import pandas
+
+from matches_report import report_batch_size, report_writers, iter_report
+
+qualities = numpy.array(["A", "B", "C", "D"])
+
+
+def make_batch(rows, start, random):
+    """One report batch shaped like the matches report: a row per matched invoice line."""
+    numbers = numpy.arange(start, start + rows)
+    created_at = datetime.datetime(2024, 1, 1) + pandas.to_timedelta(numbers * 7, unit="s")
+    return pandas.DataFrame(
+        {
+            "commerce_name": numpy.char.add("Commerce ", (numbers % 500).astype(str)),
+            "invoice_number": numpy.char.add("F-", numbers.astype(str)),
+            "date": created_at,
+            "client_number": numpy.char.add("C", (numbers % 20000).astype(str)),
+            "branch": numpy.char.add("Branch ", (numbers % 40).astype(str)),
+            "invoice_total": random.uniform(10, 5000, rows).round(2),
+            "iva_tax": random.uniform(0, 800, rows).round(2),
+            "line_text": numpy.char.add("Line item ", random.integers(0, 100000, rows).astype(str)),
+            "branch_quality": random.choice(qualities, rows),
+            "date_quality": random.choice(qualities, rows),
+            "invoice_total_quality": random.choice(qualities, rows),
+            "client_number_quality": random.choice(qualities, rows),
+        }
+    )
+
+
+def make_batches(rows):
+    random = numpy.random.default_rng(0)
+    return [
+        make_batch(min(report_batch_size, rows - start), start, random)
+        for start in range(0, rows, report_batch_size)
+    ]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    batches = make_batches(rows)
+    print("%d rows in %d batches" % (rows, len(batches)))
+    print("%-8s %10s %12s %12s" % ("format", "seconds", "rows/s", "MiB"))
+    for name, writer in report_writers.items():
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_report(batches, writer()))
+        seconds = time.perf_counter() - started
+        print("%-8s %10.2f %12.0f %12.1f" % (name, seconds, rows / seconds, size / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    main()
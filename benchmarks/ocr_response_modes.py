@@ -0,0 +1,35 @@
+"""Compares the JSON and structured (protobuf) response modes of TextDetector.
+
+    python benchmarks/ocr_response_modes.py
+"""
+import copy
+import json
+
+from bson import json_util
+
+from hocr_fixtures import make_document, timeit
+
+from dataset_pb2 import DocumentResponse
+from common.converters import make_pb
+
+
+def main():
+    document = make_document()
+
+    json_string = json.dumps(document, default=json_util.default)
+    json_payload = json_string.encode("utf-8")
+    json_encode = timeit(lambda: json.dumps(document, default=json_util.default).encode("utf-8"))
+    json_decode = timeit(lambda: json.loads(json_payload.decode("utf-8")))
+
+    pb_payload = make_pb(copy.deepcopy(document), DocumentResponse).SerializeToString()
+    copies = [copy.deepcopy(document) for _ in range(20)]
+    pb_encode = timeit(lambda: make_pb(copies.pop(), DocumentResponse).SerializeToString())
+    pb_decode = timeit(lambda: DocumentResponse.FromString(pb_payload))
+
+    print("%-12s %12s %12s %12s" % ("mode", "bytes", "encode ms", "decode ms"))
+    print("%-12s %12d %12.2f %12.2f" % ("json", len(json_payload), json_encode, json_decode))
+    print("%-12s %12d %12.2f %12.2f" % ("structured", len(pb_payload), pb_encode, pb_decode))
+
+
+if __name__ == "__main__":
+    main()
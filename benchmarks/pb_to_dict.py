@@ -0,0 +1,73 @@
+"""Compares the client side decoders on a realistic hOCR document (5 pages, 3840 words): the
+original recursive pb_to_dict, the plan based one, and the lazy view when a caller reads a
+single line. Peak allocations are measured with tracemalloc.
+
+    python benchmarks/pb_to_dict.py
+"""
+import tracemalloc
+
+from bson import ObjectId
+
+from hocr_fixtures import make_document, timeit
+
+from dataset_pb2 import DocumentResponse
+from common.converters import make_pb
+from common.decoders import decode, MessageView
+
+nested_fields = {"pages", "areas", "paragraphs", "lines", "words", "matches"}
+nested_field = {"bbox", "top_left", "bottom_right"}
+
+
+def legacy_pb_to_dict(pb):
+    d = {}
+    for descriptor, value in pb.ListFields():
+        d[descriptor.name] = legacy_deserialize(descriptor, value)
+    return d
+
+
+def legacy_deserialize(descriptor, value):
+    if descriptor.name in nested_fields:
+        return [legacy_pb_to_dict(v) for v in value]
+    if descriptor.name in nested_field:
+        return legacy_pb_to_dict(value)
+    if descriptor.name == "_id":
+        return ObjectId(value)
+    if descriptor.name in ["created_at", "updated_at"]:
+        return value.ToDatetime()
+    if descriptor.name in ["verified", "matches"]:
+        return {k: v for k, v in value.items()}
+    return value
+
+
+def read_one_line(pb):
+    return MessageView(pb)["pages"][2]["areas"][1]["paragraphs"][0]["lines"][3]["text"]
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    pb = make_pb(make_document(), DocumentResponse)
+    repeat = 10
+
+    assert legacy_pb_to_dict(pb) == decode(pb) == MessageView(pb)
+    assert read_one_line(pb) == pb.pages[2].areas[1].paragraphs[0].lines[3].text
+
+    decoders = [
+        ("legacy", lambda: legacy_pb_to_dict(pb)),
+        ("plan", lambda: decode(pb)),
+        ("view", lambda: read_one_line(pb)),
+    ]
+    results = [(name, timeit(fn, repeat), peak_kib(fn)) for name, fn in decoders]
+    print("%-10s %10s %12s" % ("decoder", "ms", "peak KiB"))
+    for name, ms, kib in results:
+        print("%-10s %10.2f %12.1f" % (name, ms, kib))
+
+
+if __name__ == "__main__":
+    main()
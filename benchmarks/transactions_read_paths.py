@@ -0,0 +1,107 @@
+"""Compares rows/s of the transactions read paths over a loopback channel: one JSON string per
+transaction (GetAllTransactions) against typed TransactionMessages sent in batches
+(GetAllTransactionBatches), each encoded the way the server does and decoded the way the client
+does. Also reports how long the first row takes to arrive.
+
+    PYTHONPATH=<generated transactions_pb2>:<dir holding service.common> python benchmarks/transactions_read_paths.py [rows]
+"""
+import os
+import sys
+import json
+import time
+import random
+import datetime
+from concurrent import futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "transactions"))
+
+import grpc
+from bson import ObjectId
+
+from service.common.decoders import decode
+from transaction_json import field_plan, transaction_json
+from transaction_messages import transaction_batch, batches
+from transactions_pb2 import JSONResponse, GetAllTransactionsRequest
+from transactions_pb2_grpc import TransactionsServicer, TransactionsStub, add_TransactionsServicer_to_server
+
+fields = [
+    "commerce_name",
+    "invoice_number",
+    "date",
+    "client_number",
+    "branch",
+    "total_sale",
+    "iva_tax",
+    "matches",
+]
+
+
+def make_transactions(rows):
+    rand = random.Random(0)
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "created_at": start + datetime.timedelta(seconds=7 * i),
+            "commerce_name": "Commerce %d" % (i % 500),
+            "invoice_number": "F-%d" % i,
+            "date": start + datetime.timedelta(days=i % 365),
+            "client_number": "C%d" % (i % 20000),
+            "branch": "Branch %d" % (i % 40),
+            "total_sale": round(rand.uniform(10, 5000), 2),
+            "iva_tax": round(rand.uniform(0, 800), 2),
+            "matches": [{"document": str(ObjectId()), "line_qualities": {"branch": "A", "date": "B"}}],
+        }
+        for i in range(rows)
+    ]
+
+
+class Transactions(TransactionsServicer):
+    def __init__(self, transactions):
+        self._transactions = transactions
+
+    def GetAllTransactions(self, request, context):
+        plan = field_plan(fields, frozenset(fields))
+        for transaction in self._transactions:
+            yield JSONResponse(jsonString=transaction_json(transaction, plan))
+
+    def GetAllTransactionBatches(self, request, context):
+        for transactions in batches(self._transactions, request.batchSize):
+            yield transaction_batch(transactions, fields)
+
+
+def read_json(stub):
+    for resp in stub.GetAllTransactions(GetAllTransactionsRequest()):
+        yield json.loads(resp.jsonString)
+
+
+def read_batches(stub, batch_size):
+    for resp in stub.GetAllTransactionBatches(GetAllTransactionsRequest(batchSize=batch_size)):
+        for transaction in resp.transactions:
+            yield decode(transaction)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    server = grpc.server(futures.ThreadPoolExecutor(2))
+    add_TransactionsServicer_to_server(Transactions(make_transactions(rows)), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    stub = TransactionsStub(grpc.insecure_channel("127.0.0.1:%d" % port))
+    print("%d rows" % rows)
+    print("%-14s %10s %12s %14s" % ("path", "seconds", "rows/s", "first row ms"))
+    paths = [("json", lambda: read_json(stub))]
+    paths += [("batch %d" % size, lambda size=size: read_batches(stub, size)) for size in (100, 500, 2000)]
+    for name, read in paths:
+        started = time.perf_counter()
+        transactions = read()
+        next(transactions)
+        first = time.perf_counter() - started
+        assert sum(1 for _ in transactions) + 1 == rows
+        seconds = time.perf_counter() - started
+        print("%-14s %10.2f %12.0f %14.1f" % (name, seconds, rows / seconds, first * 1000))
+    server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
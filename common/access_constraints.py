@@ -0,0 +1,156 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+from logging import warning
+
+ttl = float(os.environ.get("ACCESS_CONSTRAINT_TTL", 30))
+stale_ttl = float(os.environ.get("ACCESS_CONSTRAINT_STALE_TTL", 300))
+max_size = int(os.environ.get("ACCESS_CONSTRAINT_CACHE_SIZE", 10000))
+
+
+class AccessConstraintCache:
+    """Caches each user's branch office associate list.
+
+    Fresh entries (younger than ttl) are served as is. Stale entries (up to ttl + stale_ttl)
+    are served while a single background refresh runs. Concurrent misses for the same user
+    share one lookup. invalidate drops entries and discards lookups already in flight, so a
+    membership change is never overwritten by an older answer."""
+
+    def __init__(self, ttl=ttl, stale_ttl=stale_ttl, max_size=max_size):
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._refresher = futures.ThreadPoolExecutor(max_workers=2)
+
+    def get(self, user_id, loader):
+        """loader(user_id) is the blocking lookup, e.g. the sync identity client."""
+        value, refresh = self._lookup(user_id)
+        if value is not None:
+            if refresh:
+                self._refresher.submit(self._load, user_id, loader)
+            return value
+        return self._load(user_id, loader)
+
+    async def get_async(self, user_id, loader):
+        """loader(user_id) is a coroutine, e.g. the grpc.aio identity client."""
+        value, refresh = self._lookup(user_id)
+        if value is not None:
+            if refresh:
+                asyncio.get_running_loop().create_task(self._refresh_async(user_id, loader))
+            return value
+        return await self._load_async(user_id, loader)
+
+    def invalidate(self, user_ids=None):
+        """Drops the given users, or every entry when user_ids is empty."""
+        with self._lock:
+            self._generation += 1
+            self._in_flight.clear()
+            if not user_ids:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            count = 0
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    count += 1
+            return count
+
+    def _lookup(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None, False
+            value, loaded_at = entry
+            age = time.monotonic() - loaded_at
+            if age < self._ttl:
+                self._entries.move_to_end(user_id)
+                return value, False
+            if age < self._ttl + self._stale_ttl:
+                return value, user_id not in self._in_flight
+            return None, False
+
+    def _claim(self, user_id, future):
+        """Returns (future, generation, owner). Only the owner runs the lookup."""
+        with self._lock:
+            existing = self._in_flight.get(user_id)
+            if existing is not None:
+                return existing, self._generation, False
+            self._in_flight[user_id] = future
+            return future, self._generation, True
+
+    def _store(self, user_id, future, generation, value):
+        with self._lock:
+            if self._in_flight.get(user_id) is future:
+                del self._in_flight[user_id]
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (value, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def _release(self, user_id, future):
+        with self._lock:
+            if self._in_flight.get(user_id) is future:
+                del self._in_flight[user_id]
+
+    def _load(self, user_id, loader):
+        future, generation, owner = self._claim(user_id, futures.Future())
+        if not owner:
+            return future.result() if isinstance(future, futures.Future) else loader(user_id)
+        try:
+            value = loader(user_id)
+        except BaseException as e:
+            self._release(user_id, future)
+            future.set_exception(e)
+            warning(e)
+            raise
+        self._store(user_id, future, generation, value)
+        future.set_result(value)
+        return value
+
+    async def _load_async(self, user_id, loader):
+        future, generation, owner = self._claim(user_id, asyncio.get_running_loop().create_future())
+        if not owner:
+            try:
+                if isinstance(future, asyncio.Future):
+                    return await asyncio.shield(future)
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # The owner was cancelled rather than us: look the user up again.
+                if future.cancelled():
+                    return await self._load_async(user_id, loader)
+                raise
+        try:
+            value = await loader(user_id)
+        except BaseException as e:
+            # Cancellation and deadlines too, or the claim would never be released.
+            self._release(user_id, future)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Nobody may be waiting on the shared future; don't log it as never retrieved.
+                future.exception()
+                warning(e)
+            raise
+        self._store(user_id, future, generation, value)
+        future.set_result(value)
+        return value
+
+    async def _refresh_async(self, user_id, loader):
+        try:
+            await self._load_async(user_id, loader)
+        except Exception:
+            pass
+
+
+access_constraint_cache = AccessConstraintCache()
@@ -0,0 +1,34 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+def make_async_db(config):
+    """Motor counterpart of database.mongo.make_db. Takes the same config entry: a mongodb://
+    URI carrying the database name, or a dict with "uri" (or "host"/"port") and "database"."""
+    if isinstance(config, str):
+        client = AsyncIOMotorClient(config)
+        return client.get_default_database()
+    if config.get("uri"):
+        client = AsyncIOMotorClient(config["uri"])
+    else:
+        client = AsyncIOMotorClient(config.get("host", "localhost"), int(config.get("port", 27017)))
+    name = config.get("database") or config.get("db")
+    return client[name] if name else client.get_default_database()
+
+
+class AsyncMongoDAO:
+    """Mirrors models.interface.mongodao.MongoDAO on a motor collection."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def get_first(self, filters=None, projection=None):
+        return await self._collection.find_one(filters or {}, projection)
+
+    def get_many_by(self, filters=None, skip=0, limit=0, sort_by=None, projection=None):
+        cursor = self._collection.find(filters or {}, projection, skip=skip, limit=limit)
+        if sort_by:
+            cursor = cursor.sort(sort_by)
+        return cursor
+
+    async def count(self, filters=None):
+        return await self._collection.count_documents(filters or {})
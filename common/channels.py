@@ -0,0 +1,159 @@
+import os
+import json
+import socket
+import atexit
+import weakref
+import asyncio
+import itertools
+import threading
+
+import grpc
+
+from logging import warning
+
+pool_size = int(os.environ.get("GRPC_CHANNEL_POOL_SIZE", 1))
+keepalive_time_ms = int(os.environ.get("GRPC_KEEPALIVE_TIME_MS", 30000))
+keepalive_timeout_ms = int(os.environ.get("GRPC_KEEPALIVE_TIMEOUT_MS", 10000))
+lb_policy = os.environ.get("GRPC_LB_POLICY", "round_robin")
+retry_max_attempts = int(os.environ.get("GRPC_RETRY_MAX_ATTEMPTS", 3))
+broadcast_timeout = float(os.environ.get("GRPC_BROADCAST_TIMEOUT", 5))
+
+
+def channel_options():
+    service_config = {
+        "loadBalancingConfig": [{lb_policy: {}}],
+        "methodConfig": [
+            {
+                "name": [{}],
+                "retryPolicy": {
+                    "maxAttempts": retry_max_attempts,
+                    "initialBackoff": "0.1s",
+                    "maxBackoff": "1s",
+                    "backoffMultiplier": 2,
+                    "retryableStatusCodes": ["UNAVAILABLE"],
+                },
+            }
+        ],
+    }
+    return [
+        ("grpc.keepalive_time_ms", keepalive_time_ms),
+        ("grpc.keepalive_timeout_ms", keepalive_timeout_ms),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.enable_retries", 1),
+        ("grpc.service_config", json.dumps(service_config)),
+        # Each pooled channel keeps its own connections instead of sharing the global pool.
+        ("grpc.use_local_subchannel_pool", 1),
+    ]
+
+
+def resolve_target(target):
+    """Resolves through DNS so round_robin can spread calls over every replica behind a name."""
+    if "://" in target or target.startswith(("dns:", "unix:", "ipv4:", "ipv6:")):
+        return target
+    return "dns:///" + target
+
+
+def replica_targets(target):
+    """One target per address host:port resolves to. Behind a DNS name with a record per replica
+    (a compose service, a Kubernetes headless service) that is one per replica; a name that can't
+    be resolved is returned as is."""
+    host, _, port = target.rpartition(":")
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        warning(e)
+        return [target]
+    targets = []
+    for family, _, _, _, address in infos:
+        if family == socket.AF_INET6:
+            replica = "ipv6:[%s]:%s" % (address[0], port)
+        else:
+            replica = "ipv4:%s:%s" % (address[0], port)
+        if replica not in targets:
+            targets.append(replica)
+    return targets
+
+
+def broadcast(target, call):
+    """Runs call(channel) against every replica of target, for the calls each replica has to get
+    (cache invalidation) rather than whichever one round_robin picks. Channels are short-lived
+    and direct. Returns the results; once every replica was tried, re-raises the last failure."""
+    results, error = [], None
+    for replica in replica_targets(target):
+        with grpc.insecure_channel(replica) as channel:
+            try:
+                results.append(call(channel))
+            except grpc.RpcError as e:
+                warning("%s: %s" % (replica, e))
+                error = e
+    if error is not None:
+        raise error
+    return results
+
+
+class ChannelPool:
+    """A fixed set of channels to one target, handed out in turn."""
+
+    def __init__(self, target, size, factory):
+        self.channels = [factory(resolve_target(target), options=channel_options()) for _ in range(size)]
+        self._next = itertools.cycle(self.channels)
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            return next(self._next)
+
+
+_pools = {}
+# Event loop -> {target: pool}.
+_aio_pools = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_channel(target):
+    """Returns a process-wide shared channel to target. Channels are owned by the registry:
+    callers must not close them, use close_channels at shutdown instead."""
+    with _lock:
+        pool = _pools.get(target)
+        if pool is None:
+            pool = _pools[target] = ChannelPool(target, pool_size, grpc.insecure_channel)
+    return pool.get()
+
+
+def get_aio_channel(target):
+    """grpc.aio counterpart of get_channel. aio channels are bound to an event loop, so the
+    registry keeps one pool per loop: the running one, or the one a channel built outside a
+    loop would use. Pools of loops that have been closed are dropped."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = asyncio.get_event_loop()
+    with _lock:
+        for closed in [other for other in _aio_pools if other.is_closed()]:
+            del _aio_pools[closed]
+        pools = _aio_pools.setdefault(loop, {})
+        pool = pools.get(target)
+        if pool is None:
+            pool = pools[target] = ChannelPool(target, pool_size, grpc.aio.insecure_channel)
+    return pool.get()
+
+
+def close_channels():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        for channel in pool.channels:
+            channel.close()
+
+
+async def close_aio_channels():
+    with _lock:
+        pools = _aio_pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        for channel in pool.channels:
+            await channel.close()
+
+
+atexit.register(close_channels)
@@ -0,0 +1,155 @@
+import threading
+import datetime
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+from google.protobuf.timestamp_pb2 import Timestamp
+
+# Conversion plans, compiled once per message type from its descriptor: field name -> setter.
+_plans = {}
+_lock = threading.Lock()
+
+
+def dt_to_pb(dt):
+    pb = Timestamp()
+    pb.FromDatetime(dt)
+    return pb
+
+
+def _set_timestamp(name):
+    def setter(pb, value):
+        if isinstance(value, datetime.datetime):
+            getattr(pb, name).FromDatetime(value)
+        else:
+            getattr(pb, name).CopyFrom(value)
+
+    return setter
+
+
+def _set_struct(name):
+    def setter(pb, value):
+        if isinstance(value, Message):
+            getattr(pb, name).CopyFrom(value)
+        else:
+            getattr(pb, name).update(value)
+
+    return setter
+
+
+def _set_repeated_struct(name):
+    def setter(pb, values):
+        add = getattr(pb, name).add
+        for value in values:
+            if isinstance(value, Message):
+                add().CopyFrom(value)
+            else:
+                add().update(value)
+
+    return setter
+
+
+def _set_message(name, plan):
+    def setter(pb, value):
+        nested = getattr(pb, name)
+        if isinstance(value, Message):
+            nested.CopyFrom(value)
+            return
+        nested.SetInParent()
+        _fill(nested, value, plan)
+
+    return setter
+
+
+def _set_repeated_message(name, plan):
+    def setter(pb, values):
+        add = getattr(pb, name).add
+        for value in values:
+            if isinstance(value, Message):
+                add().CopyFrom(value)
+            else:
+                _fill(add(), value, plan)
+
+    return setter
+
+
+def _set_repeated_scalar(name):
+    def setter(pb, values):
+        getattr(pb, name).extend(values)
+
+    return setter
+
+
+def _set_string(name):
+    # Mongo ids and the like are sent as their string form.
+    def setter(pb, value):
+        setattr(pb, name, value if type(value) is str else str(value))
+
+    return setter
+
+
+def _set_scalar(name):
+    def setter(pb, value):
+        setattr(pb, name, value)
+
+    return setter
+
+
+def _compile_field(field, compiled):
+    name = field.name
+    repeated = field.label == FieldDescriptor.LABEL_REPEATED
+    if field.message_type is not None:
+        full_name = field.message_type.full_name
+        if full_name == "google.protobuf.Timestamp" and not repeated:
+            return _set_timestamp(name)
+        if full_name == "google.protobuf.Struct":
+            return _set_repeated_struct(name) if repeated else _set_struct(name)
+        plan = _compile(field.message_type, compiled)
+        if repeated:
+            return _set_repeated_message(name, plan)
+        return _set_message(name, plan)
+    if repeated:
+        return _set_repeated_scalar(name)
+    if field.type == FieldDescriptor.TYPE_STRING:
+        return _set_string(name)
+    return _set_scalar(name)
+
+
+def compile_plan(descriptor):
+    plan = _plans.get(descriptor.full_name)
+    if plan is None:
+        with _lock:
+            plan = _plans.get(descriptor.full_name)
+            if plan is None:
+                compiled = {}
+                plan = _compile(descriptor, compiled)
+                _plans.update(compiled)
+    return plan
+
+
+def _compile(descriptor, compiled):
+    # Plans are published once every nested one is complete; a recursive type meets its own
+    # plan, still being filled, in compiled.
+    plan = compiled.get(descriptor.full_name, _plans.get(descriptor.full_name))
+    if plan is None:
+        plan = compiled[descriptor.full_name] = {}
+        for field in descriptor.fields:
+            plan[field.name] = _compile_field(field, compiled)
+    return plan
+
+
+def _fill(pb, d, plan):
+    for key, value in d.items():
+        if value is None:
+            continue
+        setter = plan.get(key)
+        if setter:
+            setter(pb, value)
+
+
+def make_pb(d, message_type, special_cases_handler=None):
+    """Builds message_type from a Mongo document. Keys without a matching field are ignored."""
+    if special_cases_handler:
+        d = special_cases_handler(d, message_type)
+    pb = message_type()
+    _fill(pb, d, compile_plan(message_type.DESCRIPTOR))
+    return pb
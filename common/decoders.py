@@ -0,0 +1,164 @@
+import threading
+from collections.abc import Mapping, Sequence
+
+from bson import ObjectId
+from google.protobuf.descriptor import FieldDescriptor
+
+# Decoding plans, compiled once per message type from its descriptor: field name -> converter.
+# A converter of None means the value is used as is.
+_plans = {}
+_lock = threading.Lock()
+
+
+def _to_datetime(value):
+    return value.ToDatetime()
+
+
+def _struct_to_dict(value):
+    return {k: _value_to_python(v) for k, v in value.fields.items()}
+
+
+def _value_to_python(value):
+    kind = value.WhichOneof("kind")
+    if kind == "struct_value":
+        return _struct_to_dict(value.struct_value)
+    if kind == "list_value":
+        return [_value_to_python(v) for v in value.list_value.values]
+    if kind == "null_value":
+        return None
+    return getattr(value, kind)
+
+
+def _compile_field(field, compiled):
+    if field.name == "_id":
+        return ObjectId
+    if field.message_type is None:
+        return None
+    full_name = field.message_type.full_name
+    if full_name == "google.protobuf.Timestamp":
+        return _to_datetime
+    if full_name == "google.protobuf.Struct":
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            return lambda values: [_struct_to_dict(value) for value in values]
+        return _struct_to_dict
+    plan = _compile(field.message_type, compiled)
+    if field.label == FieldDescriptor.LABEL_REPEATED:
+        return lambda values: [_decode(value, plan) for value in values]
+    return lambda value: _decode(value, plan)
+
+
+def compile_plan(descriptor):
+    plan = _plans.get(descriptor.full_name)
+    if plan is None:
+        with _lock:
+            plan = _plans.get(descriptor.full_name)
+            if plan is None:
+                compiled = {}
+                plan = _compile(descriptor, compiled)
+                _plans.update(compiled)
+    return plan
+
+
+def _compile(descriptor, compiled):
+    # Plans are published once every nested one is complete; a recursive type meets its own
+    # plan, still being filled, in compiled.
+    plan = compiled.get(descriptor.full_name, _plans.get(descriptor.full_name))
+    if plan is None:
+        plan = compiled[descriptor.full_name] = {}
+        for field in descriptor.fields:
+            plan[field.name] = _compile_field(field, compiled)
+    return plan
+
+
+def _decode(pb, plan):
+    d = {}
+    for field, value in pb.ListFields():
+        converter = plan[field.name]
+        d[field.name] = converter(value) if converter else value
+    return d
+
+
+def decode(pb):
+    """Only set fields are included, as with ListFields. _id becomes an ObjectId, timestamps
+    datetimes and Structs dicts."""
+    return _decode(pb, compile_plan(pb.DESCRIPTOR))
+
+
+class MessageView(Mapping):
+    """Read-only mapping over a message with the same keys and values as decode(pb). Nested
+    levels are only decoded when accessed, then kept."""
+
+    __slots__ = ("_pb", "_fields", "_cache")
+
+    def __init__(self, pb):
+        self._pb = pb
+        self._fields = None
+        self._cache = {}
+
+    @property
+    def message(self):
+        return self._pb
+
+    def _set_fields(self):
+        if self._fields is None:
+            self._fields = {field.name: field for field, _ in self._pb.ListFields()}
+        return self._fields
+
+    def __getitem__(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        field = self._set_fields()[key]
+        value = getattr(self._pb, key)
+        if field.message_type is not None and field.message_type.full_name not in (
+            "google.protobuf.Timestamp",
+            "google.protobuf.Struct",
+        ):
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                value = RepeatedView(value)
+            else:
+                value = MessageView(value)
+        else:
+            converter = compile_plan(self._pb.DESCRIPTOR)[key]
+            if converter:
+                value = converter(value)
+        self._cache[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._set_fields())
+
+    def __len__(self):
+        return len(self._set_fields())
+
+    def __repr__(self):
+        return "MessageView(%r)" % dict(self)
+
+
+class RepeatedView(Sequence):
+    """Read-only sequence of MessageView over a repeated message field."""
+
+    __slots__ = ("_values", "_cache")
+
+    def __init__(self, values):
+        self._values = values
+        self._cache = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._values)
+        if index not in self._cache:
+            self._cache[index] = MessageView(self._values[index])
+        return self._cache[index]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return "RepeatedView(%r)" % list(self)
@@ -0,0 +1,33 @@
+# Metric RPCs count the documents of a created_at range under a few conditions. They do it in
+# a single aggregation pass: one $match on the range, then one conditional sum per counter.
+
+# Serves the per-user range scans of the metrics and, with _id as tie breaker, the keyset
+# pagination of the listings.
+user_created_at_index = [("user_id", 1), ("created_at", 1), ("_id", 1)]
+
+# Same documents as the query {"matches": {"$not": {"$size": 0}}}.
+matched = {"$ne": [{"$ifNull": ["$matches", None]}, []]}
+
+
+def any_in(path, values):
+    """True when any value under path (arrays are traversed, as in queries) is one of values."""
+    found = {"$filter": {"input": {"$ifNull": [path, []]}, "as": "value", "cond": {"$in": ["$$value", values]}}}
+    return {"$gt": [{"$size": found}, 0]}
+
+
+def counter_sums(counters):
+    """counters maps each output name to an aggregation condition, or True to count all."""
+    return {
+        name: {"$sum": 1 if condition is True else {"$cond": [condition, 1, 0]}}
+        for name, condition in counters.items()
+    }
+
+
+def metrics_pipeline(filters, counters):
+    return [{"$match": filters}, {"$group": dict(counter_sums(counters), _id=None)}]
+
+
+def read_metrics(results, counters):
+    """The counters out of the pipeline results; an empty range gives zeros."""
+    result = next(iter(results), None) or {}
+    return {name: result.get(name, 0) for name in counters}
@@ -0,0 +1,49 @@
+import base64
+
+from bson import json_util
+
+# Listings are ordered by (created_at, _id). A full page ends with an opaque token holding the
+# key of its last document, sent in the trailing metadata; passing it back resumes right after
+# that document through the index instead of skipping over everything before it.
+page_token_key = "next-page-token"
+sort_keys = [("created_at", 1), ("_id", 1)]
+# Serves the listings of root callers, whose filter has no user_id for
+# metrics.user_created_at_index to start with.
+sort_index = sort_keys
+
+
+def encode_page_token(document):
+    key = json_util.dumps([document.get("created_at"), document["_id"]])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def after_page_token(filters, token):
+    """Restricts filters to the documents after token. Raises ValueError on a malformed token."""
+    if not token:
+        return filters
+    try:
+        created_at, _id = json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page token")
+    after = {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": _id}},
+        ]
+    }
+    return {"$and": [filters, after]} if filters else after
+
+
+def trailing_page_token(last, count, limit):
+    """Trailing metadata for a page of count documents ending with last: a token when the page
+    is full, nothing once the listing is exhausted."""
+    if not limit or count < limit:
+        return ()
+    return ((page_token_key, encode_page_token(last)),)
+
+
+def next_page_token(trailing_metadata):
+    for key, value in trailing_metadata or ():
+        if key == page_token_key:
+            return value
+    return None
@@ -0,0 +1,195 @@
+import os
+import sys
+import datetime
+
+from logging import warning
+
+from service.common.metrics import counter_sums, metrics_pipeline, read_metrics
+
+# When set, metric RPCs read the rollups instead of scanning the whole range. The rollups
+# must then be kept current by the watch job (see run_job).
+rollups_enabled = os.environ.get("METRICS_ROLLUPS", "0") == "1"
+
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# A rollup document holds the counters of one user's documents created in [start, start + unit).
+bucket_index = [("unit", 1), ("user_id", 1), ("start", 1)]
+
+
+def floor_to(dt, unit):
+    return EPOCH + (dt - EPOCH) // unit * unit
+
+
+def ceil_to(dt, unit):
+    floor = floor_to(dt, unit)
+    return floor if floor == dt else floor + unit
+
+
+def bucket_start(field, unit):
+    """Aggregation expression truncating the date in field to its bucket."""
+    ms = int(unit.total_seconds() * 1000)
+    return {"$subtract": [field, {"$mod": [{"$toLong": field}, ms]}]}
+
+
+def split_range(start, end):
+    """Splits [start, end] into the half-open ranges read raw (the partial hours at the edges),
+    from hour buckets and from day buckets."""
+    # Mongo dates have millisecond precision, so $lte end is $lt end + 1ms.
+    end = end + datetime.timedelta(milliseconds=1)
+    first_hour, last_hour = ceil_to(start, HOUR), floor_to(end, HOUR)
+    if first_hour >= last_hour:
+        return [(start, end)], [], []
+    first_day, last_day = ceil_to(first_hour, DAY), floor_to(last_hour, DAY)
+    raw = [(start, first_hour), (last_hour, end)]
+    if first_day < last_day:
+        hours = [(first_hour, first_day), (last_day, last_hour)]
+        days = [(first_day, last_day)]
+    else:
+        hours = [(first_hour, last_hour)]
+        days = []
+    return [r for r in raw if r[0] < r[1]], [r for r in hours if r[0] < r[1]], days
+
+
+def raw_pipeline(filters, ranges, counters):
+    filters = dict(filters, **{"$or": [{"created_at": {"$gte": a, "$lt": b}} for a, b in ranges]})
+    return metrics_pipeline(filters, counters)
+
+
+def bucket_pipeline(filters, hours, days, counters):
+    ranges = [{"unit": "hour", "start": {"$gte": a, "$lt": b}} for a, b in hours]
+    ranges += [{"unit": "day", "start": {"$gte": a, "$lt": b}} for a, b in days]
+    group = {name: {"$sum": "$" + name} for name in counters}
+    return [{"$match": dict(filters, **{"$or": ranges})}, {"$group": dict(group, _id=None)}]
+
+
+def add_metrics(*metrics):
+    return {name: sum(m[name] for m in metrics) for name in metrics[0]}
+
+
+class MetricsRollup:
+    """Per user hour and day counters of a collection, kept next to it in rollup_collection.
+
+    metrics answers a range from the buckets it fully covers and only scans raw documents in
+    the partial hours at its edges, so its cost doesn't grow with the range. Buckets are
+    recomputed from their raw documents whenever one of them is written (refresh, watch), and
+    built for existing data by backfill. Deleted documents only leave their bucket on the next
+    backfill of its range."""
+
+    def __init__(self, collection, rollup_collection, counters):
+        self._collection = collection
+        self._rollups = rollup_collection
+        self._counters = counters
+
+    def ensure_indexes(self):
+        self._rollups.create_index(bucket_index, unique=True)
+
+    def metrics(self, filters, start, end):
+        """filters may only constrain user_id, as the access constraints do."""
+        raw, hours, days = split_range(start, end)
+        results = []
+        if raw:
+            results.append(self._collection.aggregate(raw_pipeline(filters, raw, self._counters)))
+        if hours or days:
+            buckets = bucket_pipeline(filters, hours, days, self._counters)
+            results.append(self._rollups.aggregate(buckets))
+        return add_metrics(*[read_metrics(r, self._counters) for r in results])
+
+    def refresh(self, user_id, created_at):
+        """Recomputes the hour and day buckets holding a document of user_id created at created_at."""
+        hour = floor_to(created_at, HOUR)
+        filters = {"user_id": user_id, "created_at": {"$gte": hour, "$lt": hour + HOUR}}
+        counts = self._collection.aggregate(metrics_pipeline(filters, self._counters))
+        self._store("hour", user_id, hour, read_metrics(counts, self._counters))
+
+        day = floor_to(created_at, DAY)
+        hours = self._rollups.aggregate(
+            bucket_pipeline({"user_id": user_id}, [(day, day + DAY)], [], self._counters)
+        )
+        self._store("day", user_id, day, read_metrics(hours, self._counters))
+
+    def refresh_document(self, document):
+        if document.get("created_at"):
+            self.refresh(document.get("user_id"), document["created_at"])
+
+    def backfill(self, start=None, end=None):
+        """Rebuilds every bucket of the whole days between start and end (all data by default)."""
+        start = floor_to(start, DAY) if start else EPOCH
+        end = ceil_to(end, DAY) if end else ceil_to(datetime.datetime.utcnow(), DAY)
+        span = {"$gte": start, "$lt": end}
+        self._rollups.delete_many({"unit": {"$in": ["hour", "day"]}, "start": span})
+        sums = counter_sums(self._counters)
+        self._collection.aggregate(self._merge_pipeline({"created_at": span}, "hour", HOUR, sums))
+        sums = {name: {"$sum": "$" + name} for name in self._counters}
+        self._rollups.aggregate(self._merge_pipeline({"unit": "hour", "start": span}, "day", DAY, sums, "$start"))
+
+    def watch(self):
+        """Keeps the buckets current from the collection's change stream (needs a replica set).
+        Resumes where the previous run stopped."""
+        marker = {"unit": "watch", "user_id": None, "start": None}
+        state = self._rollups.find_one(marker) or {}
+        stream = self._collection.watch(
+            [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+            full_document="updateLookup",
+            resume_after=state.get("resume_token"),
+        )
+        with stream:
+            for change in stream:
+                try:
+                    self.refresh_document(change.get("fullDocument") or {})
+                except Exception as e:
+                    warning(e)
+                    continue
+                self._rollups.update_one(marker, {"$set": {"resume_token": change["_id"]}}, upsert=True)
+
+    def _store(self, unit, user_id, start, counts):
+        key = {"unit": unit, "user_id": user_id, "start": start}
+        self._rollups.update_one(key, {"$set": counts}, upsert=True)
+
+    def _merge_pipeline(self, match, unit, size, sums, field="$created_at"):
+        truncate = bucket_start(field, size)
+        project = {name: 1 for name in self._counters}
+        project.update(_id=0, unit={"$literal": unit}, user_id="$_id.user_id", start="$_id.start")
+        return [
+            {"$match": match},
+            {"$group": dict(sums, _id={"user_id": "$user_id", "start": truncate})},
+            {"$project": project},
+            {"$merge": {"into": self._rollups.name, "on": [key for key, _ in bucket_index]}},
+        ]
+
+
+class AsyncMetricsRollup:
+    """motor counterpart of MetricsRollup.metrics for the grpc.aio servers."""
+
+    def __init__(self, collection, rollup_collection, counters):
+        self._collection = collection
+        self._rollups = rollup_collection
+        self._counters = counters
+
+    async def metrics(self, filters, start, end):
+        raw, hours, days = split_range(start, end)
+        results = []
+        if raw:
+            cursor = self._collection.aggregate(raw_pipeline(filters, raw, self._counters))
+            results.append(await cursor.to_list(None))
+        if hours or days:
+            cursor = self._rollups.aggregate(bucket_pipeline(filters, hours, days, self._counters))
+            results.append(await cursor.to_list(None))
+        return add_metrics(*[read_metrics(r, self._counters) for r in results])
+
+
+def run_job(rollup, argv=None):
+    """Command line of the rollup jobs:
+    backfill [start [end]]  rebuilds the buckets of the given ISO dates (all data by default)
+    watch                   follows the change stream"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["backfill"]:
+        dates = [datetime.datetime.fromisoformat(arg) for arg in argv[1:3]]
+        rollup.ensure_indexes()
+        rollup.backfill(*dates)
+    elif argv[:1] == ["watch"]:
+        rollup.ensure_indexes()
+        rollup.watch()
+    else:
+        print(run_job.__doc__)
@@ -0,0 +1,342 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+from itertools import islice
+from concurrent import futures
+
+import grpc
+
+from .channels import keepalive_time_ms
+
+max_workers = int(os.environ.get("GRPC_MAX_WORKERS", 32))
+queue_depth = int(os.environ.get("GRPC_QUEUE_DEPTH", 128))
+# Items iterate_sync pulls from a blocking iterator per trip to the executor.
+sync_iteration_batch = int(os.environ.get("GRPC_SYNC_ITERATION_BATCH", 64))
+max_concurrent_rpcs = int(os.environ.get("GRPC_MAX_CONCURRENT_RPCS", 0)) or None
+
+# Comma separated "Method=limit" pairs, e.g. "GetMatchesReport=2,GetAllTransactions=16".
+method_limits = os.environ.get("GRPC_METHOD_LIMITS", "")
+
+
+def parse_method_limits(value):
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            method, limit = item.split("=", 1)
+            limits[method.strip()] = int(limit)
+    return limits
+
+
+class MethodStats:
+    """Moving averages of how long calls to one method wait in the queue and run."""
+
+    def __init__(self, alpha=0.2):
+        self._alpha = alpha
+        self._lock = threading.Lock()
+        self.queue_wait = 0.0
+        self.service_time = None
+        self.calls = 0
+        self.rejected = 0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.queue_wait += self._alpha * (seconds - self.queue_wait)
+
+    def record_service_time(self, seconds):
+        with self._lock:
+            self.calls += 1
+            if self.service_time is None:
+                self.service_time = seconds
+            else:
+                self.service_time += self._alpha * (seconds - self.service_time)
+
+    def predicted_time(self):
+        """Seconds a call arriving now is expected to take, queued and run; None before the
+        first call finished."""
+        with self._lock:
+            if self.service_time is None:
+                return None
+            return self.queue_wait + self.service_time
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+
+class AdmissionControl(grpc.ServerInterceptor):
+    """Rejects calls with RESOURCE_EXHAUSTED before doing any work when they can't finish in
+    time, or when their method already runs at its concurrency limit.
+
+    The interceptor runs when a call arrives and the wrapped handler when a worker thread
+    picks it up, so the difference is the time the call spent queued. A call arriving for a
+    method at its limit gets a handler that only aborts, instead of waiting in the queue for
+    the real one. Its finish is predicted on arrival as the method's average queue wait plus
+    service time; gRPC only hands the deadline to the handler, so the prediction is checked
+    against the deadline the call arrived with as soon as a worker picks it up, and the call
+    is rejected unless it can finish both as predicted and with what is left of it.
+
+    The bounds are approximate: the threaded server runs every handler on its pool, aborting
+    ones included, so a rejected call still waits for a worker, behind at most the calls
+    queued before it. Per-method limits are checked on arrival and taken on pickup, so calls
+    already queued can briefly exceed a limit. The hard bound is maximum_concurrent_rpcs,
+    which gRPC enforces on arrival without a worker: make_server sets it to max_workers +
+    queue_depth, which keeps the wait of a rejected call to about queue_depth / max_workers
+    service times."""
+
+    def __init__(self, limits=None):
+        self._limits = {method: threading.BoundedSemaphore(limit) for method, limit in (limits or {}).items()}
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        arrived = time.monotonic()
+        stats = self._method_stats(method)
+        if not self._has_capacity(method):
+            stats.record_rejected()
+            return _wrap_handler(handler, lambda behavior, streaming: _reject(method))
+        predicted = stats.predicted_time()
+        return _wrap_handler(
+            handler, lambda behavior, streaming: self._admit(method, arrived, predicted, behavior, streaming)
+        )
+
+    def _has_capacity(self, method):
+        limit = self._limits.get(method)
+        if limit is None or limit.acquire(blocking=False):
+            if limit is not None:
+                limit.release()
+            return True
+        return False
+
+    def _method_stats(self, method):
+        with self._stats_lock:
+            if method not in self._stats:
+                self._stats[method] = MethodStats()
+            return self._stats[method]
+
+    def _admit(self, method, arrived, predicted, behavior, streaming):
+        stats = self._method_stats(method)
+        limit = self._limits.get(method)
+
+        def admitted(request, context):
+            waited = time.monotonic() - arrived
+            stats.record_wait(waited)
+            remaining = context.time_remaining()
+            if remaining is not None and _too_late(remaining, waited, predicted, stats.service_time):
+                stats.record_rejected()
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Deadline too short for current load")
+            if limit and not limit.acquire(blocking=False):
+                stats.record_rejected()
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many concurrent %s calls" % method)
+            return time.monotonic()
+
+        def done(started):
+            stats.record_service_time(time.monotonic() - started)
+            if limit:
+                limit.release()
+
+        if not streaming:
+
+            def unary(request, context):
+                started = admitted(request, context)
+                try:
+                    return behavior(request, context)
+                finally:
+                    done(started)
+
+            return unary
+
+        def stream(request, context):
+            started = admitted(request, context)
+            try:
+                yield from behavior(request, context)
+            finally:
+                done(started)
+
+        return stream
+
+
+class AsyncAdmissionControl(AdmissionControl, grpc.aio.ServerInterceptor):
+    """grpc.aio counterpart of AdmissionControl, with the same per-method limits and deadline
+    check. Calls don't wait for a worker but start on the event loop as they arrive, so the
+    wait it records is how far the loop lags behind."""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        arrived = time.monotonic()
+        stats = self._method_stats(method)
+        if not self._has_capacity(method):
+            stats.record_rejected()
+            return _wrap_handler(handler, lambda behavior, streaming: _reject_async(method))
+        predicted = stats.predicted_time()
+        return _wrap_handler(
+            handler, lambda behavior, streaming: self._admit_async(method, arrived, predicted, behavior, streaming)
+        )
+
+    def _admit_async(self, method, arrived, predicted, behavior, streaming):
+        stats = self._method_stats(method)
+        limit = self._limits.get(method)
+
+        async def admitted(context):
+            waited = time.monotonic() - arrived
+            stats.record_wait(waited)
+            remaining = context.time_remaining()
+            if remaining is not None and _too_late(remaining, waited, predicted, stats.service_time):
+                stats.record_rejected()
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Deadline too short for current load")
+            if limit and not limit.acquire(blocking=False):
+                stats.record_rejected()
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many concurrent %s calls" % method)
+            return time.monotonic()
+
+        def done(started):
+            stats.record_service_time(time.monotonic() - started)
+            if limit:
+                limit.release()
+
+        if not streaming:
+
+            async def unary(request, context):
+                started = await admitted(context)
+                try:
+                    return await behavior(request, context)
+                finally:
+                    done(started)
+
+            return unary
+
+        async def stream(request, context):
+            started = await admitted(context)
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            finally:
+                done(started)
+
+        return stream
+
+
+def _too_late(remaining, waited, predicted, service_time):
+    if predicted is not None and remaining + waited < predicted:
+        return True
+    return service_time is not None and remaining < service_time
+
+
+def _reject(method):
+    def rejected(request, context):
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many concurrent %s calls" % method)
+
+    return rejected
+
+
+def _reject_async(method):
+    async def rejected(request, context):
+        await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many concurrent %s calls" % method)
+
+    return rejected
+
+
+def _wrap_handler(handler, wrap):
+    if handler.unary_unary:
+        return grpc.unary_unary_rpc_method_handler(
+            wrap(handler.unary_unary, False),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.unary_stream:
+        return grpc.unary_stream_rpc_method_handler(
+            wrap(handler.unary_stream, True),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.stream_unary:
+        return grpc.stream_unary_rpc_method_handler(
+            wrap(handler.stream_unary, False),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    return grpc.stream_stream_rpc_method_handler(
+        wrap(handler.stream_stream, True),
+        request_deserializer=handler.request_deserializer,
+        response_serializer=handler.response_serializer,
+    )
+
+
+def server_options():
+    """Lets in the keepalive pings clients send on idle pooled channels (see common.channels),
+    which gRPC's defaults would answer with GOAWAY too_many_pings."""
+    return [
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.min_ping_interval_without_data_ms", keepalive_time_ms // 2),
+        ("grpc.http2.max_pings_without_data", 0),
+    ]
+
+
+def make_server(limits=None, interceptors=()):
+    """Builds the threaded gRPC server shared by every service. Calls beyond max_workers wait
+    in a queue of at most queue_depth; anything past that is rejected by gRPC itself, before
+    it takes a worker. The rejections of AdmissionControl wait in that queue, so keep
+    queue_depth a small multiple of max_workers (GRPC_MAX_CONCURRENT_RPCS, when set, replaces
+    the sum). limits are per-method concurrency limits, merged with GRPC_METHOD_LIMITS."""
+    limits = dict(limits or {})
+    limits.update(parse_method_limits(method_limits))
+    admission_control = AdmissionControl(limits)
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=[admission_control] + list(interceptors),
+        maximum_concurrent_rpcs=max_concurrent_rpcs or max_workers + queue_depth,
+        options=server_options(),
+    )
+    server.admission_control = admission_control
+    return server
+
+
+aio_max_concurrent_rpcs = int(os.environ.get("GRPC_AIO_MAX_CONCURRENT_RPCS", 10000))
+server_mode = os.environ.get("GRPC_SERVER_MODE", "thread")
+
+
+def make_aio_server(limits=None, interceptors=()):
+    """grpc.aio counterpart of make_server for I/O-bound services. Every call runs on the event
+    loop, so concurrency is bounded by GRPC_AIO_MAX_CONCURRENT_RPCS overall and by limits,
+    merged with GRPC_METHOD_LIMITS as for make_server, per method."""
+    limits = dict(limits or {})
+    limits.update(parse_method_limits(method_limits))
+    admission_control = AsyncAdmissionControl(limits)
+    server = grpc.aio.server(
+        interceptors=[admission_control] + list(interceptors),
+        maximum_concurrent_rpcs=aio_max_concurrent_rpcs,
+        options=server_options(),
+    )
+    server.admission_control = admission_control
+    return server
+
+
+async def run_sync(fn, *args, **kwargs):
+    """Runs a blocking call on the default executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+async def iterate_sync(iterable, batch_size=sync_iteration_batch):
+    """Iterates a blocking iterable (a cursor, a generator handler) without blocking the event
+    loop: items are pulled on the default executor, at most batch_size per trip, and yielded as
+    each trip returns rather than after the whole iterable is read."""
+    iterator = iter(iterable)
+    while True:
+        items = await run_sync(lambda: list(islice(iterator, batch_size)))
+        if not items:
+            return
+        for item in items:
+            yield item
@@ -0,0 +1,237 @@
+import sys
+import datetime
+
+sys.path.insert(0, "/ocr/src/service/ocr")
+sys.path.insert(0, "/search/src/service/ocr")
+sys.path.insert(0, "/api-gateway/src/service/ocr")
+sys.path.insert(0, "/transactions/src/service/ocr")
+
+import grpc
+
+from service.ocr.dataset_pb2_grpc import DatasetStub
+from service.common.channels import get_aio_channel
+from service.common.pagination import next_page_token
+from service.ocr.dataset_pb2 import (
+    GetOneDocumentRequest,
+    GetManyDocumentsRequest,
+    GetOneDocumentInfoRequest,
+    GetManyDocumentsInfoRequest,
+    GetAllDocumentsInfoRequest,
+    GetOneDocumentImageRequest,
+    GetOneDocumentImageBytesRequest,
+    ImageOptions,
+    UpdateDocumentLinesRequest,
+    UpdateLineRequest,
+    GetOneLineCropRequest,
+    GetManyLineCropsRequest,
+    GetOneLineCropBytesRequest,
+    GetDocumentsMetricsRequest,
+)
+from service.ocr.dataset_client import (
+    server_name,
+    port,
+    pb_to_dict,
+    dt_to_pb,
+    decoders,
+    projection_args,
+)
+
+
+class AsyncGRPCDatasetClient:
+    """grpc.aio counterpart of GRPCDatasetClient with the same methods and return values.
+    Streaming methods are async generators."""
+
+    stub = None
+    channel = None
+
+    def __init__(self):
+        self.channel = get_aio_channel(server_name + ":" + port)
+        self.stub = DatasetStub(self.channel)
+
+    async def close(self):
+        """Lets go of the channel. It is shared, so it stays open for the other clients:
+        close_aio_channels closes the pool at shutdown."""
+        self.channel = self.stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get_one_document(self, document_id, user_id, output="dict", fields=None, depth=None):
+        resp = await self.stub.GetOneDocument(
+            GetOneDocumentRequest(
+                documentUuid=document_id, userId=user_id, **projection_args(fields, depth)
+            )
+        )
+        return decoders[output](resp) if len(resp.ListFields()) else None
+
+    async def get_many_documents(self, document_ids, user_id, output="dict", fields=None, depth=None):
+        decoder = decoders[output]
+        response_iterator = self.stub.GetManyDocuments(
+            GetManyDocumentsRequest(
+                documentUuids=document_ids, userId=user_id, **projection_args(fields, depth)
+            )
+        )
+        async for resp in response_iterator:
+            if len(resp.pages) or fields:
+                yield decoder(resp)
+
+    async def get_one_document_info(self, document_id, user_id):
+        resp = await self.stub.GetOneDocumentInfo(
+            GetOneDocumentInfoRequest(documentUuid=document_id, userId=user_id)
+        )
+        if len(resp.ListFields()):
+            data = pb_to_dict(resp)
+            data["verified"] = data.get("verified", False)
+            return data
+        return None
+
+    async def get_many_documents_info(self, document_ids, user_id):
+        response_iterator = self.stub.GetManyDocumentsInfo(
+            GetManyDocumentsInfoRequest(documentUuids=document_ids, userId=user_id)
+        )
+        async for resp in response_iterator:
+            if len(resp.ListFields()):
+                data = pb_to_dict(resp)
+                data["verified"] = data.get("verified", False)
+                yield data
+
+    def _get_all_documents_info_call(
+        self, user_id, skip, limit, start_date, end_date, with_matches, page_token
+    ):
+        end_date = end_date or datetime.datetime.now()
+        start_date = start_date or datetime.datetime.fromtimestamp(0)
+        return self.stub.GetAllDocumentsInfo(
+            GetAllDocumentsInfoRequest(
+                skip=skip,
+                limit=limit,
+                userId=user_id,
+                startDate=dt_to_pb(start_date),
+                endDate=dt_to_pb(end_date),
+                withMatches=with_matches,
+                pageToken=page_token,
+            )
+        )
+
+    async def get_all_documents_info(
+        self,
+        user_id,
+        skip=0,
+        limit=100,
+        start_date=None,
+        end_date=None,
+        with_matches="all",
+        page_token=None,
+    ):
+        response_iterator = self._get_all_documents_info_call(
+            user_id, skip, limit, start_date, end_date, with_matches, page_token
+        )
+        async for resp in response_iterator:
+            if len(resp.ListFields()):
+                data = pb_to_dict(resp)
+                data["verified"] = data.get("verified", False)
+                yield data
+
+    async def iter_all_documents_info(
+        self, user_id, page_size=100, start_date=None, end_date=None, with_matches="all", page_token=None
+    ):
+        """Every document info in the range, fetched page_size at a time by page token."""
+        end_date = end_date or datetime.datetime.now()
+        while True:
+            response_iterator = self._get_all_documents_info_call(
+                user_id, 0, page_size, start_date, end_date, with_matches, page_token
+            )
+            async for resp in response_iterator:
+                if len(resp.ListFields()):
+                    data = pb_to_dict(resp)
+                    data["verified"] = data.get("verified", False)
+                    yield data
+            page_token = next_page_token(await response_iterator.trailing_metadata())
+            if not page_token:
+                return
+
+    async def get_one_document_image(self, document_id, user_id):
+        resp = await self.stub.GetOneDocumentImage(
+            GetOneDocumentImageRequest(documentUuid=document_id, userId=user_id)
+        )
+        return resp.image or None
+
+    async def get_one_document_image_bytes(self, document_id, user_id, max_size=0, format="jpeg", quality=0):
+        """(encoded image, content type), scaled down to fit max_size x max_size when given, or
+        None when not found."""
+        response_iterator = self.stub.GetOneDocumentImageBytes(
+            GetOneDocumentImageBytesRequest(
+                documentUuid=document_id,
+                userId=user_id,
+                options=ImageOptions(maxSize=max_size, format=format, quality=quality),
+            )
+        )
+        chunks, content_type = [], None
+        async for resp in response_iterator:
+            content_type = content_type or resp.contentType
+            chunks.append(resp.data)
+        return (b"".join(chunks), content_type) if chunks else None
+
+    async def update_document_lines(self, document_id, lines, user_id):
+        line_requests = [UpdateLineRequest(text=l["text"], uuid=l["uuid"]) for l in lines]
+        resp = await self.stub.UpdateDocumentLines(
+            UpdateDocumentLinesRequest(documentUuid=document_id, lines=line_requests, userId=user_id)
+        )
+        return resp.count
+
+    async def stream_document_line_updates(self, edits, user_id):
+        """Sends (document id, lines) edits as they come from the edits iterable; the server writes
+        them in batches. Returns the number of lines found once edits is exhausted."""
+        requests = (
+            UpdateDocumentLinesRequest(
+                documentUuid=document_id,
+                lines=[UpdateLineRequest(text=l["text"], uuid=l["uuid"]) for l in lines],
+                userId=user_id,
+            )
+            for document_id, lines in edits
+        )
+        resp = await self.stub.StreamDocumentLineUpdates(requests)
+        return resp.count
+
+    async def get_one_line_crop(self, document_id, line_id, user_id):
+        resp = await self.stub.GetOneLineCrop(
+            GetOneLineCropRequest(documentUuid=document_id, lineUuid=line_id, userId=user_id)
+        )
+        return resp.image or None
+
+    async def get_many_line_crops(self, document_id, line_ids, user_id):
+        response_iterator = self.stub.GetManyLineCrops(
+            GetManyLineCropsRequest(documentUuid=document_id, lineUuids=line_ids, userId=user_id)
+        )
+        async for resp in response_iterator:
+            yield resp.lineUuid, resp.image
+
+    async def get_one_line_crop_bytes(self, document_id, line_id, user_id, max_size=0, format="jpeg", quality=0):
+        resp = await self.stub.GetOneLineCropBytes(
+            GetOneLineCropBytesRequest(
+                documentUuid=document_id,
+                lineUuid=line_id,
+                userId=user_id,
+                options=ImageOptions(maxSize=max_size, format=format, quality=quality),
+            )
+        )
+        return (resp.data, resp.contentType) if resp.data else None
+
+    async def get_documents_metrics(self, user_id, start_date=None, end_date=None):
+        end_date = end_date or datetime.datetime.now()
+        start_date = start_date or end_date - datetime.timedelta(days=1)
+
+        resp = await self.stub.GetDocumentsMetrics(
+            GetDocumentsMetricsRequest(
+                userId=user_id, startDate=dt_to_pb(start_date), endDate=dt_to_pb(end_date)
+            )
+        )
+        return {
+            "documents_total_count": resp.total or 0,
+            "documents_matched_count": resp.matched or 0,
+            "documents_matched_all_fields_count": resp.matched_all_fields or 0,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        }
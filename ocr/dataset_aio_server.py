@@ -0,0 +1,309 @@
+import asyncio
+import logging
+
+import grpc
+
+from utils.configmanager import ConfigManager
+
+from dataset_pb2 import (
+    DocumentInfoResponse,
+    DocumentResponse,
+    DocumentImageResponse,
+    UpdateDocumentLinesResponse,
+    DocumentsMetricsResponse,
+    InvalidateAccessConstraintsResponse,
+    LineCropResponse,
+    ImageBytesResponse,
+)
+from dataset_pb2_grpc import DatasetServicer, add_DatasetServicer_to_server
+from service.common.converters import make_pb
+from line_crops import (
+    line_index_field,
+    build_line_index,
+    line_index_projection,
+    crop_line,
+    image_cache,
+)
+from line_updates import LineUpdateBatch, request_lines, read_requests_async, uuid_index
+from image_renders import render_options, render, content_types, iter_chunks, image_chunk_size, render_cache
+from projections import document_projection
+from utils.image import DATA_URL_PREFIX, image_to_base64
+from tasks.dataset_event_handler import (
+    retrieve_image,
+    make_image_route,
+)
+
+from dataset_server import document_info_handler, documents_counters
+from service.common.server import make_aio_server, run_sync
+from service.common.async_mongo import make_async_db, AsyncMongoDAO
+from service.common.access_constraints import access_constraint_cache
+from service.common.metrics import user_created_at_index, metrics_pipeline, read_metrics
+from service.common.rollups import AsyncMetricsRollup, rollups_enabled
+from service.common.pagination import sort_keys, sort_index, after_page_token, trailing_page_token
+from service.user_identity.user_identity_aio_client import AsyncGRPCUserIdentityClient
+
+
+class AsyncGRPCDataset(DatasetServicer):
+    """grpc.aio implementation of GRPCDataset. Mongo is read through motor; image retrieval
+    and line updates still use the blocking helpers and run on the default executor."""
+
+    _db = None
+    _doc_dao = None
+    _info_dao = None
+    _identity_client = None
+    _rollup = None
+
+    def __init__(self):
+        self._db = make_async_db(ConfigManager.get_config_value("database", "mongo-dataset"))
+        self._doc_dao = AsyncMongoDAO(self._db["documents"])
+        self._info_dao = AsyncMongoDAO(self._db["dataset"])
+        self._identity_client = AsyncGRPCUserIdentityClient()
+        self._rollup = AsyncMetricsRollup(
+            self._db["dataset"], self._db["dataset_metrics_rollup"], documents_counters
+        )
+
+    async def ensure_indexes(self):
+        await self._db["dataset"].create_index(user_created_at_index)
+        await self._db["dataset"].create_index(sort_index)
+        await self._db["dataset"].create_index(uuid_index)
+        await self._db["documents"].create_index(uuid_index)
+
+    async def GetOneDocument(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        projection = await self._get_request_projection(request, context)
+        document = await self._doc_dao.get_first(filters=filters, projection=projection)
+        return make_pb(document or {}, DocumentResponse)
+
+    async def GetManyDocuments(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = {"$in": list(request.documentUuids)}
+        projection = await self._get_request_projection(request, context)
+        async for document in self._doc_dao.get_many_by(filters, projection=projection):
+            yield make_pb(document, DocumentResponse)
+
+    async def GetOneDocumentInfo(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        doc_info = await self._info_dao.get_first(filters)
+        return make_pb(doc_info or {}, DocumentInfoResponse, document_info_handler)
+
+    async def GetManyDocumentsInfo(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = {"$in": list(request.documentUuids)}
+        async for info in self._info_dao.get_many_by(filters):
+            yield make_pb(info, DocumentInfoResponse, document_info_handler)
+
+    async def GetAllDocumentsInfo(self, request, context):
+        end_date = request.endDate.ToDatetime()
+        start_date = request.startDate.ToDatetime()
+        with_matches = request.withMatches
+        filters = await self._get_request_access_constraint(request)
+        filters["created_at"] = {"$gte": start_date, "$lte": end_date}
+        if with_matches == False:
+            filters["matches"] = {"$size": 0}
+        if with_matches == True:
+            filters["matches"] = {"$not": {"$size": 0}}
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        docs_info = self._info_dao.get_many_by(
+            filters=filters, skip=request.skip, limit=request.limit, sort_by=sort_keys
+        )
+        last, count = None, 0
+        async for info in docs_info:
+            last, count = info, count + 1
+            yield make_pb(info, DocumentInfoResponse, document_info_handler)
+        context.set_trailing_metadata(trailing_page_token(last, count, request.limit))
+
+    async def GetOneDocumentImage(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        info = await self._info_dao.get_first(filters)
+        if not info:
+            return DocumentImageResponse(image="")
+        img = await run_sync(retrieve_image, make_image_route(info))
+        if img:
+            return DocumentImageResponse(image=image_to_base64(img, prefix=DATA_URL_PREFIX))
+        return DocumentImageResponse(image="")
+
+    async def GetOneDocumentImageBytes(self, request, context):
+        max_size, fmt, quality = await self._get_request_render_options(request, context)
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        if not await self._info_dao.get_first(filters):
+            return
+        content_type = content_types[fmt]
+        key = render_cache.key(request.documentUuid, max_size, fmt, quality)
+        f = await run_sync(render_cache.get, key)
+        if f:
+            with f:
+                while True:
+                    chunk = await run_sync(f.read, image_chunk_size)
+                    if not chunk:
+                        return
+                    yield ImageBytesResponse(data=chunk, contentType=content_type)
+                    content_type = ""
+        image = await self._get_document_image(request.documentUuid)
+        if not image:
+            return
+        data = await run_sync(render, image, max_size, fmt, quality)
+        await run_sync(render_cache.put, key, data)
+        for chunk in iter_chunks(data):
+            yield ImageBytesResponse(data=chunk, contentType=content_type)
+            content_type = ""
+
+    async def UpdateDocumentLines(self, request, context):
+        if not await self._has_document_access(request):
+            return UpdateDocumentLinesResponse(count=0)
+        batch = LineUpdateBatch()
+        batch.add(request.documentUuid, request_lines(request), request.userId)
+        return UpdateDocumentLinesResponse(count=await self._write_line_updates(batch))
+
+    async def StreamDocumentLineUpdates(self, request_iterator, context):
+        batch, access, count = LineUpdateBatch(), {}, 0
+        requests = asyncio.Queue()
+        reader = asyncio.ensure_future(read_requests_async(request_iterator, requests))
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(requests.get(), batch.wait_time())
+                except asyncio.TimeoutError:
+                    count += await self._write_line_updates(batch)
+                    continue
+                if request is None:
+                    break
+                if isinstance(request, Exception):
+                    raise request
+                key = (request.documentUuid, request.userId)
+                if key not in access:
+                    access[key] = await self._has_document_access(request)
+                if access[key]:
+                    batch.add(request.documentUuid, request_lines(request), request.userId)
+                if batch.due():
+                    count += await self._write_line_updates(batch)
+        finally:
+            reader.cancel()
+            count += await self._write_line_updates(batch)
+        return UpdateDocumentLinesResponse(count=count)
+
+    async def GetOneLineCrop(self, request, context):
+        for _, crop in await self._get_line_crops(request, [request.lineUuid]):
+            return DocumentImageResponse(image=image_to_base64(crop, prefix=DATA_URL_PREFIX))
+        return DocumentImageResponse(image="")
+
+    async def GetManyLineCrops(self, request, context):
+        for line_uuid, crop in await self._get_line_crops(request, list(request.lineUuids)):
+            yield LineCropResponse(lineUuid=line_uuid, image=image_to_base64(crop, prefix=DATA_URL_PREFIX))
+
+    async def GetOneLineCropBytes(self, request, context):
+        max_size, fmt, quality = await self._get_request_render_options(request, context)
+        for _, crop in await self._get_line_crops(request, [request.lineUuid]):
+            data = await run_sync(render, crop, max_size, fmt, quality)
+            return ImageBytesResponse(data=data, contentType=content_types[fmt])
+        return ImageBytesResponse()
+
+    async def GetDocumentsMetrics(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+
+        end_date = request.endDate.ToDatetime()
+        start_date = request.startDate.ToDatetime()
+        if rollups_enabled:
+            metrics = await self._rollup.metrics(filters, start_date, end_date)
+        else:
+            filters["created_at"] = {"$gte": start_date, "$lte": end_date}
+            cursor = self._db["dataset"].aggregate(metrics_pipeline(filters, documents_counters))
+            metrics = read_metrics(await cursor.to_list(None), documents_counters)
+        return DocumentsMetricsResponse(
+            total=metrics["total"], matched=metrics["matched"], matched_all_fields=metrics["matched"]
+        )
+
+    async def InvalidateAccessConstraints(self, request, context):
+        count = access_constraint_cache.invalidate(list(request.userIds))
+        return InvalidateAccessConstraintsResponse(count=count)
+
+    async def _get_request_access_constraint(self, request):
+        user_id = request.userId
+        if user_id == "root":
+            return {}
+        associates = await access_constraint_cache.get_async(
+            user_id, self._identity_client.get_branch_office_associate_list
+        )
+        return {"user_id": {"$in": associates}}
+
+    async def _has_document_access(self, request):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        return await self._info_dao.get_first(filters=filters, projection={"_id": 1}) is not None
+
+    async def _write_line_updates(self, batch):
+        operations = batch.take()
+        if not operations:
+            return 0
+        result = await self._db["documents"].bulk_write(operations, ordered=False)
+        return result.matched_count
+
+    async def _get_line_crops(self, request, line_uuids):
+        filters = await self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        document = await self._doc_dao.get_first(filters=filters, projection=line_index_projection(line_uuids))
+        if not document:
+            return []
+        index = document.get(line_index_field)
+        if index is None or any(line_uuid not in index for line_uuid in line_uuids):
+            index = await self._store_line_index({"_id": document["_id"]})
+        entries = [(line_uuid, index[line_uuid]) for line_uuid in line_uuids if line_uuid in index]
+        if not entries:
+            return []
+        image = await self._get_document_image(request.documentUuid)
+        if not image:
+            return []
+        return [(line_uuid, crop_line(image, entry)) for line_uuid, entry in entries]
+
+    async def _store_line_index(self, filters):
+        document = await self._doc_dao.get_first(filters=filters)
+        if not document:
+            return {}
+        index = build_line_index(document)
+        await self._db["documents"].update_one({"_id": document["_id"]}, {"$set": {line_index_field: index}})
+        return index
+
+    async def _get_document_image(self, document_uuid):
+        image = image_cache.get(document_uuid)
+        if image is None:
+            info = await self._info_dao.get_first({"uuid": document_uuid})
+            image = await run_sync(retrieve_image, make_image_route(info)) if info else None
+            if image:
+                await run_sync(image_cache.put, document_uuid, image)
+        return image
+
+    @staticmethod
+    async def _get_request_render_options(request, context):
+        try:
+            return render_options(request.options)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    @staticmethod
+    async def _get_request_projection(request, context):
+        try:
+            return document_projection(request.fieldMask, request.depth)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+
+async def serve():
+    server = make_aio_server()
+    servicer = AsyncGRPCDataset()
+    await servicer.ensure_indexes()
+    add_DatasetServicer_to_server(servicer, server)
+    server.add_insecure_port("[::]:50052")
+    print("Starting asyncio dataset gRPC server listening at '[::]:50052'...")
+    await server.start()
+    await server.wait_for_termination()
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    asyncio.run(serve())
@@ -5,13 +5,18 @@ sys.path.insert(0, "/ocr/src/service/ocr")
 sys.path.insert(0, "/search/src/service/ocr")
 sys.path.insert(0, "/api-gateway/src/service/ocr")
 sys.path.insert(0, "/transactions/src/service/ocr")
+sys.path.insert(0, "/user_identity/src/service/ocr")
 
 import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
+from google.protobuf.field_mask_pb2 import FieldMask
 
 import json
 
 from service.ocr.dataset_pb2_grpc import DatasetStub
+from service.common.channels import get_channel, broadcast, broadcast_timeout
+from service.common.pagination import next_page_token
+from service.common.decoders import decode, MessageView
 from service.ocr.dataset_pb2 import (
     GetOneDocumentRequest,
     GetManyDocumentsRequest,
@@ -20,25 +25,22 @@ from service.ocr.dataset_pb2 import (
     GetManyDocumentsInfoRequest,
     GetAllDocumentsInfoRequest,
     GetOneDocumentImageRequest,
+    GetOneDocumentImageBytesRequest,
+    ImageOptions,
     UpdateDocumentLinesRequest,
     UpdateLineRequest,
     GetOneLineCropRequest,
+    GetManyLineCropsRequest,
+    GetOneLineCropBytesRequest,
     GetDocumentsMetricsRequest,
+    InvalidateAccessConstraintsRequest,
+    DocumentDepth,
 )
-from bson import ObjectId
 
 server_name = "ocr"
 port = "50052"
 
-nested_fields = {"pages", "areas", "paragraphs", "lines", "words", "matches"}
-nested_field = {"bbox", "top_left", "bottom_right"}
-
-
-def pb_to_dict(pb):
-    d = {}
-    for descriptor, value in pb.ListFields():
-        d[descriptor.name] = deserialize(descriptor, value)
-    return d
+pb_to_dict = decode
 
 
 def dt_to_pb(dt):
@@ -47,18 +49,18 @@ def dt_to_pb(dt):
     return pb
 
 
-def deserialize(descriptor, value):
-    if descriptor.name in nested_fields:
-        return [pb_to_dict(v) for v in value]
-    if descriptor.name in nested_field:
-        return pb_to_dict(value)
-    if descriptor.name == "_id":
-        return ObjectId(value)
-    if descriptor.name in ["created_at", "updated_at"]:
-        return value.ToDatetime()
-    if descriptor.name in ["verified", "matches"]:
-        return {k: v for k, v in value.items()}
-    return value
+# How get_one_document and get_many_documents hand back a document: a plain dict, the
+# DocumentResponse itself, or a read-only view that only decodes the parts that are read.
+decoders = {"dict": pb_to_dict, "message": lambda pb: pb, "view": MessageView}
+
+
+def projection_args(fields=None, depth=None):
+    """fields are DocumentResponse paths such as "pages.text"; depth is one of "pages", "areas",
+    "paragraphs" or "lines" and drops everything below that level."""
+    return {
+        "fieldMask": FieldMask(paths=fields or []),
+        "depth": DocumentDepth.Value(depth.upper()) if depth else DocumentDepth.FULL_DEPTH,
+    }
 
 
 class GRPCDatasetClient:
@@ -66,23 +68,29 @@ class GRPCDatasetClient:
     channel = None
 
     def __init__(self):
-        self.channel = grpc.insecure_channel(server_name + ":" + port)
+        self.channel = get_channel(server_name + ":" + port)
         self.stub = DatasetStub(self.channel)
 
-    def __del__(self):
-        self.channel.close()
-
-    def get_one_document(self, document_id, user_id):
-        resp = self.stub.GetOneDocument(GetOneDocumentRequest(documentUuid=document_id, userId=user_id))
-        return pb_to_dict(resp) if len(resp.ListFields()) else None
+    def get_one_document(self, document_id, user_id, output="dict", fields=None, depth=None):
+        """output is one of decoders: "dict", "message" or "view". fields and depth limit what
+        the server reads, see projection_args."""
+        resp = self.stub.GetOneDocument(
+            GetOneDocumentRequest(
+                documentUuid=document_id, userId=user_id, **projection_args(fields, depth)
+            )
+        )
+        return decoders[output](resp) if len(resp.ListFields()) else None
 
-    def get_many_documents(self, document_ids, user_id):
+    def get_many_documents(self, document_ids, user_id, output="dict", fields=None, depth=None):
+        decoder = decoders[output]
         response_iterator = self.stub.GetManyDocuments(
-            GetManyDocumentsRequest(documentUuids=document_ids, userId=user_id)
+            GetManyDocumentsRequest(
+                documentUuids=document_ids, userId=user_id, **projection_args(fields, depth)
+            )
         )
         for resp in response_iterator:
-            if len(resp.pages):
-                yield pb_to_dict(resp)
+            if len(resp.pages) or fields:
+                yield decoder(resp)
 
     def get_one_document_info(self, document_id, user_id):
         resp = self.stub.GetOneDocumentInfo(
@@ -105,7 +113,14 @@ class GRPCDatasetClient:
                 yield data
 
     def get_all_documents_info(
-        self, user_id, skip=0, limit=100, start_date=None, end_date=None, with_matches="all"
+        self,
+        user_id,
+        skip=0,
+        limit=100,
+        start_date=None,
+        end_date=None,
+        with_matches="all",
+        page_token=None,
     ):
         end_date = end_date or datetime.datetime.now()
         start_date = start_date or datetime.datetime.fromtimestamp(0)
@@ -117,6 +132,7 @@ class GRPCDatasetClient:
                 startDate=dt_to_pb(start_date),
                 endDate=dt_to_pb(end_date),
                 withMatches=with_matches,
+                pageToken=page_token,
             )
         )
         for resp in response_iterator:
@@ -124,6 +140,19 @@ class GRPCDatasetClient:
                 data = pb_to_dict(resp)
                 data["verified"] = data.get("verified", False)
                 yield data
+        return next_page_token(response_iterator.trailing_metadata())
+
+    def iter_all_documents_info(
+        self, user_id, page_size=100, start_date=None, end_date=None, with_matches="all", page_token=None
+    ):
+        """Every document info in the range, fetched page_size at a time by page token."""
+        end_date = end_date or datetime.datetime.now()
+        while True:
+            page_token = yield from self.get_all_documents_info(
+                user_id, 0, page_size, start_date, end_date, with_matches, page_token
+            )
+            if not page_token:
+                return
 
     def get_one_document_image(self, document_id, user_id):
         resp = self.stub.GetOneDocumentImage(
@@ -131,6 +160,22 @@ class GRPCDatasetClient:
         )
         return resp.image or None
 
+    def get_one_document_image_bytes(self, document_id, user_id, max_size=0, format="jpeg", quality=0):
+        """(encoded image, content type), scaled down to fit max_size x max_size when given, or
+        None when not found."""
+        response_iterator = self.stub.GetOneDocumentImageBytes(
+            GetOneDocumentImageBytesRequest(
+                documentUuid=document_id,
+                userId=user_id,
+                options=ImageOptions(maxSize=max_size, format=format, quality=quality),
+            )
+        )
+        chunks, content_type = [], None
+        for resp in response_iterator:
+            content_type = content_type or resp.contentType
+            chunks.append(resp.data)
+        return (b"".join(chunks), content_type) if chunks else None
+
     def update_document_lines(self, document_id, lines, user_id):
         line_requests = [UpdateLineRequest(text=l["text"], uuid=l["uuid"]) for l in lines]
         resp = self.stub.UpdateDocumentLines(
@@ -138,12 +183,45 @@ class GRPCDatasetClient:
         )
         return resp.count
 
+    def stream_document_line_updates(self, edits, user_id):
+        """Sends (document id, lines) edits as they come from the edits iterable; the server writes
+        them in batches. Returns the number of lines found once edits is exhausted."""
+        requests = (
+            UpdateDocumentLinesRequest(
+                documentUuid=document_id,
+                lines=[UpdateLineRequest(text=l["text"], uuid=l["uuid"]) for l in lines],
+                userId=user_id,
+            )
+            for document_id, lines in edits
+        )
+        resp = self.stub.StreamDocumentLineUpdates(requests)
+        return resp.count
+
     def get_one_line_crop(self, document_id, line_id, user_id):
         resp = self.stub.GetOneLineCrop(
             GetOneLineCropRequest(documentUuid=document_id, lineUuid=line_id, userId=user_id)
         )
         return resp.image or None
 
+    def get_many_line_crops(self, document_id, line_ids, user_id):
+        """Yields (line uuid, crop) for each of line_ids found in the document."""
+        response_iterator = self.stub.GetManyLineCrops(
+            GetManyLineCropsRequest(documentUuid=document_id, lineUuids=line_ids, userId=user_id)
+        )
+        for resp in response_iterator:
+            yield resp.lineUuid, resp.image
+
+    def get_one_line_crop_bytes(self, document_id, line_id, user_id, max_size=0, format="jpeg", quality=0):
+        resp = self.stub.GetOneLineCropBytes(
+            GetOneLineCropBytesRequest(
+                documentUuid=document_id,
+                lineUuid=line_id,
+                userId=user_id,
+                options=ImageOptions(maxSize=max_size, format=format, quality=quality),
+            )
+        )
+        return (resp.data, resp.contentType) if resp.data else None
+
     def get_documents_metrics(self, user_id, start_date=None, end_date=None):
         end_date = end_date or datetime.datetime.now()
         start_date = start_date or end_date - datetime.timedelta(days=1)
@@ -160,3 +238,13 @@ class GRPCDatasetClient:
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
         }
+
+    def invalidate_access_constraints(self, user_ids=None):
+        """Sent to every replica, each caching on its own. Returns the entries dropped over all of
+        them; raises grpc.RpcError when some replica could not be reached."""
+        request = InvalidateAccessConstraintsRequest(userIds=user_ids)
+        counts = broadcast(
+            server_name + ":" + port,
+            lambda channel: DatasetStub(channel).InvalidateAccessConstraints(request, timeout=broadcast_timeout).count,
+        )
+        return sum(counts)
@@ -0,0 +1,19 @@
+"""Builds and maintains the per user hour/day rollups read by GetDocumentsMetrics when
+METRICS_ROLLUPS=1.
+
+    python dataset_metrics_rollup.py backfill [start [end]]
+    python dataset_metrics_rollup.py watch
+"""
+import logging
+
+from database.mongo import make_db
+from utils.configmanager import ConfigManager
+
+from dataset_server import documents_counters
+from service.common.rollups import MetricsRollup, run_job
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    db = make_db(ConfigManager.get_config_value("database", "mongo-dataset"))
+    run_job(MetricsRollup(db["dataset"], db["dataset_metrics_rollup"], documents_counters))
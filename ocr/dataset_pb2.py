@@ -2,6 +2,7 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: dataset.proto
 
+from google.protobuf.internal import enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
@@ -13,6 +14,7 @@ _sym_db = _symbol_database.Default()
 
 from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 
 
 DESCRIPTOR = _descriptor.FileDescriptor(
@@ -20,10 +22,50 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='ocr',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=b'\n\rdataset.proto\x12\x03ocr\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1cgoogle/protobuf/struct.proto\"=\n\x15GetOneDocumentRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"@\n\x17GetManyDocumentsRequest\x12\x15\n\rdocumentUuids\x18\x01 \x03(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"A\n\x19GetOneDocumentInfoRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"D\n\x1bGetManyDocumentsInfoRequest\x12\x15\n\rdocumentUuids\x18\x01 \x03(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"\xba\x01\n\x1aGetAllDocumentsInfoRequest\x12\x0c\n\x04skip\x18\x01 \x01(\x05\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x0e\n\x06userId\x18\x03 \x01(\t\x12-\n\tstartDate\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x07\x65ndDate\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x0bwithMatches\x18\x06 \x01(\x08\"B\n\x1aGetOneDocumentImageRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"i\n\x1aUpdateDocumentLinesRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12%\n\x05lines\x18\x02 \x03(\x0b\x32\x16.ocr.UpdateLineRequest\x12\x0e\n\x06userId\x18\x03 \x01(\t\"/\n\x11UpdateLineRequest\x12\x0c\n\x04uuid\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\"O\n\x15GetOneLineCropRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x10\n\x08lineUuid\x18\x02 \x01(\t\x12\x0e\n\x06userId\x18\x03 \x01(\t\"\x88\x01\n\x1aGetDocumentsMetricsRequest\x12-\n\tstartDate\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x07\x65ndDate\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0e\n\x06userId\x18\x03 \x01(\t\"V\n\x18\x44ocumentsMetricsResponse\x12\r\n\x05total\x18\x01 \x01(\x05\x12\x0f\n\x07matched\x18\x02 \x01(\x05\x12\x1a\n\x12matched_all_fields\x18\x03 \x01(\x05\"&\n\x15\x44ocumentImageResponse\x12\r\n\x05image\x18\x01 \x01(\t\",\n\x1bUpdateDocumentLinesResponse\x12\r\n\x05\x63ount\x18\x01 \x01(\x05\"\xd6\x02\n\x14\x44ocumentInfoResponse\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12\x11\n\tsignature\x18\x02 \x01(\t\x12\x0c\n\x04uuid\x18\x03 \x01(\t\x12\x13\n\x0b\x64ocument_id\x18\x04 \x01(\t\x12\x19\n\x11original_filename\x18\x05 \x01(\t\x12\x0f\n\x07\x64\x61taset\x18\x06 \x01(\t\x12\x0e\n\x06\x63lient\x18\x07 \x01(\t\x12)\n\x08verified\x18\x08 \x01(\x0b\x32\x17.google.protobuf.Struct\x12.\n\ncreated_at\x18\t \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12#\n\x07matches\x18\x0b \x03(\x0b\x32\x12.ocr.MatchResponse\x12\x0f\n\x07user_id\x18\x0c \x01(\t\"8\n\rMatchResponse\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0f\n\x07quality\x18\x02 \x01(\t\"\xe0\x01\n\x10\x44ocumentResponse\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12.\n\ncreated_at\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0b\n\x03src\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12\x11\n\tsignature\x18\x06 \x01(\t\x12 \n\x05pages\x18\x07 \x03(\x0b\x32\x11.ocr.PageResponse\x12\x0f\n\x07user_id\x18\x08 \x01(\t\"\xb1\x01\n\x0cPageResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05\x61reas\x18\x06 \x03(\x0b\x32\x11.ocr.AreaResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xbb\x01\n\x0c\x41reaResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12*\n\nparagraphs\x18\x06 \x03(\x0b\x32\x16.ocr.ParagraphResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xb6\x01\n\x11ParagraphResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05lines\x18\x06 \x03(\x0b\x32\x11.ocr.LineResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xc5\x01\n\x0cLineResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05words\x18\x06 \x03(\x0b\x32\x11.ocr.WordResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\x12\x12\n\nline_class\x18\x08 \x01(\x05\"\x8f\x01\n\x0cWordResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12\x16\n\x0e\x63orrected_text\x18\x06 \x01(\t\"e\n\x13\x42oundingBoxResponse\x12$\n\x08top_left\x18\x01 \x01(\x0b\x32\x12.ocr.PointResponse\x12(\n\x0c\x62ottom_right\x18\x02 \x01(\x0b\x32\x12.ocr.PointResponse\"%\n\rPointResponse\x12\t\n\x01x\x18\x01 \x01(\x05\x12\t\n\x01y\x18\x02 \x01(\x05\x32\xf7\x05\n\x07\x44\x61taset\x12\x45\n\x0eGetOneDocument\x12\x1a.ocr.GetOneDocumentRequest\x1a\x15.ocr.DocumentResponse\"\x00\x12K\n\x10GetManyDocuments\x12\x1c.ocr.GetManyDocumentsRequest\x1a\x15.ocr.DocumentResponse\"\x00\x30\x01\x12Q\n\x12GetOneDocumentInfo\x12\x1e.ocr.GetOneDocumentInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x12W\n\x14GetManyDocumentsInfo\x12 .ocr.GetManyDocumentsInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x30\x01\x12U\n\x13GetAllDocumentsInfo\x12\x1f.ocr.GetAllDocumentsInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x30\x01\x12T\n\x13GetOneDocumentImage\x12\x1f.ocr.GetOneDocumentImageRequest\x1a\x1a.ocr.DocumentImageResponse\"\x00\x12Z\n\x13UpdateDocumentLines\x12\x1f.ocr.UpdateDocumentLinesRequest\x1a .ocr.UpdateDocumentLinesResponse\"\x00\x12J\n\x0eGetOneLineCrop\x12\x1a.ocr.GetOneLineCropRequest\x1a\x1a.ocr.DocumentImageResponse\"\x00\x12W\n\x13GetDocumentsMetrics\x12\x1f.ocr.GetDocumentsMetricsRequest\x1a\x1d.ocr.DocumentsMetricsResponse\"\x00\x62\x06proto3'
+  serialized_pb=b'\n\rdataset.proto\x12\x03ocr\x1a\x1fgoogle/protobuf/timestamp.proto\x1a\x1cgoogle/protobuf/struct.proto\x1a google/protobuf/field_mask.proto\"\x8f\x01\n\x15GetOneDocumentRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\x12-\n\tfieldMask\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\x12!\n\x05\x64\x65pth\x18\x04 \x01(\x0e\x32\x12.ocr.DocumentDepth\"\x92\x01\n\x17GetManyDocumentsRequest\x12\x15\n\rdocumentUuids\x18\x01 \x03(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\x12-\n\tfieldMask\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\x12!\n\x05\x64\x65pth\x18\x04 \x01(\x0e\x32\x12.ocr.DocumentDepth\"A\n\x19GetOneDocumentInfoRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"D\n\x1bGetManyDocumentsInfoRequest\x12\x15\n\rdocumentUuids\x18\x01 \x03(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"\xcd\x01\n\x1aGetAllDocumentsInfoRequest\x12\x0c\n\x04skip\x18\x01 \x01(\x05\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x0e\n\x06userId\x18\x03 \x01(\t\x12-\n\tstartDate\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x07\x65ndDate\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x0bwithMatches\x18\x06 \x01(\x08\x12\x11\n\tpageToken\x18\x07 \x01(\t\"B\n\x1aGetOneDocumentImageRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\"@\n\x0cImageOptions\x12\x0f\n\x07maxSize\x18\x01 \x01(\x05\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x0f\n\x07quality\x18\x03 \x01(\x05\"k\n\x1fGetOneDocumentImageBytesRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x0e\n\x06userId\x18\x02 \x01(\t\x12\"\n\x07options\x18\x03 \x01(\x0b\x32\x11.ocr.ImageOptions\"i\n\x1aUpdateDocumentLinesRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12%\n\x05lines\x18\x02 \x03(\x0b\x32\x16.ocr.UpdateLineRequest\x12\x0e\n\x06userId\x18\x03 \x01(\t\"/\n\x11UpdateLineRequest\x12\x0c\n\x04uuid\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\"O\n\x15GetOneLineCropRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x10\n\x08lineUuid\x18\x02 \x01(\t\x12\x0e\n\x06userId\x18\x03 \x01(\t\"R\n\x17GetManyLineCropsRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x11\n\tlineUuids\x18\x02 \x03(\t\x12\x0e\n\x06userId\x18\x03 \x01(\t\"x\n\x1aGetOneLineCropBytesRequest\x12\x14\n\x0c\x64ocumentUuid\x18\x01 \x01(\t\x12\x10\n\x08lineUuid\x18\x02 \x01(\t\x12\x0e\n\x06userId\x18\x03 \x01(\t\x12\"\n\x07options\x18\x04 \x01(\x0b\x32\x11.ocr.ImageOptions\"3\n\x10LineCropResponse\x12\x10\n\x08lineUuid\x18\x01 \x01(\t\x12\r\n\x05image\x18\x02 \x01(\t\"\x88\x01\n\x1aGetDocumentsMetricsRequest\x12-\n\tstartDate\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12+\n\x07\x65ndDate\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0e\n\x06userId\x18\x03 \x01(\t\"V\n\x18\x44ocumentsMetricsResponse\x12\r\n\x05total\x18\x01 \x01(\x05\x12\x0f\n\x07matched\x18\x02 \x01(\x05\x12\x1a\n\x12matched_all_fields\x18\x03 \x01(\x05\"5\n\"InvalidateAccessConstraintsRequest\x12\x0f\n\x07userIds\x18\x01 \x03(\t\"4\n#InvalidateAccessConstraintsResponse\x12\r\n\x05\x63ount\x18\x01 \x01(\x05\"&\n\x15\x44ocumentImageResponse\x12\r\n\x05image\x18\x01 \x01(\t\"7\n\x12ImageBytesResponse\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x13\n\x0b\x63ontentType\x18\x02 \x01(\t\",\n\x1bUpdateDocumentLinesResponse\x12\r\n\x05\x63ount\x18\x01 \x01(\x05\"\xd6\x02\n\x14\x44ocumentInfoResponse\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12\x11\n\tsignature\x18\x02 \x01(\t\x12\x0c\n\x04uuid\x18\x03 \x01(\t\x12\x13\n\x0b\x64ocument_id\x18\x04 \x01(\t\x12\x19\n\x11original_filename\x18\x05 \x01(\t\x12\x0f\n\x07\x64\x61taset\x18\x06 \x01(\t\x12\x0e\n\x06\x63lient\x18\x07 \x01(\t\x12)\n\x08verified\x18\x08 \x01(\x0b\x32\x17.google.protobuf.Struct\x12.\n\ncreated_at\x18\t \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12#\n\x07matches\x18\x0b \x03(\x0b\x32\x12.ocr.MatchResponse\x12\x0f\n\x07user_id\x18\x0c \x01(\t\"8\n\rMatchResponse\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0f\n\x07quality\x18\x02 \x01(\t\"\xe0\x01\n\x10\x44ocumentResponse\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12.\n\ncreated_at\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x0b\n\x03src\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12\x11\n\tsignature\x18\x06 \x01(\t\x12 \n\x05pages\x18\x07 \x03(\x0b\x32\x11.ocr.PageResponse\x12\x0f\n\x07user_id\x18\x08 \x01(\t\"\xb1\x01\n\x0cPageResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05\x61reas\x18\x06 \x03(\x0b\x32\x11.ocr.AreaResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xbb\x01\n\x0c\x41reaResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12*\n\nparagraphs\x18\x06 \x03(\x0b\x32\x16.ocr.ParagraphResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xb6\x01\n\x11ParagraphResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05lines\x18\x06 \x03(\x0b\x32\x11.ocr.LineResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\"\xc5\x01\n\x0cLineResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12 \n\x05words\x18\x06 \x03(\x0b\x32\x11.ocr.WordResponse\x12\x16\n\x0e\x63orrected_text\x18\x07 \x01(\t\x12\x12\n\nline_class\x18\x08 \x01(\x05\"\x8f\x01\n\x0cWordResponse\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12&\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x18.ocr.BoundingBoxResponse\x12\x0f\n\x07hocr_id\x18\x04 \x01(\t\x12\x0c\n\x04uuid\x18\x05 \x01(\t\x12\x16\n\x0e\x63orrected_text\x18\x06 \x01(\t\"e\n\x13\x42oundingBoxResponse\x12$\n\x08top_left\x18\x01 \x01(\x0b\x32\x12.ocr.PointResponse\x12(\n\x0c\x62ottom_right\x18\x02 \x01(\x0b\x32\x12.ocr.PointResponse\"%\n\rPointResponse\x12\t\n\x01x\x18\x01 \x01(\x05\x12\t\n\x01y\x18\x02 \x01(\x05*P\n\rDocumentDepth\x12\x0e\n\nFULL_DEPTH\x10\x00\x12\t\n\x05PAGES\x10\x01\x12\t\n\x05\x41REAS\x10\x02\x12\x0e\n\nPARAGRAPHS\x10\x03\x12\t\n\x05LINES\x10\x04\x32\xce\t\n\x07\x44\x61taset\x12\x45\n\x0eGetOneDocument\x12\x1a.ocr.GetOneDocumentRequest\x1a\x15.ocr.DocumentResponse\"\x00\x12K\n\x10GetManyDocuments\x12\x1c.ocr.GetManyDocumentsRequest\x1a\x15.ocr.DocumentResponse\"\x00\x30\x01\x12Q\n\x12GetOneDocumentInfo\x12\x1e.ocr.GetOneDocumentInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x12W\n\x14GetManyDocumentsInfo\x12 .ocr.GetManyDocumentsInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x30\x01\x12U\n\x13GetAllDocumentsInfo\x12\x1f.ocr.GetAllDocumentsInfoRequest\x1a\x19.ocr.DocumentInfoResponse\"\x00\x30\x01\x12T\n\x13GetOneDocumentImage\x12\x1f.ocr.GetOneDocumentImageRequest\x1a\x1a.ocr.DocumentImageResponse\"\x00\x12]\n\x18GetOneDocumentImageBytes\x12$.ocr.GetOneDocumentImageBytesRequest\x1a\x17.ocr.ImageBytesResponse\"\x00\x30\x01\x12Z\n\x13UpdateDocumentLines\x12\x1f.ocr.UpdateDocumentLinesRequest\x1a .ocr.UpdateDocumentLinesResponse\"\x00\x12\x62\n\x19StreamDocumentLineUpdates\x12\x1f.ocr.UpdateDocumentLinesRequest\x1a .ocr.UpdateDocumentLinesResponse\"\x00(\x01\x12J\n\x0eGetOneLineCrop\x12\x1a.ocr.GetOneLineCropRequest\x1a\x1a.ocr.DocumentImageResponse\"\x00\x12K\n\x10GetManyLineCrops\x12\x1c.ocr.GetManyLineCropsRequest\x1a\x15.ocr.LineCropResponse\"\x00\x30\x01\x12Q\n\x13GetOneLineCropBytes\x12\x1f.ocr.GetOneLineCropBytesRequest\x1a\x17.ocr.ImageBytesResponse\"\x00\x12W\n\x13GetDocumentsMetrics\x12\x1f.ocr.GetDocumentsMetricsRequest\x1a\x1d.ocr.DocumentsMetricsResponse\"\x00\x12r\n\x1bInvalidateAccessConstraints\x12\'.ocr.InvalidateAccessConstraintsRequest\x1a(.ocr.InvalidateAccessConstraintsResponse\"\x00\x62\x06proto3'
   ,
-  dependencies=[google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
+  dependencies=[google_dot_protobuf_dot_timestamp__pb2.DESCRIPTOR,google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,google_dot_protobuf_dot_field__mask__pb2.DESCRIPTOR,])
 
+_DOCUMENTDEPTH = _descriptor.EnumDescriptor(
+  name='DocumentDepth',
+  full_name='ocr.DocumentDepth',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='FULL_DEPTH', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='PAGES', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='AREAS', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='PARAGRAPHS', index=3, number=3,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='LINES', index=4, number=4,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=3650,
+  serialized_end=3730,
+)
+_sym_db.RegisterEnumDescriptor(_DOCUMENTDEPTH)
+
+DocumentDepth = enum_type_wrapper.EnumTypeWrapper(_DOCUMENTDEPTH)
+FULL_DEPTH = 0
+PAGES = 1
+AREAS = 2
+PARAGRAPHS = 3
+LINES = 4
 
 
 
@@ -48,6 +90,20 @@ _GETONEDOCUMENTREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='fieldMask', full_name='ocr.GetOneDocumentRequest.fieldMask', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='depth', full_name='ocr.GetOneDocumentRequest.depth', index=3,
+      number=4, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -60,8 +116,8 @@ _GETONEDOCUMENTREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=85,
-  serialized_end=146,
+  serialized_start=120,
+  serialized_end=263,
 )
 
 
@@ -86,6 +142,20 @@ _GETMANYDOCUMENTSREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='fieldMask', full_name='ocr.GetManyDocumentsRequest.fieldMask', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='depth', full_name='ocr.GetManyDocumentsRequest.depth', index=3,
+      number=4, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -98,8 +168,8 @@ _GETMANYDOCUMENTSREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=148,
-  serialized_end=212,
+  serialized_start=266,
+  serialized_end=412,
 )
 
 
@@ -136,8 +206,8 @@ _GETONEDOCUMENTINFOREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=214,
-  serialized_end=279,
+  serialized_start=414,
+  serialized_end=479,
 )
 
 
@@ -174,8 +244,8 @@ _GETMANYDOCUMENTSINFOREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=281,
-  serialized_end=349,
+  serialized_start=481,
+  serialized_end=549,
 )
 
 
@@ -228,6 +298,13 @@ _GETALLDOCUMENTSINFOREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='pageToken', full_name='ocr.GetAllDocumentsInfoRequest.pageToken', index=6,
+      number=7, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -240,8 +317,8 @@ _GETALLDOCUMENTSINFOREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=352,
-  serialized_end=538,
+  serialized_start=552,
+  serialized_end=757,
 )
 
 
@@ -278,8 +355,98 @@ _GETONEDOCUMENTIMAGEREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=540,
-  serialized_end=606,
+  serialized_start=759,
+  serialized_end=825,
+)
+
+
+_IMAGEOPTIONS = _descriptor.Descriptor(
+  name='ImageOptions',
+  full_name='ocr.ImageOptions',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='maxSize', full_name='ocr.ImageOptions.maxSize', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='format', full_name='ocr.ImageOptions.format', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='quality', full_name='ocr.ImageOptions.quality', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=827,
+  serialized_end=891,
+)
+
+
+_GETONEDOCUMENTIMAGEBYTESREQUEST = _descriptor.Descriptor(
+  name='GetOneDocumentImageBytesRequest',
+  full_name='ocr.GetOneDocumentImageBytesRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='documentUuid', full_name='ocr.GetOneDocumentImageBytesRequest.documentUuid', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='userId', full_name='ocr.GetOneDocumentImageBytesRequest.userId', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='options', full_name='ocr.GetOneDocumentImageBytesRequest.options', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=893,
+  serialized_end=1000,
 )
 
 
@@ -323,8 +490,8 @@ _UPDATEDOCUMENTLINESREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=608,
-  serialized_end=713,
+  serialized_start=1002,
+  serialized_end=1107,
 )
 
 
@@ -361,8 +528,8 @@ _UPDATELINEREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=715,
-  serialized_end=762,
+  serialized_start=1109,
+  serialized_end=1156,
 )
 
 
@@ -406,8 +573,143 @@ _GETONELINECROPREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=764,
-  serialized_end=843,
+  serialized_start=1158,
+  serialized_end=1237,
+)
+
+
+_GETMANYLINECROPSREQUEST = _descriptor.Descriptor(
+  name='GetManyLineCropsRequest',
+  full_name='ocr.GetManyLineCropsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='documentUuid', full_name='ocr.GetManyLineCropsRequest.documentUuid', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='lineUuids', full_name='ocr.GetManyLineCropsRequest.lineUuids', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='userId', full_name='ocr.GetManyLineCropsRequest.userId', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1239,
+  serialized_end=1321,
+)
+
+
+_GETONELINECROPBYTESREQUEST = _descriptor.Descriptor(
+  name='GetOneLineCropBytesRequest',
+  full_name='ocr.GetOneLineCropBytesRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='documentUuid', full_name='ocr.GetOneLineCropBytesRequest.documentUuid', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='lineUuid', full_name='ocr.GetOneLineCropBytesRequest.lineUuid', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='userId', full_name='ocr.GetOneLineCropBytesRequest.userId', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='options', full_name='ocr.GetOneLineCropBytesRequest.options', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1323,
+  serialized_end=1443,
+)
+
+
+_LINECROPRESPONSE = _descriptor.Descriptor(
+  name='LineCropResponse',
+  full_name='ocr.LineCropResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='lineUuid', full_name='ocr.LineCropResponse.lineUuid', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='image', full_name='ocr.LineCropResponse.image', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1445,
+  serialized_end=1496,
 )
 
 
@@ -451,8 +753,8 @@ _GETDOCUMENTSMETRICSREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=846,
-  serialized_end=982,
+  serialized_start=1499,
+  serialized_end=1635,
 )
 
 
@@ -496,8 +798,70 @@ _DOCUMENTSMETRICSRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=984,
-  serialized_end=1070,
+  serialized_start=1637,
+  serialized_end=1723,
+)
+
+
+_INVALIDATEACCESSCONSTRAINTSREQUEST = _descriptor.Descriptor(
+  name='InvalidateAccessConstraintsRequest',
+  full_name='ocr.InvalidateAccessConstraintsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='userIds', full_name='ocr.InvalidateAccessConstraintsRequest.userIds', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1725,
+  serialized_end=1778,
+)
+
+
+_INVALIDATEACCESSCONSTRAINTSRESPONSE = _descriptor.Descriptor(
+  name='InvalidateAccessConstraintsResponse',
+  full_name='ocr.InvalidateAccessConstraintsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='count', full_name='ocr.InvalidateAccessConstraintsResponse.count', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1780,
+  serialized_end=1832,
 )
 
 
@@ -527,8 +891,46 @@ _DOCUMENTIMAGERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1072,
-  serialized_end=1110,
+  serialized_start=1834,
+  serialized_end=1872,
+)
+
+
+_IMAGEBYTESRESPONSE = _descriptor.Descriptor(
+  name='ImageBytesResponse',
+  full_name='ocr.ImageBytesResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='data', full_name='ocr.ImageBytesResponse.data', index=0,
+      number=1, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='contentType', full_name='ocr.ImageBytesResponse.contentType', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1874,
+  serialized_end=1929,
 )
 
 
@@ -558,8 +960,8 @@ _UPDATEDOCUMENTLINESRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1112,
-  serialized_end=1156,
+  serialized_start=1931,
+  serialized_end=1975,
 )
 
 
@@ -666,8 +1068,8 @@ _DOCUMENTINFORESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1159,
-  serialized_end=1501,
+  serialized_start=1978,
+  serialized_end=2320,
 )
 
 
@@ -704,8 +1106,8 @@ _MATCHRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1503,
-  serialized_end=1559,
+  serialized_start=2322,
+  serialized_end=2378,
 )
 
 
@@ -784,8 +1186,8 @@ _DOCUMENTRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1562,
-  serialized_end=1786,
+  serialized_start=2381,
+  serialized_end=2605,
 )
 
 
@@ -857,8 +1259,8 @@ _PAGERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1789,
-  serialized_end=1966,
+  serialized_start=2608,
+  serialized_end=2785,
 )
 
 
@@ -930,8 +1332,8 @@ _AREARESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1969,
-  serialized_end=2156,
+  serialized_start=2788,
+  serialized_end=2975,
 )
 
 
@@ -1003,8 +1405,8 @@ _PARAGRAPHRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2159,
-  serialized_end=2341,
+  serialized_start=2978,
+  serialized_end=3160,
 )
 
 
@@ -1083,8 +1485,8 @@ _LINERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2344,
-  serialized_end=2541,
+  serialized_start=3163,
+  serialized_end=3360,
 )
 
 
@@ -1149,8 +1551,8 @@ _WORDRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2544,
-  serialized_end=2687,
+  serialized_start=3363,
+  serialized_end=3506,
 )
 
 
@@ -1187,8 +1589,8 @@ _BOUNDINGBOXRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2689,
-  serialized_end=2790,
+  serialized_start=3508,
+  serialized_end=3609,
 )
 
 
@@ -1225,13 +1627,19 @@ _POINTRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2792,
-  serialized_end=2829,
+  serialized_start=3611,
+  serialized_end=3648,
 )
 
+_GETONEDOCUMENTREQUEST.fields_by_name['fieldMask'].message_type = google_dot_protobuf_dot_field__mask__pb2._FIELDMASK
+_GETONEDOCUMENTREQUEST.fields_by_name['depth'].enum_type = _DOCUMENTDEPTH
+_GETMANYDOCUMENTSREQUEST.fields_by_name['fieldMask'].message_type = google_dot_protobuf_dot_field__mask__pb2._FIELDMASK
+_GETMANYDOCUMENTSREQUEST.fields_by_name['depth'].enum_type = _DOCUMENTDEPTH
 _GETALLDOCUMENTSINFOREQUEST.fields_by_name['startDate'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _GETALLDOCUMENTSINFOREQUEST.fields_by_name['endDate'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
+_GETONEDOCUMENTIMAGEBYTESREQUEST.fields_by_name['options'].message_type = _IMAGEOPTIONS
 _UPDATEDOCUMENTLINESREQUEST.fields_by_name['lines'].message_type = _UPDATELINEREQUEST
+_GETONELINECROPBYTESREQUEST.fields_by_name['options'].message_type = _IMAGEOPTIONS
 _GETDOCUMENTSMETRICSREQUEST.fields_by_name['startDate'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _GETDOCUMENTSMETRICSREQUEST.fields_by_name['endDate'].message_type = google_dot_protobuf_dot_timestamp__pb2._TIMESTAMP
 _DOCUMENTINFORESPONSE.fields_by_name['verified'].message_type = google_dot_protobuf_dot_struct__pb2._STRUCT
@@ -1258,12 +1666,20 @@ DESCRIPTOR.message_types_by_name['GetOneDocumentInfoRequest'] = _GETONEDOCUMENTI
 DESCRIPTOR.message_types_by_name['GetManyDocumentsInfoRequest'] = _GETMANYDOCUMENTSINFOREQUEST
 DESCRIPTOR.message_types_by_name['GetAllDocumentsInfoRequest'] = _GETALLDOCUMENTSINFOREQUEST
 DESCRIPTOR.message_types_by_name['GetOneDocumentImageRequest'] = _GETONEDOCUMENTIMAGEREQUEST
+DESCRIPTOR.message_types_by_name['ImageOptions'] = _IMAGEOPTIONS
+DESCRIPTOR.message_types_by_name['GetOneDocumentImageBytesRequest'] = _GETONEDOCUMENTIMAGEBYTESREQUEST
 DESCRIPTOR.message_types_by_name['UpdateDocumentLinesRequest'] = _UPDATEDOCUMENTLINESREQUEST
 DESCRIPTOR.message_types_by_name['UpdateLineRequest'] = _UPDATELINEREQUEST
 DESCRIPTOR.message_types_by_name['GetOneLineCropRequest'] = _GETONELINECROPREQUEST
+DESCRIPTOR.message_types_by_name['GetManyLineCropsRequest'] = _GETMANYLINECROPSREQUEST
+DESCRIPTOR.message_types_by_name['GetOneLineCropBytesRequest'] = _GETONELINECROPBYTESREQUEST
+DESCRIPTOR.message_types_by_name['LineCropResponse'] = _LINECROPRESPONSE
 DESCRIPTOR.message_types_by_name['GetDocumentsMetricsRequest'] = _GETDOCUMENTSMETRICSREQUEST
 DESCRIPTOR.message_types_by_name['DocumentsMetricsResponse'] = _DOCUMENTSMETRICSRESPONSE
+DESCRIPTOR.message_types_by_name['InvalidateAccessConstraintsRequest'] = _INVALIDATEACCESSCONSTRAINTSREQUEST
+DESCRIPTOR.message_types_by_name['InvalidateAccessConstraintsResponse'] = _INVALIDATEACCESSCONSTRAINTSRESPONSE
 DESCRIPTOR.message_types_by_name['DocumentImageResponse'] = _DOCUMENTIMAGERESPONSE
+DESCRIPTOR.message_types_by_name['ImageBytesResponse'] = _IMAGEBYTESRESPONSE
 DESCRIPTOR.message_types_by_name['UpdateDocumentLinesResponse'] = _UPDATEDOCUMENTLINESRESPONSE
 DESCRIPTOR.message_types_by_name['DocumentInfoResponse'] = _DOCUMENTINFORESPONSE
 DESCRIPTOR.message_types_by_name['MatchResponse'] = _MATCHRESPONSE
@@ -1275,6 +1691,7 @@ DESCRIPTOR.message_types_by_name['LineResponse'] = _LINERESPONSE
 DESCRIPTOR.message_types_by_name['WordResponse'] = _WORDRESPONSE
 DESCRIPTOR.message_types_by_name['BoundingBoxResponse'] = _BOUNDINGBOXRESPONSE
 DESCRIPTOR.message_types_by_name['PointResponse'] = _POINTRESPONSE
+DESCRIPTOR.enum_types_by_name['DocumentDepth'] = _DOCUMENTDEPTH
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 GetOneDocumentRequest = _reflection.GeneratedProtocolMessageType('GetOneDocumentRequest', (_message.Message,), {
@@ -1319,6 +1736,20 @@ GetOneDocumentImageRequest = _reflection.GeneratedProtocolMessageType('GetOneDoc
   })
 _sym_db.RegisterMessage(GetOneDocumentImageRequest)
 
+ImageOptions = _reflection.GeneratedProtocolMessageType('ImageOptions', (_message.Message,), {
+  'DESCRIPTOR' : _IMAGEOPTIONS,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.ImageOptions)
+  })
+_sym_db.RegisterMessage(ImageOptions)
+
+GetOneDocumentImageBytesRequest = _reflection.GeneratedProtocolMessageType('GetOneDocumentImageBytesRequest', (_message.Message,), {
+  'DESCRIPTOR' : _GETONEDOCUMENTIMAGEBYTESREQUEST,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.GetOneDocumentImageBytesRequest)
+  })
+_sym_db.RegisterMessage(GetOneDocumentImageBytesRequest)
+
 UpdateDocumentLinesRequest = _reflection.GeneratedProtocolMessageType('UpdateDocumentLinesRequest', (_message.Message,), {
   'DESCRIPTOR' : _UPDATEDOCUMENTLINESREQUEST,
   '__module__' : 'dataset_pb2'
@@ -1340,6 +1771,27 @@ GetOneLineCropRequest = _reflection.GeneratedProtocolMessageType('GetOneLineCrop
   })
 _sym_db.RegisterMessage(GetOneLineCropRequest)
 
+GetManyLineCropsRequest = _reflection.GeneratedProtocolMessageType('GetManyLineCropsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _GETMANYLINECROPSREQUEST,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.GetManyLineCropsRequest)
+  })
+_sym_db.RegisterMessage(GetManyLineCropsRequest)
+
+GetOneLineCropBytesRequest = _reflection.GeneratedProtocolMessageType('GetOneLineCropBytesRequest', (_message.Message,), {
+  'DESCRIPTOR' : _GETONELINECROPBYTESREQUEST,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.GetOneLineCropBytesRequest)
+  })
+_sym_db.RegisterMessage(GetOneLineCropBytesRequest)
+
+LineCropResponse = _reflection.GeneratedProtocolMessageType('LineCropResponse', (_message.Message,), {
+  'DESCRIPTOR' : _LINECROPRESPONSE,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.LineCropResponse)
+  })
+_sym_db.RegisterMessage(LineCropResponse)
+
 GetDocumentsMetricsRequest = _reflection.GeneratedProtocolMessageType('GetDocumentsMetricsRequest', (_message.Message,), {
   'DESCRIPTOR' : _GETDOCUMENTSMETRICSREQUEST,
   '__module__' : 'dataset_pb2'
@@ -1354,6 +1806,20 @@ DocumentsMetricsResponse = _reflection.GeneratedProtocolMessageType('DocumentsMe
   })
 _sym_db.RegisterMessage(DocumentsMetricsResponse)
 
+InvalidateAccessConstraintsRequest = _reflection.GeneratedProtocolMessageType('InvalidateAccessConstraintsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _INVALIDATEACCESSCONSTRAINTSREQUEST,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.InvalidateAccessConstraintsRequest)
+  })
+_sym_db.RegisterMessage(InvalidateAccessConstraintsRequest)
+
+InvalidateAccessConstraintsResponse = _reflection.GeneratedProtocolMessageType('InvalidateAccessConstraintsResponse', (_message.Message,), {
+  'DESCRIPTOR' : _INVALIDATEACCESSCONSTRAINTSRESPONSE,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.InvalidateAccessConstraintsResponse)
+  })
+_sym_db.RegisterMessage(InvalidateAccessConstraintsResponse)
+
 DocumentImageResponse = _reflection.GeneratedProtocolMessageType('DocumentImageResponse', (_message.Message,), {
   'DESCRIPTOR' : _DOCUMENTIMAGERESPONSE,
   '__module__' : 'dataset_pb2'
@@ -1361,6 +1827,13 @@ DocumentImageResponse = _reflection.GeneratedProtocolMessageType('DocumentImageR
   })
 _sym_db.RegisterMessage(DocumentImageResponse)
 
+ImageBytesResponse = _reflection.GeneratedProtocolMessageType('ImageBytesResponse', (_message.Message,), {
+  'DESCRIPTOR' : _IMAGEBYTESRESPONSE,
+  '__module__' : 'dataset_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.ImageBytesResponse)
+  })
+_sym_db.RegisterMessage(ImageBytesResponse)
+
 UpdateDocumentLinesResponse = _reflection.GeneratedProtocolMessageType('UpdateDocumentLinesResponse', (_message.Message,), {
   'DESCRIPTOR' : _UPDATEDOCUMENTLINESRESPONSE,
   '__module__' : 'dataset_pb2'
@@ -1446,8 +1919,8 @@ _DATASET = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=2832,
-  serialized_end=3591,
+  serialized_start=3733,
+  serialized_end=4963,
   methods=[
   _descriptor.MethodDescriptor(
     name='GetOneDocument',
@@ -1503,10 +1976,28 @@ _DATASET = _descriptor.ServiceDescriptor(
     output_type=_DOCUMENTIMAGERESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='GetOneDocumentImageBytes',
+    full_name='ocr.Dataset.GetOneDocumentImageBytes',
+    index=6,
+    containing_service=None,
+    input_type=_GETONEDOCUMENTIMAGEBYTESREQUEST,
+    output_type=_IMAGEBYTESRESPONSE,
+    serialized_options=None,
+  ),
   _descriptor.MethodDescriptor(
     name='UpdateDocumentLines',
     full_name='ocr.Dataset.UpdateDocumentLines',
-    index=6,
+    index=7,
+    containing_service=None,
+    input_type=_UPDATEDOCUMENTLINESREQUEST,
+    output_type=_UPDATEDOCUMENTLINESRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='StreamDocumentLineUpdates',
+    full_name='ocr.Dataset.StreamDocumentLineUpdates',
+    index=8,
     containing_service=None,
     input_type=_UPDATEDOCUMENTLINESREQUEST,
     output_type=_UPDATEDOCUMENTLINESRESPONSE,
@@ -1515,21 +2006,48 @@ _DATASET = _descriptor.ServiceDescriptor(
   _descriptor.MethodDescriptor(
     name='GetOneLineCrop',
     full_name='ocr.Dataset.GetOneLineCrop',
-    index=7,
+    index=9,
     containing_service=None,
     input_type=_GETONELINECROPREQUEST,
     output_type=_DOCUMENTIMAGERESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='GetManyLineCrops',
+    full_name='ocr.Dataset.GetManyLineCrops',
+    index=10,
+    containing_service=None,
+    input_type=_GETMANYLINECROPSREQUEST,
+    output_type=_LINECROPRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='GetOneLineCropBytes',
+    full_name='ocr.Dataset.GetOneLineCropBytes',
+    index=11,
+    containing_service=None,
+    input_type=_GETONELINECROPBYTESREQUEST,
+    output_type=_IMAGEBYTESRESPONSE,
+    serialized_options=None,
+  ),
   _descriptor.MethodDescriptor(
     name='GetDocumentsMetrics',
     full_name='ocr.Dataset.GetDocumentsMetrics',
-    index=8,
+    index=12,
     containing_service=None,
     input_type=_GETDOCUMENTSMETRICSREQUEST,
     output_type=_DOCUMENTSMETRICSRESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='InvalidateAccessConstraints',
+    full_name='ocr.Dataset.InvalidateAccessConstraints',
+    index=13,
+    containing_service=None,
+    input_type=_INVALIDATEACCESSCONSTRAINTSREQUEST,
+    output_type=_INVALIDATEACCESSCONSTRAINTSRESPONSE,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_DATASET)
 
@@ -44,21 +44,46 @@ class DatasetStub(object):
         request_serializer=dataset__pb2.GetOneDocumentImageRequest.SerializeToString,
         response_deserializer=dataset__pb2.DocumentImageResponse.FromString,
         )
+    self.GetOneDocumentImageBytes = channel.unary_stream(
+        '/ocr.Dataset/GetOneDocumentImageBytes',
+        request_serializer=dataset__pb2.GetOneDocumentImageBytesRequest.SerializeToString,
+        response_deserializer=dataset__pb2.ImageBytesResponse.FromString,
+        )
     self.UpdateDocumentLines = channel.unary_unary(
         '/ocr.Dataset/UpdateDocumentLines',
         request_serializer=dataset__pb2.UpdateDocumentLinesRequest.SerializeToString,
         response_deserializer=dataset__pb2.UpdateDocumentLinesResponse.FromString,
         )
+    self.StreamDocumentLineUpdates = channel.stream_unary(
+        '/ocr.Dataset/StreamDocumentLineUpdates',
+        request_serializer=dataset__pb2.UpdateDocumentLinesRequest.SerializeToString,
+        response_deserializer=dataset__pb2.UpdateDocumentLinesResponse.FromString,
+        )
     self.GetOneLineCrop = channel.unary_unary(
         '/ocr.Dataset/GetOneLineCrop',
         request_serializer=dataset__pb2.GetOneLineCropRequest.SerializeToString,
         response_deserializer=dataset__pb2.DocumentImageResponse.FromString,
         )
+    self.GetManyLineCrops = channel.unary_stream(
+        '/ocr.Dataset/GetManyLineCrops',
+        request_serializer=dataset__pb2.GetManyLineCropsRequest.SerializeToString,
+        response_deserializer=dataset__pb2.LineCropResponse.FromString,
+        )
+    self.GetOneLineCropBytes = channel.unary_unary(
+        '/ocr.Dataset/GetOneLineCropBytes',
+        request_serializer=dataset__pb2.GetOneLineCropBytesRequest.SerializeToString,
+        response_deserializer=dataset__pb2.ImageBytesResponse.FromString,
+        )
     self.GetDocumentsMetrics = channel.unary_unary(
         '/ocr.Dataset/GetDocumentsMetrics',
         request_serializer=dataset__pb2.GetDocumentsMetricsRequest.SerializeToString,
         response_deserializer=dataset__pb2.DocumentsMetricsResponse.FromString,
         )
+    self.InvalidateAccessConstraints = channel.unary_unary(
+        '/ocr.Dataset/InvalidateAccessConstraints',
+        request_serializer=dataset__pb2.InvalidateAccessConstraintsRequest.SerializeToString,
+        response_deserializer=dataset__pb2.InvalidateAccessConstraintsResponse.FromString,
+        )
 
 
 class DatasetServicer(object):
@@ -107,6 +132,13 @@ class DatasetServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def GetOneDocumentImageBytes(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def UpdateDocumentLines(self, request, context):
     # missing associated documentation comment in .proto file
     pass
@@ -114,6 +146,13 @@ class DatasetServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def StreamDocumentLineUpdates(self, request_iterator, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def GetOneLineCrop(self, request, context):
     # missing associated documentation comment in .proto file
     pass
@@ -121,6 +160,20 @@ class DatasetServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def GetManyLineCrops(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def GetOneLineCropBytes(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def GetDocumentsMetrics(self, request, context):
     # missing associated documentation comment in .proto file
     pass
@@ -128,6 +181,13 @@ class DatasetServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def InvalidateAccessConstraints(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_DatasetServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -161,21 +221,46 @@ def add_DatasetServicer_to_server(servicer, server):
           request_deserializer=dataset__pb2.GetOneDocumentImageRequest.FromString,
           response_serializer=dataset__pb2.DocumentImageResponse.SerializeToString,
       ),
+      'GetOneDocumentImageBytes': grpc.unary_stream_rpc_method_handler(
+          servicer.GetOneDocumentImageBytes,
+          request_deserializer=dataset__pb2.GetOneDocumentImageBytesRequest.FromString,
+          response_serializer=dataset__pb2.ImageBytesResponse.SerializeToString,
+      ),
       'UpdateDocumentLines': grpc.unary_unary_rpc_method_handler(
           servicer.UpdateDocumentLines,
           request_deserializer=dataset__pb2.UpdateDocumentLinesRequest.FromString,
           response_serializer=dataset__pb2.UpdateDocumentLinesResponse.SerializeToString,
       ),
+      'StreamDocumentLineUpdates': grpc.stream_unary_rpc_method_handler(
+          servicer.StreamDocumentLineUpdates,
+          request_deserializer=dataset__pb2.UpdateDocumentLinesRequest.FromString,
+          response_serializer=dataset__pb2.UpdateDocumentLinesResponse.SerializeToString,
+      ),
       'GetOneLineCrop': grpc.unary_unary_rpc_method_handler(
           servicer.GetOneLineCrop,
           request_deserializer=dataset__pb2.GetOneLineCropRequest.FromString,
           response_serializer=dataset__pb2.DocumentImageResponse.SerializeToString,
       ),
+      'GetManyLineCrops': grpc.unary_stream_rpc_method_handler(
+          servicer.GetManyLineCrops,
+          request_deserializer=dataset__pb2.GetManyLineCropsRequest.FromString,
+          response_serializer=dataset__pb2.LineCropResponse.SerializeToString,
+      ),
+      'GetOneLineCropBytes': grpc.unary_unary_rpc_method_handler(
+          servicer.GetOneLineCropBytes,
+          request_deserializer=dataset__pb2.GetOneLineCropBytesRequest.FromString,
+          response_serializer=dataset__pb2.ImageBytesResponse.SerializeToString,
+      ),
       'GetDocumentsMetrics': grpc.unary_unary_rpc_method_handler(
           servicer.GetDocumentsMetrics,
           request_deserializer=dataset__pb2.GetDocumentsMetricsRequest.FromString,
           response_serializer=dataset__pb2.DocumentsMetricsResponse.SerializeToString,
       ),
+      'InvalidateAccessConstraints': grpc.unary_unary_rpc_method_handler(
+          servicer.InvalidateAccessConstraints,
+          request_deserializer=dataset__pb2.InvalidateAccessConstraintsRequest.FromString,
+          response_serializer=dataset__pb2.InvalidateAccessConstraintsResponse.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'ocr.Dataset', rpc_method_handlers)
@@ -1,12 +1,13 @@
 import grpc
+import queue
 import logging
 import datetime
+import threading
 from concurrent import futures
 
 from bson import json_util, ObjectId
 import string
 
-from models.hocr import Document, Page
 from models.interface.mongodao import MongoDAO
 from database.mongo import make_db
 from utils.configmanager import ConfigManager
@@ -14,55 +15,45 @@ from utils.configmanager import ConfigManager
 from dataset_pb2 import (
     DocumentInfoResponse,
     DocumentResponse,
-    PageResponse,
-    AreaResponse,
-    ParagraphResponse,
-    LineResponse,
-    WordResponse,
-    BoundingBoxResponse,
-    PointResponse,
     DocumentImageResponse,
     UpdateDocumentLinesResponse,
-    MatchResponse,
     DocumentsMetricsResponse,
+    InvalidateAccessConstraintsResponse,
+    LineCropResponse,
+    ImageBytesResponse,
 )
 from dataset_pb2_grpc import DatasetServicer, add_DatasetServicer_to_server
-from google.protobuf.timestamp_pb2 import Timestamp
 from google.protobuf.struct_pb2 import Struct
+from service.common.converters import make_pb
+from projections import document_projection
+from line_crops import (
+    line_index_field,
+    build_line_index,
+    line_index_projection,
+    crop_line,
+    image_cache,
+)
+from line_updates import LineUpdateBatch, request_lines, read_requests, uuid_index
+from image_renders import render_options, render, content_types, iter_chunks, iter_file_chunks, render_cache
 from utils.files import extension
 from utils.image import DATA_URL_PREFIX, image_to_base64
 from tasks.dataset_event_handler import (
     retrieve_image,
     make_image_route,
-    _update_document_lines,
-    line_generator,
 )  # TODO: Refactor location of functions
 
 from logging import warning
 from service.user_identity.user_identity_client import GRPCUserIdentityClient
+from service.common.server import make_server, server_mode
+from service.common.access_constraints import access_constraint_cache
+from service.common.metrics import user_created_at_index, matched, metrics_pipeline, read_metrics
+from service.common.rollups import MetricsRollup, rollups_enabled
+from service.common.pagination import sort_keys, sort_index, after_page_token, trailing_page_token
 
 identity_grpc_client = GRPCUserIdentityClient()
 
-nested_fields = {
-    "pages": PageResponse,
-    "areas": AreaResponse,
-    "paragraphs": ParagraphResponse,
-    "lines": LineResponse,
-    "words": WordResponse,
-    "matches": MatchResponse,
-}
-
-nested_field = {
-    "bbox": BoundingBoxResponse,
-    "top_left": PointResponse,
-    "bottom_right": PointResponse,
-}
-
 
-def dt_to_pb(dt):
-    pb = Timestamp()
-    pb.FromDatetime(dt)
-    return pb
+documents_counters = {"total": True, "matched": matched}
 
 
 def document_info_handler(d, message_type):
@@ -75,41 +66,37 @@ def document_info_handler(d, message_type):
     return d
 
 
-def make_pb(d, message_type, special_cases_handler=None):
-    if special_cases_handler:
-        d = special_cases_handler(d, message_type)
-    for key, value in d.items():
-        if key in nested_fields:
-            d[key] = [make_pb(item, nested_fields[key]) for item in d[key]]
-        if key in nested_field:
-            d[key] = make_pb(value, nested_field[key])
-        if isinstance(value, ObjectId):
-            d[key] = str(value)
-        if isinstance(value, datetime.datetime):
-            d[key] = dt_to_pb(value)
-    return message_type(**d)
-
-
 class GRPCDataset(DatasetServicer):
     _db = None
     _doc_dao = None
     _info_dao = None
+    _rollup = None
 
     def __init__(self):
         self._db = make_db(ConfigManager.get_config_value("database", "mongo-dataset"))
         self._doc_dao = MongoDAO(self._db["documents"])
         self._info_dao = MongoDAO(self._db["dataset"])
+        self._rollup = MetricsRollup(self._db["dataset"], self._db["dataset_metrics_rollup"], documents_counters)
+
+    def ensure_indexes(self):
+        self._db["dataset"].create_index(user_created_at_index)
+        self._db["dataset"].create_index(sort_index)
+        self._db["dataset"].create_index(uuid_index)
+        self._db["documents"].create_index(uuid_index)
+        self._rollup.ensure_indexes()
 
     def GetOneDocument(self, request, context):
         filters = self._get_request_access_constraint(request)
         filters["uuid"] = request.documentUuid
-        document = self._doc_dao.get_first(filters=filters)
+        projection = self._get_request_projection(request, context)
+        document = self._db["documents"].find_one(filters, projection)
         return make_pb(document or {}, DocumentResponse)
 
     def GetManyDocuments(self, request, context):
         filters = self._get_request_access_constraint(request)
         filters["uuid"] = {"$in": list(request.documentUuids)}
-        documents = self._doc_dao.get_many_by(filters)
+        projection = self._get_request_projection(request, context)
+        documents = self._db["documents"].find(filters, projection)
         for document in documents:
             yield make_pb(document, DocumentResponse)
 
@@ -138,11 +125,16 @@ class GRPCDataset(DatasetServicer):
             filters["matches"] = {"$size": 0}
         if with_matches == True:
             filters["matches"] = {"$not": {"$size": 0}}
-        docs_info = self._info_dao.get_many_by(
-            filters=filters, skip=request.skip, limit=request.limit, sort_by="created_at"
-        )
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        docs_info = self._db["dataset"].find(filters, skip=request.skip, limit=request.limit).sort(sort_keys)
+        last, count = None, 0
         for info in docs_info:
+            last, count = info, count + 1
             yield make_pb(info, DocumentInfoResponse, document_info_handler)
+        context.set_trailing_metadata(trailing_page_token(last, count, request.limit))
 
     def GetOneDocumentImage(self, request, context):
         filters = self._get_request_access_constraint(request)
@@ -156,62 +148,178 @@ class GRPCDataset(DatasetServicer):
             return DocumentImageResponse(image=image_to_base64(img, prefix=DATA_URL_PREFIX))
         return DocumentImageResponse(image="")
 
-    def UpdateDocumentLines(self, request, context):
+    def GetOneDocumentImageBytes(self, request, context):
+        max_size, fmt, quality = self._get_request_render_options(request, context)
         filters = self._get_request_access_constraint(request)
-        doc_info = self._info_dao.get_first(filters)
-        if not doc_info:
-            return UpdateDocumentLinesResponse(count=0)
+        filters["uuid"] = request.documentUuid
+        if not self._info_dao.get_first(filters):
+            return
+        content_type = content_types[fmt]
+        key = render_cache.key(request.documentUuid, max_size, fmt, quality)
+        f = render_cache.get(key)
+        if f:
+            chunks = iter_file_chunks(f)
+        else:
+            image = self._get_document_image(request.documentUuid)
+            if not image:
+                return
+            data = render(image, max_size, fmt, quality)
+            render_cache.put(key, data)
+            chunks = iter_chunks(data)
+        for chunk in chunks:
+            yield ImageBytesResponse(data=chunk, contentType=content_type)
+            content_type = ""
 
-        updated_count = _update_document_lines(
-            request.documentUuid,
-            [{"text": line.text, "uuid": line.uuid} for line in request.lines],
-            request.userId,
-        )
-        return UpdateDocumentLinesResponse(count=updated_count)
+    def UpdateDocumentLines(self, request, context):
+        if not self._has_document_access(request):
+            return UpdateDocumentLinesResponse(count=0)
+        batch = LineUpdateBatch()
+        batch.add(request.documentUuid, request_lines(request), request.userId)
+        return UpdateDocumentLinesResponse(count=self._write_line_updates(batch))
+
+    def StreamDocumentLineUpdates(self, request_iterator, context):
+        """Writes the streamed edits once a batch is full or its oldest edit is
+        DATASET_LINE_UPDATE_FLUSH_SECONDS old, even while the client sends nothing, and what is
+        left when the stream ends, even if the client went away."""
+        batch, access, count = LineUpdateBatch(), {}, 0
+        requests = queue.Queue()
+        threading.Thread(target=read_requests, args=(request_iterator, requests), daemon=True).start()
+        try:
+            while True:
+                try:
+                    request = requests.get(timeout=batch.wait_time())
+                except queue.Empty:
+                    count += self._write_line_updates(batch)
+                    continue
+                if request is None:
+                    break
+                if isinstance(request, Exception):
+                    raise request
+                key = (request.documentUuid, request.userId)
+                if key not in access:
+                    access[key] = self._has_document_access(request)
+                if access[key]:
+                    batch.add(request.documentUuid, request_lines(request), request.userId)
+                if batch.due():
+                    count += self._write_line_updates(batch)
+        finally:
+            count += self._write_line_updates(batch)
+        return UpdateDocumentLinesResponse(count=count)
 
     def GetOneLineCrop(self, request, context):
-        filters = self._get_request_access_constraint(request)
-        filters["uuid"] = request.documentUuid
-        document = self._doc_dao.get_first(filters)
-        if not document:
-            return DocumentImageResponse(image="")
-
-        document = Document.from_dict(document)
-        for line in line_generator(document):
-            if line.uuid == request.lineUuid:
-                info = self._info_dao.get_first({"uuid": request.documentUuid})
-                route = make_image_route(info)
-                image = retrieve_image(route)
-                if image:
-                    return DocumentImageResponse(
-                        image=image_to_base64(line.crop(image), prefix=DATA_URL_PREFIX)
-                    )
+        for _, crop in self._get_line_crops(request, [request.lineUuid]):
+            return DocumentImageResponse(image=image_to_base64(crop, prefix=DATA_URL_PREFIX))
         return DocumentImageResponse(image="")
 
+    def GetManyLineCrops(self, request, context):
+        for line_uuid, crop in self._get_line_crops(request, list(request.lineUuids)):
+            yield LineCropResponse(lineUuid=line_uuid, image=image_to_base64(crop, prefix=DATA_URL_PREFIX))
+
+    def GetOneLineCropBytes(self, request, context):
+        max_size, fmt, quality = self._get_request_render_options(request, context)
+        for _, crop in self._get_line_crops(request, [request.lineUuid]):
+            return ImageBytesResponse(data=render(crop, max_size, fmt, quality), contentType=content_types[fmt])
+        return ImageBytesResponse()
+
     def GetDocumentsMetrics(self, request, context):
         filters = self._get_request_access_constraint(request)
 
         end_date = request.endDate.ToDatetime()
         start_date = request.startDate.ToDatetime()
-        filters["created_at"] = {"$gte": start_date, "$lte": end_date}
-        total = self._info_dao.count(filters)
+        if rollups_enabled:
+            metrics = self._rollup.metrics(filters, start_date, end_date)
+        else:
+            filters["created_at"] = {"$gte": start_date, "$lte": end_date}
+            results = self._db["dataset"].aggregate(metrics_pipeline(filters, documents_counters))
+            metrics = read_metrics(results, documents_counters)
+        return DocumentsMetricsResponse(
+            total=metrics["total"], matched=metrics["matched"], matched_all_fields=metrics["matched"]
+        )
 
-        filters["matches"] = {"$not": {"$size": 0}}
-        matched = self._info_dao.count(filters)
-        return DocumentsMetricsResponse(total=total, matched=matched, matched_all_fields=matched)
+    def InvalidateAccessConstraints(self, request, context):
+        count = access_constraint_cache.invalidate(list(request.userIds))
+        return InvalidateAccessConstraintsResponse(count=count)
 
     @staticmethod
     def _get_request_access_constraint(request):
         user_id = request.userId
         if user_id == "root":
             return {}
-        constraint = {'user_id': {'$in': identity_grpc_client.get_branch_office_associate_list(user_id)}}
+        associates = access_constraint_cache.get(user_id, identity_grpc_client.get_branch_office_associate_list)
+        constraint = {'user_id': {'$in': associates}}
         return constraint
 
+    def _has_document_access(self, request):
+        filters = self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        return self._db["dataset"].find_one(filters, {"_id": 1}) is not None
+
+    def _write_line_updates(self, batch):
+        """One bulk write of the batch; the number of lines found."""
+        operations = batch.take()
+        if not operations:
+            return 0
+        return self._db["documents"].bulk_write(operations, ordered=False).matched_count
+
+    def _get_line_crops(self, request, line_uuids):
+        """(line uuid, crop) of the requested lines found in the document, all cut from one
+        decoded image."""
+        filters = self._get_request_access_constraint(request)
+        filters["uuid"] = request.documentUuid
+        document = self._db["documents"].find_one(filters, line_index_projection(line_uuids))
+        if not document:
+            return []
+        index = document.get(line_index_field)
+        if index is None or any(line_uuid not in index for line_uuid in line_uuids):
+            # No index yet, or one built before the lines asked for: documents processed again
+            # outside this service don't update it.
+            index = self._store_line_index({"_id": document["_id"]})
+        entries = [(line_uuid, index[line_uuid]) for line_uuid in line_uuids if line_uuid in index]
+        if not entries:
+            return []
+        image = self._get_document_image(request.documentUuid)
+        if not image:
+            return []
+        return [(line_uuid, crop_line(image, entry)) for line_uuid, entry in entries]
+
+    def _store_line_index(self, filters):
+        """(Re)builds the line index of the document matching filters."""
+        document = self._doc_dao.get_first(filters=filters)
+        if not document:
+            return {}
+        index = build_line_index(document)
+        self._db["documents"].update_one({"_id": document["_id"]}, {"$set": {line_index_field: index}})
+        return index
+
+    def _get_document_image(self, document_uuid):
+        image = image_cache.get(document_uuid)
+        if image is None:
+            info = self._info_dao.get_first({"uuid": document_uuid})
+            image = retrieve_image(make_image_route(info)) if info else None
+            if image:
+                image_cache.put(document_uuid, image)
+        return image
+
+    @staticmethod
+    def _get_request_render_options(request, context):
+        try:
+            return render_options(request.options)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    @staticmethod
+    def _get_request_projection(request, context):
+        try:
+            return document_projection(request.fieldMask, request.depth)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), maximum_concurrent_rpcs=160)
-    add_DatasetServicer_to_server(GRPCDataset(), server)
+    server = make_server()
+    servicer = GRPCDataset()
+    servicer.ensure_indexes()
+    add_DatasetServicer_to_server(servicer, server)
     server.add_insecure_port("[::]:50052")
     print("Starting dataset gRPC server listening at '[::]:50052'...")
     server.start()
@@ -221,6 +329,12 @@ def serve():
 if __name__ == "__main__":
     logging.basicConfig()
     try:
-        serve()
+        if server_mode == "aio":
+            import asyncio
+            from dataset_aio_server import serve as aio_serve
+
+            asyncio.run(aio_serve())
+        else:
+            serve()
     except:
         print("GRPCDataset server is somewhere else...")
@@ -0,0 +1,204 @@
+import os
+import json
+import threading
+import multiprocessing
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from bson import json_util
+from logging import warning
+
+from dataset_pb2 import DocumentResponse
+from service.common.converters import make_pb
+from result_cache import CachedDetectionEngine, ResultCache, cache_max_bytes, cache_dir
+
+from ocr.text_detector import TextDetector
+
+execution_mode = os.environ.get("OCR_EXECUTION_MODE", "thread")
+thread_workers = int(os.environ.get("OCR_BATCH_WORKERS", 4))
+process_workers = int(os.environ.get("OCR_PROCESS_WORKERS", os.cpu_count() or 1))
+# Recycling workers after a number of tasks needs Python 3.11.
+process_max_tasks_per_child = int(os.environ.get("OCR_PROCESS_MAX_TASKS_PER_CHILD", 0)) or None
+process_queue_depth = int(os.environ.get("OCR_PROCESS_QUEUE_DEPTH", 64))
+# Seconds detect waits for a worker's result.
+process_timeout = float(os.environ.get("OCR_PROCESS_TIMEOUT", 300))
+warmup_image = os.environ.get("OCR_WARMUP_IMAGE")
+# Seconds warm_up waits for every worker process to have built its detector.
+warmup_timeout = float(os.environ.get("OCR_WARMUP_TIMEOUT", 600))
+
+
+class EngineBusy(Exception):
+    pass
+
+
+def run_warmup_image(detector, path=warmup_image):
+    if not path:
+        return
+    with open(path, "rb") as f:
+        detector.detect(filename=os.path.basename(path), data=f.read())
+
+
+def serialize_document(document, structured=False):
+    if structured:
+        return {"document": make_pb(document.to_dict(), DocumentResponse)}
+    return {"jsonString": json.dumps(document.to_dict(), default=json_util.default)}
+
+
+class ThreadDetectionEngine:
+    """Runs detection in the calling thread, or on a small thread pool for batches."""
+
+    _detector = None
+
+    def __init__(self, workers=thread_workers):
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self._detector_lock = threading.Lock()
+
+    @property
+    def detector(self):
+        if not self._detector:
+            with self._detector_lock:
+                if not self._detector:
+                    self._detector = TextDetector()
+        return self._detector
+
+    def warm_up(self):
+        run_warmup_image(self.detector)
+
+    def detect(self, filename, data, structured=False):
+        document = self.detector.detect(filename=filename, data=data)
+        return serialize_document(document, structured)
+
+    def submit(self, filename, data, structured=False):
+        return self._executor.submit(self.detect, filename, data, structured)
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+# Each worker process holds its own detector, built once by the pool initializer.
+_worker_detector = None
+_warmup_barrier = None
+
+
+def _init_worker(barrier):
+    global _worker_detector, _warmup_barrier
+    _worker_detector = TextDetector()
+    run_warmup_image(_worker_detector)
+    _warmup_barrier = barrier
+
+
+def _ping_worker(_):
+    # Holds its worker until every other one got a ping too, so the pings can't all be
+    # answered by the workers that happened to be ready first.
+    _warmup_barrier.wait(warmup_timeout)
+    return os.getpid()
+
+
+def _detect_in_worker(filename, shm_name, size, structured):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = shm.buf[:size]
+    try:
+        document = _worker_detector.detect(filename=filename, data=data)
+        return serialize_document(document, structured)
+    finally:
+        data.release()
+        shm.close()
+
+
+class ProcessDetectionEngine:
+    """Runs detection on a pool of worker processes so OCR is not bound by the GIL. Image
+    bytes are handed over through shared memory and gRPC threads only wait on the result.
+
+    A worker that dies fails the calls it had with BrokenProcessPool instead of leaving them
+    waiting, and the pool is replaced by a new one."""
+
+    def __init__(
+        self,
+        workers=process_workers,
+        max_tasks_per_child=process_max_tasks_per_child,
+        queue_depth=process_queue_depth,
+        timeout=process_timeout,
+    ):
+        self._workers = workers
+        self._max_tasks_per_child = max_tasks_per_child
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = self._make_executor()
+        self._slots = threading.BoundedSemaphore(queue_depth)
+
+    def _make_executor(self):
+        context = multiprocessing.get_context("spawn")
+        kwargs = {}
+        if self._max_tasks_per_child:
+            kwargs["max_tasks_per_child"] = self._max_tasks_per_child
+        return futures.ProcessPoolExecutor(
+            self._workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(context.Barrier(self._workers),),
+            **kwargs,
+        )
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            warning("OCR worker process died, starting a new pool")
+            self._executor = self._make_executor()
+        executor.shutdown(wait=False)
+
+    def warm_up(self):
+        """Returns once every worker has built its detector: workers only take tasks after their
+        initializer, and the pings meet at a barrier, one per worker. Raises
+        threading.BrokenBarrierError if they don't within warmup_timeout."""
+        list(self._executor.map(_ping_worker, range(self._workers)))
+
+    def detect(self, filename, data, structured=False):
+        """Raises concurrent.futures.TimeoutError when the result takes longer than timeout."""
+        return self.submit(filename, data, structured).result(self._timeout)
+
+    def submit(self, filename, data, structured=False):
+        if not self._slots.acquire(blocking=False):
+            future = futures.Future()
+            future.set_exception(EngineBusy("OCR queue is full"))
+            return future
+
+        size = len(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shm.buf[:size] = data
+        executor = self._executor
+
+        def release(done):
+            shm.close()
+            shm.unlink()
+            self._slots.release()
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._restart(executor)
+
+        try:
+            try:
+                future = executor.submit(_detect_in_worker, filename, shm.name, size, structured)
+            except BrokenProcessPool:
+                # A worker died since the last call, before its calls' callbacks replaced the pool.
+                self._restart(executor)
+                executor = self._executor
+                future = executor.submit(_detect_in_worker, filename, shm.name, size, structured)
+        except Exception as e:
+            future = futures.Future()
+            future.set_exception(e)
+        future.add_done_callback(release)
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+def make_engine(mode=execution_mode):
+    if mode == "process":
+        engine = ProcessDetectionEngine()
+    else:
+        engine = ThreadDetectionEngine()
+    if cache_max_bytes > 0 or cache_dir:
+        engine = CachedDetectionEngine(engine, ResultCache())
+    return engine
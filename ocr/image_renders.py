@@ -0,0 +1,125 @@
+import io
+import os
+import hashlib
+import tempfile
+import threading
+
+from logging import warning
+
+render_cache_dir = os.environ.get("DATASET_RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "dataset-renders"))
+render_cache_max_bytes = int(os.environ.get("DATASET_RENDER_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+image_chunk_size = int(os.environ.get("DATASET_IMAGE_CHUNK_SIZE", 256 * 1024))
+default_quality = 85
+
+content_types = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+def render_options(options):
+    """(max size, format, quality) out of an ImageOptions message. Raises ValueError on an
+    unsupported format."""
+    fmt = options.format.lower() or "jpeg"
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in content_types:
+        raise ValueError("Unsupported image format: %s" % options.format)
+    quality = min(max(options.quality or default_quality, 1), 95)
+    return max(options.maxSize, 0), fmt, quality
+
+
+def render(image, max_size, fmt, quality):
+    """Encodes image as fmt, scaled down to fit max_size x max_size when max_size is set."""
+    if max_size and max(image.size) > max_size:
+        image = image.copy()
+        image.thumbnail((max_size, max_size))
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def iter_chunks(data, chunk_size=image_chunk_size):
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start : start + chunk_size])
+
+
+def iter_file_chunks(f, chunk_size=image_chunk_size):
+    """The content of the open file f, which is closed once read."""
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class RenderCache:
+    """Rendered images on disk by (document uuid, size, format, quality). Files not used for the
+    longest time are removed once the directory grows over max_bytes."""
+
+    def __init__(self, directory=render_cache_dir, max_bytes=render_cache_max_bytes):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def key(self, document_uuid, max_size, fmt, quality):
+        name = "%s-%s-%s-%s" % (document_uuid, max_size, fmt, quality)
+        return hashlib.sha256(name.encode("utf-8")).hexdigest() + "." + fmt
+
+    def get(self, key):
+        """The cached render opened for reading, or None; the caller closes it. Opened here so
+        that a prune removing it in the meantime can't cut the read short."""
+        path = os.path.join(self._directory, key)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            os.utime(f.fileno())
+        except OSError:
+            pass
+        return f
+
+    def put(self, key, data):
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self._directory, key))
+        except OSError as e:
+            warning(e)
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._files())
+            else:
+                self._size += len(data)
+            if self._size > self._max_bytes:
+                self._prune()
+
+    def _files(self):
+        for entry in os.scandir(self._directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield entry.path, stat.st_size, stat.st_mtime
+
+    def _prune(self):
+        files = sorted(self._files(), key=lambda f: f[2])
+        self._size = sum(size for _, size, _ in files)
+        # Down to 90% so pruning doesn't run again on the next write.
+        for path, size, _ in files:
+            if self._size <= self._max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+
+render_cache = RenderCache()
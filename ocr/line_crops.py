@@ -0,0 +1,78 @@
+import os
+import threading
+from collections import OrderedDict
+
+image_cache_max_bytes = int(os.environ.get("DATASET_IMAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Stored on each documents entry: line uuid -> {"page": page number, "bbox": [x0, y0, x1, y1]}.
+# Crops only read the entries they need through a projection instead of the whole hOCR tree.
+line_index_field = "line_index"
+
+
+def _bbox(node):
+    bbox = node.get("bbox") or {}
+    top_left = bbox.get("top_left") or {}
+    bottom_right = bbox.get("bottom_right") or {}
+    return [top_left.get("x", 0), top_left.get("y", 0), bottom_right.get("x", 0), bottom_right.get("y", 0)]
+
+
+def build_line_index(document):
+    index = {}
+    for number, page in enumerate(document.get("pages") or []):
+        for area in page.get("areas") or []:
+            for paragraph in area.get("paragraphs") or []:
+                for line in paragraph.get("lines") or []:
+                    if line.get("uuid"):
+                        index[line["uuid"]] = {"page": number, "bbox": _bbox(line)}
+    return index
+
+
+def line_index_projection(line_uuids):
+    projection = {line_index_field + "." + line_uuid: 1 for line_uuid in line_uuids}
+    projection["uuid"] = 1
+    return projection
+
+
+def crop_line(image, entry):
+    return image.crop(tuple(entry["bbox"]))
+
+
+def image_size(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """Decoded document images by document uuid, least recently used first out once the decoded
+    size goes over max_bytes."""
+
+    def __init__(self, max_bytes=image_cache_max_bytes):
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        # Decode now: lazy loading isn't safe once the image is shared between requests.
+        image.load()
+        size = image_size(image)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= image_size(previous)
+            self._entries[key] = image
+            self._size += size
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= image_size(evicted)
+
+
+image_cache = ImageCache()
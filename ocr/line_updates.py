@@ -0,0 +1,98 @@
+import os
+import time
+import datetime
+
+from pymongo import UpdateOne
+
+line_update_batch_size = int(os.environ.get("DATASET_LINE_UPDATE_BATCH_SIZE", 500))
+line_update_flush_seconds = float(os.environ.get("DATASET_LINE_UPDATE_FLUSH_SECONDS", 1))
+
+# Looked up by uuid on every line update and crop.
+uuid_index = [("uuid", 1)]
+
+line_path = "pages.$[].areas.$[].paragraphs.$[].lines.$[line]"
+
+
+def line_update(document_uuid, line_uuid, text, user_id, now):
+    """Sets the text of one line of one document, with who edited it and when. The filter only
+    matches when the line exists, so the matched count of a bulk write is the number of lines
+    found."""
+    return UpdateOne(
+        {"uuid": document_uuid, "pages.areas.paragraphs.lines.uuid": line_uuid},
+        {
+            "$set": {
+                line_path + ".text": text,
+                line_path + ".updated_by": user_id,
+                line_path + ".updated_at": now,
+                "updated_at": now,
+            }
+        },
+        array_filters=[{"line.uuid": line_uuid}],
+    )
+
+
+def request_lines(request):
+    return [{"text": line.text, "uuid": line.uuid} for line in request.lines]
+
+
+def read_requests(request_iterator, requests):
+    """Moves a request stream into the requests queue, from a thread of its own so the handler
+    can flush on time while the client is idle. Ends with None, or the error that ended it."""
+    try:
+        for request in request_iterator:
+            requests.put(request)
+        requests.put(None)
+    except Exception as e:
+        requests.put(e)
+
+
+async def read_requests_async(request_iterator, requests):
+    """read_requests for a grpc.aio request stream and an asyncio.Queue, run as a task."""
+    try:
+        async for request in request_iterator:
+            requests.put_nowait(request)
+        requests.put_nowait(None)
+    except Exception as e:
+        requests.put_nowait(e)
+
+
+class LineUpdateBatch:
+    """Line edits waiting to be written in one bulk write. A line edited again before the write
+    only keeps its last text and editor."""
+
+    def __init__(self, max_size=line_update_batch_size, max_age=line_update_flush_seconds):
+        self._max_size = max_size
+        self._max_age = max_age
+        self._texts = {}
+        self._since = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, document_uuid, lines, user_id):
+        for line in lines:
+            self._texts[(document_uuid, line["uuid"])] = (line["text"], user_id)
+        if self._texts and self._since is None:
+            self._since = time.monotonic()
+
+    def due(self):
+        """True once the batch is full or its oldest edit has waited max_age seconds."""
+        if not self._texts:
+            return False
+        return len(self._texts) >= self._max_size or time.monotonic() - self._since >= self._max_age
+
+    def wait_time(self):
+        """Seconds until the oldest edit has waited max_age; None while the batch is empty."""
+        if not self._texts:
+            return None
+        return max(0.0, self._max_age - (time.monotonic() - self._since))
+
+    def take(self):
+        """The pending edits as bulk write operations, emptying the batch."""
+        now = datetime.datetime.utcnow()
+        operations = [
+            line_update(document, line, text, user_id, now)
+            for (document, line), (text, user_id) in self._texts.items()
+        ]
+        self._texts, self._since = {}, None
+        return operations
@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.insert(0, "/ocr/src/service/ocr")
+sys.path.insert(0, "/api-gateway/src/service/ocr")
+
+import grpc
+
+from service.ocr.ocr_pb2 import (
+    TextDetectionRequest,
+    BatchTextDetectionRequest,
+    TextDetectionChunk,
+    CacheStatsRequest,
+)
+from service.ocr.ocr_pb2_grpc import TextDetectorStub
+from service.common.channels import get_aio_channel
+from service.ocr.ocr_client import server_name, port, upload_chunk_size, GRPCTextDetectorClient
+
+from utils.image import image_to_bytes
+
+from logging import warning
+
+
+class AsyncGRPCTextDetectorClient:
+    """grpc.aio counterpart of GRPCTextDetectorClient. detect_batch is an async generator."""
+
+    stub = None
+    channel = None
+
+    def __init__(self):
+        self.channel = get_aio_channel(server_name + ":" + port)
+        self.stub = TextDetectorStub(self.channel)
+
+    async def close(self):
+        """Lets go of the channel. It is shared, so it stays open for the other clients:
+        close_aio_channels closes the pool at shutdown."""
+        self.channel = self.stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def detect(self, filename, data, structured=False):
+        if type(data) is not bytes and type(data) is not bytearray:
+            data = image_to_bytes(data)
+        resp = await self.stub.detect(
+            TextDetectionRequest(filename=filename, data=data, structured=structured)
+        )
+        return GRPCTextDetectorClient._parse_response(resp, structured)
+
+    async def detect_batch(self, items, structured=False):
+        def request_generator():
+            for index, (filename, data) in enumerate(items):
+                if type(data) is not bytes and type(data) is not bytearray:
+                    data = image_to_bytes(data)
+                yield BatchTextDetectionRequest(
+                    correlationId=str(index), filename=filename, data=data, structured=structured
+                )
+
+        async for resp in self.stub.detectBatch(request_generator()):
+            if resp.error:
+                warning(resp.error)
+                yield int(resp.correlationId), None
+            else:
+                yield int(resp.correlationId), GRPCTextDetectorClient._parse_response(resp, structured)
+
+    async def detect_upload(self, source, filename=None, chunk_size=upload_chunk_size, structured=False):
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return await self.detect_upload(f, filename or os.path.basename(source), chunk_size, structured)
+
+        filename = filename or os.path.basename(getattr(source, "name", "") or "")
+
+        def chunk_generator():
+            yield TextDetectionChunk(filename=filename, structured=structured, data=source.read(chunk_size))
+            for data in iter(lambda: source.read(chunk_size), b""):
+                yield TextDetectionChunk(data=data)
+
+        resp = await self.stub.detectUpload(chunk_generator())
+        return GRPCTextDetectorClient._parse_response(resp, structured)
+
+    async def get_cache_stats(self):
+        resp = await self.stub.getCacheStats(CacheStatsRequest())
+        return {
+            "hits": resp.hits,
+            "disk_hits": resp.disk_hits,
+            "misses": resp.misses,
+            "entries": resp.entries,
+            "size": resp.size,
+        }
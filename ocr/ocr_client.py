@@ -1,3 +1,4 @@
+import os
 import sys
 
 sys.path.insert(0, "/ocr/src/service/ocr")
@@ -6,28 +7,91 @@ sys.path.insert(0, "/api-gateway/src/service/ocr")
 import grpc
 import json
 
-from service.ocr.ocr_pb2 import TextDetectionRequest, JSONResponse
+from service.ocr.ocr_pb2 import (
+    TextDetectionRequest,
+    JSONResponse,
+    BatchTextDetectionRequest,
+    TextDetectionChunk,
+    CacheStatsRequest,
+)
 from service.ocr.ocr_pb2_grpc import TextDetectorStub
+from service.common.channels import get_channel
 
 from utils.image import image_to_bytes
 
+from logging import warning
+
 server_name = "ocr"
 port = "50051"
 
+# Keeps every message well under gRPC's default 4 MB limit.
+upload_chunk_size = 1024 * 1024
+
 
 class GRPCTextDetectorClient:
     stub = None
     channel = None
 
     def __init__(self):
-        self.channel = grpc.insecure_channel(server_name + ":" + port)
+        self.channel = get_channel(server_name + ":" + port)
         self.stub = TextDetectorStub(self.channel)
 
-    def __del__(self):
-        self.channel.close()
-
-    def detect(self, filename, data):
+    def detect(self, filename, data, structured=False):
+        """With structured=True the DocumentResponse message is returned as is, skipping the
+        JSON encode/decode round trip."""
         if type(data) is not bytes and type(data) is not bytearray:
             data = image_to_bytes(data)
-        resp = self.stub.detect(TextDetectionRequest(filename=filename, data=data))
+        resp = self.stub.detect(TextDetectionRequest(filename=filename, data=data, structured=structured))
+        return self._parse_response(resp, structured)
+
+    def detect_batch(self, items, structured=False):
+        """Yields (index, document) for each (filename, data) pair in items, in completion order.
+        Pages that failed on the server yield (index, None)."""
+
+        def request_generator():
+            for index, (filename, data) in enumerate(items):
+                if type(data) is not bytes and type(data) is not bytearray:
+                    data = image_to_bytes(data)
+                yield BatchTextDetectionRequest(
+                    correlationId=str(index), filename=filename, data=data, structured=structured
+                )
+
+        response_iterator = self.stub.detectBatch(request_generator())
+        for resp in response_iterator:
+            if resp.error:
+                warning(resp.error)
+                yield int(resp.correlationId), None
+            else:
+                yield int(resp.correlationId), self._parse_response(resp, structured)
+
+    def detect_upload(self, source, filename=None, chunk_size=upload_chunk_size, structured=False):
+        """Streams a file path or binary file-like object to the server in fixed-size chunks."""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return self.detect_upload(f, filename or os.path.basename(source), chunk_size, structured)
+
+        filename = filename or os.path.basename(getattr(source, "name", "") or "")
+
+        def chunk_generator():
+            yield TextDetectionChunk(filename=filename, structured=structured, data=source.read(chunk_size))
+            for data in iter(lambda: source.read(chunk_size), b""):
+                yield TextDetectionChunk(data=data)
+
+        resp = self.stub.detectUpload(chunk_generator())
+        return self._parse_response(resp, structured)
+
+    def get_cache_stats(self):
+        resp = self.stub.getCacheStats(CacheStatsRequest())
+        return {
+            "hits": resp.hits,
+            "disk_hits": resp.disk_hits,
+            "misses": resp.misses,
+            "entries": resp.entries,
+            "size": resp.size,
+        }
+
+    @staticmethod
+    def _parse_response(resp, structured):
+        if structured:
+            return resp.document
         return json.loads(resp.jsonString)
@@ -11,6 +11,7 @@ from google.protobuf import symbol_database as _symbol_database
 _sym_db = _symbol_database.Default()
 
 
+import dataset_pb2 as dataset__pb2
 
 
 DESCRIPTOR = _descriptor.FileDescriptor(
@@ -18,8 +19,9 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='ocr',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=b'\n\tocr.proto\x12\x03ocr\"6\n\x14TextDetectionRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\"+\n\x15TextDetectionResponse\x12\x12\n\njsonString\x18\x01 \x01(\t\"\"\n\x0cJSONResponse\x12\x12\n\njsonString\x18\x01 \x01(\t2H\n\x0cTextDetector\x12\x38\n\x06\x64\x65tect\x12\x19.ocr.TextDetectionRequest\x1a\x11.ocr.JSONResponse\"\x00\x62\x06proto3'
-)
+  serialized_pb=b'\n\tocr.proto\x12\x03ocr\x1a\rdataset.proto\"J\n\x14TextDetectionRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x12\n\nstructured\x18\x03 \x01(\x08\"f\n\x19\x42\x61tchTextDetectionRequest\x12\x15\n\rcorrelationId\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x12\n\nstructured\x18\x04 \x01(\x08\"\x7f\n\x1a\x42\x61tchTextDetectionResponse\x12\x15\n\rcorrelationId\x18\x01 \x01(\t\x12\x12\n\njsonString\x18\x02 \x01(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\'\n\x08\x64ocument\x18\x04 \x01(\x0b\x32\x15.ocr.DocumentResponse\"H\n\x12TextDetectionChunk\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x12\n\nstructured\x18\x03 \x01(\x08\"T\n\x15TextDetectionResponse\x12\x12\n\njsonString\x18\x01 \x01(\t\x12\'\n\x08\x64ocument\x18\x02 \x01(\x0b\x32\x15.ocr.DocumentResponse\"\x13\n\x11\x43\x61\x63heStatsRequest\"d\n\x12\x43\x61\x63heStatsResponse\x12\x0c\n\x04hits\x18\x01 \x01(\x03\x12\x11\n\tdisk_hits\x18\x02 \x01(\x03\x12\x0e\n\x06misses\x18\x03 \x01(\x03\x12\x0f\n\x07\x65ntries\x18\x04 \x01(\x03\x12\x0c\n\x04size\x18\x05 \x01(\x03\"\"\n\x0cJSONResponse\x12\x12\n\njsonString\x18\x01 \x01(\t2\xb4\x02\n\x0cTextDetector\x12\x41\n\x06\x64\x65tect\x12\x19.ocr.TextDetectionRequest\x1a\x1a.ocr.TextDetectionResponse\"\x00\x12T\n\x0b\x64\x65tectBatch\x12\x1e.ocr.BatchTextDetectionRequest\x1a\x1f.ocr.BatchTextDetectionResponse\"\x00(\x01\x30\x01\x12G\n\x0c\x64\x65tectUpload\x12\x17.ocr.TextDetectionChunk\x1a\x1a.ocr.TextDetectionResponse\"\x00(\x01\x12\x42\n\rgetCacheStats\x12\x16.ocr.CacheStatsRequest\x1a\x17.ocr.CacheStatsResponse\"\x00\x62\x06proto3'
+  ,
+  dependencies=[dataset__pb2.DESCRIPTOR,])
 
 
 
@@ -45,6 +47,117 @@ _TEXTDETECTIONREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='structured', full_name='ocr.TextDetectionRequest.structured', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=33,
+  serialized_end=107,
+)
+
+
+_BATCHTEXTDETECTIONREQUEST = _descriptor.Descriptor(
+  name='BatchTextDetectionRequest',
+  full_name='ocr.BatchTextDetectionRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='correlationId', full_name='ocr.BatchTextDetectionRequest.correlationId', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='filename', full_name='ocr.BatchTextDetectionRequest.filename', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='ocr.BatchTextDetectionRequest.data', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='structured', full_name='ocr.BatchTextDetectionRequest.structured', index=3,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=109,
+  serialized_end=211,
+)
+
+
+_BATCHTEXTDETECTIONRESPONSE = _descriptor.Descriptor(
+  name='BatchTextDetectionResponse',
+  full_name='ocr.BatchTextDetectionResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='correlationId', full_name='ocr.BatchTextDetectionResponse.correlationId', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='jsonString', full_name='ocr.BatchTextDetectionResponse.jsonString', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='ocr.BatchTextDetectionResponse.error', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='document', full_name='ocr.BatchTextDetectionResponse.document', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -57,8 +170,53 @@ _TEXTDETECTIONREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=18,
-  serialized_end=72,
+  serialized_start=213,
+  serialized_end=340,
+)
+
+
+_TEXTDETECTIONCHUNK = _descriptor.Descriptor(
+  name='TextDetectionChunk',
+  full_name='ocr.TextDetectionChunk',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='filename', full_name='ocr.TextDetectionChunk.filename', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='ocr.TextDetectionChunk.data', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"",
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='structured', full_name='ocr.TextDetectionChunk.structured', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=342,
+  serialized_end=414,
 )
 
 
@@ -76,6 +234,37 @@ _TEXTDETECTIONRESPONSE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='document', full_name='ocr.TextDetectionResponse.document', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=416,
+  serialized_end=500,
+)
+
+
+_CACHESTATSREQUEST = _descriptor.Descriptor(
+  name='CacheStatsRequest',
+  full_name='ocr.CacheStatsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
   ],
   extensions=[
   ],
@@ -88,8 +277,67 @@ _TEXTDETECTIONRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=74,
-  serialized_end=117,
+  serialized_start=502,
+  serialized_end=521,
+)
+
+
+_CACHESTATSRESPONSE = _descriptor.Descriptor(
+  name='CacheStatsResponse',
+  full_name='ocr.CacheStatsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='hits', full_name='ocr.CacheStatsResponse.hits', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='disk_hits', full_name='ocr.CacheStatsResponse.disk_hits', index=1,
+      number=2, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='misses', full_name='ocr.CacheStatsResponse.misses', index=2,
+      number=3, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='entries', full_name='ocr.CacheStatsResponse.entries', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='size', full_name='ocr.CacheStatsResponse.size', index=4,
+      number=5, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=523,
+  serialized_end=623,
 )
 
 
@@ -119,12 +367,19 @@ _JSONRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=119,
-  serialized_end=153,
+  serialized_start=625,
+  serialized_end=659,
 )
 
+_BATCHTEXTDETECTIONRESPONSE.fields_by_name['document'].message_type = dataset__pb2._DOCUMENTRESPONSE
+_TEXTDETECTIONRESPONSE.fields_by_name['document'].message_type = dataset__pb2._DOCUMENTRESPONSE
 DESCRIPTOR.message_types_by_name['TextDetectionRequest'] = _TEXTDETECTIONREQUEST
+DESCRIPTOR.message_types_by_name['BatchTextDetectionRequest'] = _BATCHTEXTDETECTIONREQUEST
+DESCRIPTOR.message_types_by_name['BatchTextDetectionResponse'] = _BATCHTEXTDETECTIONRESPONSE
+DESCRIPTOR.message_types_by_name['TextDetectionChunk'] = _TEXTDETECTIONCHUNK
 DESCRIPTOR.message_types_by_name['TextDetectionResponse'] = _TEXTDETECTIONRESPONSE
+DESCRIPTOR.message_types_by_name['CacheStatsRequest'] = _CACHESTATSREQUEST
+DESCRIPTOR.message_types_by_name['CacheStatsResponse'] = _CACHESTATSRESPONSE
 DESCRIPTOR.message_types_by_name['JSONResponse'] = _JSONRESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -135,6 +390,27 @@ TextDetectionRequest = _reflection.GeneratedProtocolMessageType('TextDetectionRe
   })
 _sym_db.RegisterMessage(TextDetectionRequest)
 
+BatchTextDetectionRequest = _reflection.GeneratedProtocolMessageType('BatchTextDetectionRequest', (_message.Message,), {
+  'DESCRIPTOR' : _BATCHTEXTDETECTIONREQUEST,
+  '__module__' : 'ocr_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.BatchTextDetectionRequest)
+  })
+_sym_db.RegisterMessage(BatchTextDetectionRequest)
+
+BatchTextDetectionResponse = _reflection.GeneratedProtocolMessageType('BatchTextDetectionResponse', (_message.Message,), {
+  'DESCRIPTOR' : _BATCHTEXTDETECTIONRESPONSE,
+  '__module__' : 'ocr_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.BatchTextDetectionResponse)
+  })
+_sym_db.RegisterMessage(BatchTextDetectionResponse)
+
+TextDetectionChunk = _reflection.GeneratedProtocolMessageType('TextDetectionChunk', (_message.Message,), {
+  'DESCRIPTOR' : _TEXTDETECTIONCHUNK,
+  '__module__' : 'ocr_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.TextDetectionChunk)
+  })
+_sym_db.RegisterMessage(TextDetectionChunk)
+
 TextDetectionResponse = _reflection.GeneratedProtocolMessageType('TextDetectionResponse', (_message.Message,), {
   'DESCRIPTOR' : _TEXTDETECTIONRESPONSE,
   '__module__' : 'ocr_pb2'
@@ -142,6 +418,20 @@ TextDetectionResponse = _reflection.GeneratedProtocolMessageType('TextDetectionR
   })
 _sym_db.RegisterMessage(TextDetectionResponse)
 
+CacheStatsRequest = _reflection.GeneratedProtocolMessageType('CacheStatsRequest', (_message.Message,), {
+  'DESCRIPTOR' : _CACHESTATSREQUEST,
+  '__module__' : 'ocr_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.CacheStatsRequest)
+  })
+_sym_db.RegisterMessage(CacheStatsRequest)
+
+CacheStatsResponse = _reflection.GeneratedProtocolMessageType('CacheStatsResponse', (_message.Message,), {
+  'DESCRIPTOR' : _CACHESTATSRESPONSE,
+  '__module__' : 'ocr_pb2'
+  # @@protoc_insertion_point(class_scope:ocr.CacheStatsResponse)
+  })
+_sym_db.RegisterMessage(CacheStatsResponse)
+
 JSONResponse = _reflection.GeneratedProtocolMessageType('JSONResponse', (_message.Message,), {
   'DESCRIPTOR' : _JSONRESPONSE,
   '__module__' : 'ocr_pb2'
@@ -157,8 +447,8 @@ _TEXTDETECTOR = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=155,
-  serialized_end=227,
+  serialized_start=662,
+  serialized_end=970,
   methods=[
   _descriptor.MethodDescriptor(
     name='detect',
@@ -166,7 +456,34 @@ _TEXTDETECTOR = _descriptor.ServiceDescriptor(
     index=0,
     containing_service=None,
     input_type=_TEXTDETECTIONREQUEST,
-    output_type=_JSONRESPONSE,
+    output_type=_TEXTDETECTIONRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='detectBatch',
+    full_name='ocr.TextDetector.detectBatch',
+    index=1,
+    containing_service=None,
+    input_type=_BATCHTEXTDETECTIONREQUEST,
+    output_type=_BATCHTEXTDETECTIONRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='detectUpload',
+    full_name='ocr.TextDetector.detectUpload',
+    index=2,
+    containing_service=None,
+    input_type=_TEXTDETECTIONCHUNK,
+    output_type=_TEXTDETECTIONRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='getCacheStats',
+    full_name='ocr.TextDetector.getCacheStats',
+    index=3,
+    containing_service=None,
+    input_type=_CACHESTATSREQUEST,
+    output_type=_CACHESTATSRESPONSE,
     serialized_options=None,
   ),
 ])
@@ -17,7 +17,22 @@ class TextDetectorStub(object):
     self.detect = channel.unary_unary(
         '/ocr.TextDetector/detect',
         request_serializer=ocr__pb2.TextDetectionRequest.SerializeToString,
-        response_deserializer=ocr__pb2.JSONResponse.FromString,
+        response_deserializer=ocr__pb2.TextDetectionResponse.FromString,
+        )
+    self.detectBatch = channel.stream_stream(
+        '/ocr.TextDetector/detectBatch',
+        request_serializer=ocr__pb2.BatchTextDetectionRequest.SerializeToString,
+        response_deserializer=ocr__pb2.BatchTextDetectionResponse.FromString,
+        )
+    self.detectUpload = channel.stream_unary(
+        '/ocr.TextDetector/detectUpload',
+        request_serializer=ocr__pb2.TextDetectionChunk.SerializeToString,
+        response_deserializer=ocr__pb2.TextDetectionResponse.FromString,
+        )
+    self.getCacheStats = channel.unary_unary(
+        '/ocr.TextDetector/getCacheStats',
+        request_serializer=ocr__pb2.CacheStatsRequest.SerializeToString,
+        response_deserializer=ocr__pb2.CacheStatsResponse.FromString,
         )
 
 
@@ -32,13 +47,49 @@ class TextDetectorServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def detectBatch(self, request_iterator, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def detectUpload(self, request_iterator, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getCacheStats(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_TextDetectorServicer_to_server(servicer, server):
   rpc_method_handlers = {
       'detect': grpc.unary_unary_rpc_method_handler(
           servicer.detect,
           request_deserializer=ocr__pb2.TextDetectionRequest.FromString,
-          response_serializer=ocr__pb2.JSONResponse.SerializeToString,
+          response_serializer=ocr__pb2.TextDetectionResponse.SerializeToString,
+      ),
+      'detectBatch': grpc.stream_stream_rpc_method_handler(
+          servicer.detectBatch,
+          request_deserializer=ocr__pb2.BatchTextDetectionRequest.FromString,
+          response_serializer=ocr__pb2.BatchTextDetectionResponse.SerializeToString,
+      ),
+      'detectUpload': grpc.stream_unary_rpc_method_handler(
+          servicer.detectUpload,
+          request_deserializer=ocr__pb2.TextDetectionChunk.FromString,
+          response_serializer=ocr__pb2.TextDetectionResponse.SerializeToString,
+      ),
+      'getCacheStats': grpc.unary_unary_rpc_method_handler(
+          servicer.getCacheStats,
+          request_deserializer=ocr__pb2.CacheStatsRequest.FromString,
+          response_serializer=ocr__pb2.CacheStatsResponse.SerializeToString,
       ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
@@ -1,38 +1,158 @@
+import io
+import os
 import grpc
-import json
+import mmap
+import queue
+import tempfile
 import logging
+import threading
 from concurrent import futures
+from contextlib import contextmanager
 
-from bson import json_util
-
-from ocr_pb2 import TextDetectionRequest, TextDetectionResponse, JSONResponse
+from ocr_pb2 import (
+    TextDetectionResponse,
+    BatchTextDetectionResponse,
+    CacheStatsResponse,
+)
 from ocr_pb2_grpc import TextDetectorServicer, add_TextDetectorServicer_to_server
+from detection_engine import make_engine, EngineBusy
+from service.common.server import make_server
+
+from logging import warning
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+
+batch_max_in_flight = int(os.environ.get("OCR_BATCH_MAX_IN_FLIGHT", 8))
+# Seconds between two looks at whether a batch waiting for a free slot was cancelled.
+batch_slot_poll_interval = 1.0
+upload_spool_max_size = int(os.environ.get("OCR_UPLOAD_SPOOL_MAX_SIZE", 4 * 1024 * 1024))
+
 
-from utils.image import bytes_to_image
-from ocr.text_detector import TextDetector
+@contextmanager
+def spooled_upload(request_iterator):
+    """Reassembles a chunked upload. Small uploads stay in memory, larger ones spill to a
+    temp file that is memory-mapped, so no extra copy of the image is made."""
+    filename = ""
+    structured = False
+    buffer = io.BytesIO()
+    try:
+        for chunk in request_iterator:
+            filename = filename or chunk.filename
+            structured = structured or chunk.structured
+            buffer.write(chunk.data)
+            if isinstance(buffer, io.BytesIO) and buffer.tell() > upload_spool_max_size:
+                spilled = tempfile.TemporaryFile()
+                spilled.write(buffer.getbuffer())
+                buffer = spilled
+
+        if isinstance(buffer, io.BytesIO):
+            data = buffer.getbuffer()
+            try:
+                yield filename, structured, data
+            finally:
+                data.release()
+        else:
+            buffer.flush()
+            with mmap.mmap(buffer.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield filename, structured, data
+    finally:
+        buffer.close()
 
 
 class GRPCTextDetector(TextDetectorServicer):
-    _detector = None
+    _engine = None
 
-    @property
-    def detector(self):
-        if not self._detector:
-            self._detector = TextDetector()
-        return self._detector
+    def __init__(self, engine=None):
+        self._engine = engine or make_engine()
+
+    def warm_up(self):
+        self._engine.warm_up()
 
     def detect(self, request, context):
-        document = self.detector.detect(filename=request.filename, data=request.data)
-        json_string = json.dumps(document.to_dict(), default=json_util.default)
-        return JSONResponse(jsonString=json_string)
+        try:
+            result = self._engine.detect(request.filename, request.data, request.structured)
+        except EngineBusy as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except futures.TimeoutError:
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "OCR timed out")
+        return TextDetectionResponse(**result)
+
+    def detectBatch(self, request_iterator, context):
+        done = queue.Queue()
+        in_flight = threading.BoundedSemaphore(batch_max_in_flight)
+        submitted = []
+
+        def consume():
+            try:
+                for request in request_iterator:
+                    while not in_flight.acquire(timeout=batch_slot_poll_interval):
+                        if not context.is_active():
+                            return
+                    future = self._engine.submit(request.filename, request.data, request.structured)
+                    future.correlation_id = request.correlationId
+                    submitted.append(future)
+                    future.add_done_callback(done.put)
+            except Exception as e:
+                warning(e)
+            finally:
+                done.put(None)
+
+        threading.Thread(target=consume, daemon=True).start()
+
+        received = 0
+        finished_reading = False
+        while not finished_reading or received < len(submitted):
+            future = done.get()
+            if future is None:
+                finished_reading = True
+                continue
+            received += 1
+            in_flight.release()
+            try:
+                response = BatchTextDetectionResponse(
+                    correlationId=future.correlation_id, **future.result()
+                )
+            except Exception as e:
+                warning(e)
+                response = BatchTextDetectionResponse(correlationId=future.correlation_id, error=str(e))
+            yield response
+
+    def detectUpload(self, request_iterator, context):
+        with spooled_upload(request_iterator) as (filename, structured, data):
+            if not len(data):
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Empty upload")
+            try:
+                result = self._engine.detect(filename, data, structured)
+            except EngineBusy as e:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            except futures.TimeoutError:
+                context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "OCR timed out")
+        return TextDetectionResponse(**result)
+
+    def getCacheStats(self, request, context):
+        cache = getattr(self._engine, "cache", None)
+        if not cache:
+            return CacheStatsResponse()
+        return CacheStatsResponse(**cache.stats())
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), maximum_concurrent_rpcs=160)
-    add_TextDetectorServicer_to_server(GRPCTextDetector(), server)
+    server = make_server()
+    text_detector = GRPCTextDetector()
+    add_TextDetectorServicer_to_server(text_detector, server)
+
+    # Readiness is reported through the standard gRPC health service.
+    health_servicer = health.HealthServicer()
+    health_servicer.set("", health_pb2.HealthCheckResponse.NOT_SERVING)
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+
+    print("Warming up OCR text detector...")
+    text_detector.warm_up()
+
     server.add_insecure_port("[::]:50051")
     print("Starting OCR gRPC server listening at '[::]:50051'...")
     server.start()
+    health_servicer.set("", health_pb2.HealthCheckResponse.SERVING)
+    health_servicer.set("ocr.TextDetector", health_pb2.HealthCheckResponse.SERVING)
     server.wait_for_termination()
 
 
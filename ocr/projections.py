@@ -0,0 +1,47 @@
+from google.protobuf.field_mask_pb2 import FieldMask
+
+from dataset_pb2 import DocumentResponse
+
+# Nesting of the page tree in a stored document; DocumentDepth n keeps the first n levels.
+levels = ("pages", "areas", "paragraphs", "lines", "words")
+
+
+def _message_at(path, descriptor):
+    """Descriptor of the message a dotted path points to (None for a scalar). Unlike
+    FieldMask.IsValidForDescriptor, paths may go through repeated fields."""
+    for name in path.split("."):
+        if descriptor is None or name not in descriptor.fields_by_name:
+            raise ValueError("Unknown field path: %s" % path)
+        descriptor = descriptor.fields_by_name[name].message_type
+    return descriptor
+
+
+def _include(path, descriptor, cut, projection):
+    if path == cut or path.startswith(cut + "."):
+        return
+    if cut.startswith(path + "."):
+        # Mongo can't mix inclusion and exclusion, so an ancestor of the cut is spelled out
+        # field by field down to it.
+        for field in descriptor.fields:
+            _include(path + "." + field.name, field.message_type, cut, projection)
+        return
+    projection[path] = 1
+
+
+def document_projection(field_mask, depth):
+    """Mongo projection reading only the field_mask paths of a document down to depth, or
+    None for the whole document. Raises ValueError on paths that are not DocumentResponse
+    fields."""
+    cut = ".".join(levels[: depth + 1]) if depth else ""
+    if not field_mask.paths:
+        return {cut: 0} if cut else None
+    canonical = FieldMask()
+    canonical.CanonicalFormFromMask(field_mask)
+    projection = {"uuid": 1}
+    for path in canonical.paths:
+        descriptor = _message_at(path, DocumentResponse.DESCRIPTOR)
+        if cut:
+            _include(path, descriptor, cut, projection)
+        else:
+            projection[path] = 1
+    return projection
@@ -0,0 +1,194 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+from dataset_pb2 import DocumentResponse
+
+from logging import warning
+
+cache_max_bytes = int(os.environ.get("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+cache_dir = os.environ.get("OCR_CACHE_DIR")
+cache_disk_max_bytes = int(os.environ.get("OCR_CACHE_DISK_MAX_BYTES", 4 * 1024 * 1024 * 1024))
+detector_version = os.environ.get("OCR_DETECTOR_VERSION", "1")
+
+JSON_KIND = b"j"
+DOCUMENT_KIND = b"d"
+
+
+def encode_result(result):
+    if "document" in result:
+        return DOCUMENT_KIND + result["document"].SerializeToString()
+    return JSON_KIND + result["jsonString"].encode("utf-8")
+
+
+def decode_result(payload):
+    if payload[:1] == DOCUMENT_KIND:
+        return {"document": DocumentResponse.FromString(payload[1:])}
+    return {"jsonString": payload[1:].decode("utf-8")}
+
+
+class ResultCache:
+    """Content-addressed OCR results: an in-memory LRU capped by size in bytes, backed by an
+    optional directory that survives restarts. Files not used for the longest time are removed
+    once the directory grows over disk_max_bytes."""
+
+    def __init__(
+        self, max_bytes=cache_max_bytes, directory=cache_dir, version=detector_version, disk_max_bytes=cache_disk_max_bytes
+    ):
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._disk_max_bytes = disk_max_bytes
+        self._disk_size = None
+        self._disk_lock = threading.Lock()
+        self._version = version
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, data, structured=False):
+        digest = hashlib.sha256(data).hexdigest()
+        return "%s-%s-%s" % (digest, self._version, "d" if structured else "j")
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return decode_result(payload)
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, payload)
+        return decode_result(payload)
+
+    def put(self, key, result):
+        payload = encode_result(result)
+        with self._lock:
+            self._put_memory(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+
+    def _put_memory(self, key, payload):
+        if len(payload) > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _read_disk(self, key):
+        if not self._directory:
+            return None
+        try:
+            with open(os.path.join(self._directory, key), "rb") as f:
+                try:
+                    os.utime(f.fileno())
+                except OSError:
+                    pass
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self._directory:
+            return
+        try:
+            with tempfile.NamedTemporaryFile(dir=self._directory, delete=False) as f:
+                f.write(payload)
+            os.replace(f.name, os.path.join(self._directory, key))
+        except OSError as e:
+            warning(e)
+            return
+        with self._disk_lock:
+            if self._disk_size is None:
+                self._disk_size = sum(size for _, size, _ in self._files())
+            else:
+                self._disk_size += len(payload)
+            if self._disk_size > self._disk_max_bytes:
+                self._prune()
+
+    def _files(self):
+        for entry in os.scandir(self._directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield entry.path, stat.st_size, stat.st_mtime
+
+    def _prune(self):
+        files = sorted(self._files(), key=lambda f: f[2])
+        self._disk_size = sum(size for _, size, _ in files)
+        # Down to 90% so pruning doesn't run again on the next write.
+        for path, size, _ in files:
+            if self._disk_size <= self._disk_max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                self._disk_size -= size
+            except OSError:
+                pass
+
+
+class CachedDetectionEngine:
+    """Wraps a detection engine so known images are answered without touching the detector."""
+
+    def __init__(self, engine, cache=None):
+        self._engine = engine
+        self.cache = cache or ResultCache()
+
+    def warm_up(self):
+        self._engine.warm_up()
+
+    def detect(self, filename, data, structured=False):
+        key = self.cache.key(data, structured)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._engine.detect(filename, data, structured)
+            self.cache.put(key, result)
+        return result
+
+    def submit(self, filename, data, structured=False):
+        key = self.cache.key(data, structured)
+        result = self.cache.get(key)
+        if result is not None:
+            future = futures.Future()
+            future.set_result(result)
+            return future
+
+        future = self._engine.submit(filename, data, structured)
+
+        def store(done):
+            if not done.exception():
+                self.cache.put(key, done.result())
+
+        future.add_done_callback(store)
+        return future
+
+    def shutdown(self):
+        self._engine.shutdown()
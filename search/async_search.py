@@ -0,0 +1,35 @@
+import os
+
+import aiohttp
+
+# The Elasticsearch instance search.search queries, called over HTTP by the aio server.
+search_url = os.environ["ELASTICSEARCH_URL"]
+search_timeout = float(os.environ.get("SEARCH_TIMEOUT", 10))
+search_result_size = int(os.environ.get("SEARCH_RESULT_SIZE", 100))
+
+
+def make_session():
+    """The aiohttp session of the aio server; made on its event loop and closed with it."""
+    return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=search_timeout))
+
+
+def simple_search_query(terms, user_id, fields, fuzziness):
+    """A fuzzy multi_match of the terms over fields (every field when empty), restricted to the
+    documents of user_id."""
+    match = {"query": " ".join(terms), "fuzziness": fuzziness}
+    if fields:
+        match["fields"] = list(fields)
+    return {
+        "query": {"bool": {"must": {"multi_match": match}, "filter": {"term": {"user_id": user_id}}}},
+        "_source": False,
+        "size": search_result_size,
+    }
+
+
+async def simple_search(session, terms, index, user_id, fields, fuzziness):
+    """The ids of the matching documents, awaited on the event loop instead of a worker thread."""
+    url = "%s/%s/_search" % (search_url.rstrip("/"), index)
+    async with session.post(url, json=simple_search_query(terms, user_id, fields, fuzziness)) as response:
+        response.raise_for_status()
+        data = await response.json()
+    return [hit["_id"] for hit in data["hits"]["hits"]]
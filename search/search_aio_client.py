@@ -0,0 +1,44 @@
+import sys
+
+sys.path.insert(0, "/search/src/service/search")
+sys.path.insert(0, "/api-gateway/src/service/search")
+
+import grpc
+
+from service.search.search_pb2 import SearchDocumentsRequest
+from service.search.search_pb2_grpc import SearchDocumentsStub
+from service.common.channels import get_aio_channel
+from service.search.search_client import server_name, port
+
+
+class AsyncGRPCSearchDocumentsClient:
+    """grpc.aio counterpart of GRPCSearchDocumentsClient."""
+
+    stub = None
+    channel = None
+
+    def __init__(self):
+        self.channel = get_aio_channel(server_name + ":" + port)
+        self.stub = SearchDocumentsStub(self.channel)
+
+    async def close(self):
+        """Lets go of the channel. It is shared, so it stays open for the other clients:
+        close_aio_channels closes the pool at shutdown."""
+        self.channel = self.stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def search_documents(self, search_terms, index, user_id, fuzziness=2, fields=[]):
+        if isinstance(search_terms, str):
+            search_terms = search_terms.split()
+
+        resp = await self.stub.simpleSearch(
+            SearchDocumentsRequest(
+                searchTerms=search_terms, index=index, userId=user_id, fuzziness=fuzziness, fields=fields
+            )
+        )
+        return resp.ids
@@ -0,0 +1,45 @@
+import sys
+import asyncio
+import logging
+
+sys.path.insert(0, "/search/src/service/search")
+
+from search_pb2 import SearchDocumentsResponse
+from search_pb2_grpc import SearchDocumentsServicer, add_SearchDocumentsServicer_to_server
+
+from async_search import simple_search, make_session
+from service.common.server import make_aio_server
+
+
+class AsyncGRPCSearchDocuments(SearchDocumentsServicer):
+    """grpc.aio implementation of GRPCSearchDocuments. The search backend is called with aiohttp
+    on the server's event loop, so a call waiting on it holds no thread."""
+
+    def __init__(self, session):
+        self._session = session
+
+    async def simpleSearch(self, request, context):
+        ids = await simple_search(
+            self._session,
+            terms=list(request.searchTerms),
+            index=request.index,
+            user_id=request.userId,
+            fields=[field for field in request.fields],
+            fuzziness=request.fuzziness,
+        )
+        return SearchDocumentsResponse(ids=ids)
+
+
+async def serve():
+    async with make_session() as session:
+        server = make_aio_server()
+        add_SearchDocumentsServicer_to_server(AsyncGRPCSearchDocuments(session), server)
+        server.add_insecure_port("[::]:50053")
+        print("Starting asyncio search gRPC server listening at '[::]:50053'...")
+        await server.start()
+        await server.wait_for_termination()
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    asyncio.run(serve())
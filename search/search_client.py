@@ -8,6 +8,7 @@ import json
 
 from service.search.search_pb2 import SearchDocumentsRequest
 from service.search.search_pb2_grpc import SearchDocumentsStub
+from service.common.channels import get_channel
 
 from utils.image import image_to_bytes
 
@@ -20,12 +21,9 @@ class GRPCSearchDocumentsClient:
     channel = None
 
     def __init__(self):
-        self.channel = grpc.insecure_channel(server_name + ":" + port)
+        self.channel = get_channel(server_name + ":" + port)
         self.stub = SearchDocumentsStub(self.channel)
 
-    def __del__(self):
-        self.channel.close()
-
     def search_documents(self, search_terms, index, user_id, fuzziness=2, fields=[]):
         if isinstance(search_terms, str):
             search_terms = search_terms.split()
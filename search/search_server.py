@@ -12,6 +12,7 @@ from search_pb2 import SearchDocumentsRequest, SearchDocumentsResponse
 from search_pb2_grpc import SearchDocumentsServicer, add_SearchDocumentsServicer_to_server
 
 from search.search import simple_search
+from service.common.server import make_server, server_mode
 
 
 class GRPCSearchDocuments(SearchDocumentsServicer):
@@ -27,7 +28,7 @@ class GRPCSearchDocuments(SearchDocumentsServicer):
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), maximum_concurrent_rpcs=160)
+    server = make_server()
     add_SearchDocumentsServicer_to_server(GRPCSearchDocuments(), server)
     server.add_insecure_port("[::]:50053")
     print("Starting dataset gRPC server listening at '[::]:50053'...")
@@ -38,7 +39,13 @@ def serve():
 if __name__ == "__main__":
     logging.basicConfig()
     try:
-        serve()
+        if server_mode == "aio":
+            import asyncio
+            from search_aio_server import serve as aio_serve
+
+            asyncio.run(aio_serve())
+        else:
+            serve()
     except Exception as e:
         print(e)
         print("GRPCSearchDocuments server is running somewhere else...")
@@ -0,0 +1,388 @@
+import os
+import math
+import numbers
+import zipfile
+import datetime
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from tasks.transactions_handler import make_matches_report
+
+from service.common.pagination import sort_keys
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+report_batch_size = int(os.environ.get("MATCHES_REPORT_BATCH_SIZE", 1000))
+report_chunk_size = int(os.environ.get("MATCHES_REPORT_CHUNK_SIZE", 256 * 1024))
+# Rows per Parquet row group: batches are held until there are this many to write.
+report_row_group_size = int(os.environ.get("MATCHES_REPORT_ROW_GROUP_SIZE", 64 * 1024))
+
+
+def report_filters(filters, start_date, end_date):
+    """The transactions of a matches report: those with matches created in [start_date, end_date]."""
+    return dict(filters, matches={"$not": {"$size": 0}}, created_at={"$gte": start_date, "$lte": end_date})
+
+
+def id_batches(cursor, batch_size=report_batch_size):
+    cursor = iter(cursor)
+    while True:
+        ids = [transaction["_id"] for transaction in islice(cursor, batch_size)]
+        if not ids:
+            return
+        yield ids
+
+
+def report_ids(collection, filters, batch_size=report_batch_size):
+    """Cursor over the _id of the report transactions, in a stable order."""
+    return collection.find(filters, {"_id": 1}).sort(sort_keys).batch_size(batch_size)
+
+
+def report_batch(filters, ids):
+    """The report rows of the ids transactions, as the DataFrame make_matches_report builds."""
+    return make_matches_report(dict(filters, _id={"$in": ids}))
+
+
+def report_batches(collection, filters, batch_size=report_batch_size):
+    """The report a DataFrame of at most batch_size transactions at a time, so its size doesn't
+    bound the memory it takes to build."""
+    for ids in id_batches(report_ids(collection, filters, batch_size), batch_size):
+        yield report_batch(filters, ids)
+
+
+class ChunkBuffer:
+    """Regroups written bytes into chunks of chunk_size, the size of the streamed messages."""
+
+    def __init__(self, chunk_size=report_chunk_size):
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def push(self, data):
+        self._buffer += data
+        chunks = []
+        while len(self._buffer) >= self._chunk_size:
+            chunks.append(bytes(self._buffer[: self._chunk_size]))
+            del self._buffer[: self._chunk_size]
+        return chunks
+
+    def flush(self):
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return [data] if data else []
+
+
+class CsvReportWriter:
+    """The columns are those of the first batch with rows; later batches are aligned on them."""
+
+    content_type = "text/csv"
+
+    def __init__(self):
+        self._columns = None
+
+    def write(self, batch):
+        """Encodes a batch of rows, returning the bytes it produced."""
+        if batch.empty:
+            return b""
+        header = self._columns is None
+        if header:
+            self._columns = list(batch.columns)
+        else:
+            batch = batch.reindex(columns=self._columns)
+        return batch.to_csv(index=False, header=header).encode("utf-8")
+
+    def close(self):
+        return b""
+
+
+class _Sink:
+    """Unseekable file where the writers write their output, emptied by take."""
+
+    def __init__(self):
+        self._data = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self._data += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data, self._data = bytes(self._data), bytearray()
+        return data
+
+
+_content_types_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_rels_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_workbook_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_workbook_rels_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+# Cell style 1 shows dates with the built-in "m/d/yy h:mm" format.
+_styles_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_sheet_head = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_sheet_tail = "</sheetData></worksheet>"
+
+_excel_epoch = datetime.datetime(1899, 12, 30)
+# Characters XML 1.0 doesn't allow, not even escaped.
+_illegal_xml = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _column_name(index):
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def _cell(ref, value):
+    if value is None or (value != value) is True:  # None, NaN, NaT
+        return ""
+    if isinstance(value, bool):
+        return '<c r="%s" t="b"><v>%d</v></c>' % (ref, value)
+    if isinstance(value, numbers.Integral):
+        return '<c r="%s"><v>%d</v></c>' % (ref, value)
+    if isinstance(value, numbers.Real) and math.isfinite(value):
+        return '<c r="%s"><v>%r</v></c>' % (ref, float(value))
+    if isinstance(value, datetime.datetime):
+        serial = (value.replace(tzinfo=None) - _excel_epoch) / datetime.timedelta(days=1)
+        return '<c r="%s" s="1"><v>%r</v></c>' % (ref, serial)
+    if isinstance(value, datetime.date):
+        return '<c r="%s" s="1"><v>%d</v></c>' % (ref, (value - _excel_epoch.date()).days)
+    text = escape(str(value).translate(_illegal_xml))
+    return '<c r="%s" t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (ref, text)
+
+
+class XlsxReportWriter:
+    """Writes the rows straight into the worksheet of a zip archive that is streamed as it grows,
+    so neither the rows nor the file are ever held whole (or written to disk). As with
+    CsvReportWriter, the columns are those of the first batch with rows."""
+
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._archive = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED)
+        self._archive.writestr("[Content_Types].xml", _content_types_xml)
+        self._archive.writestr("_rels/.rels", _rels_xml)
+        self._archive.writestr("xl/workbook.xml", _workbook_xml)
+        self._archive.writestr("xl/_rels/workbook.xml.rels", _workbook_rels_xml)
+        self._archive.writestr("xl/styles.xml", _styles_xml)
+        self._sheet = self._archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(_sheet_head.encode("utf-8"))
+        self._header = None
+        self._columns = None
+        self._rows = 0
+
+    def write(self, batch):
+        """Encodes a batch of rows, returning the bytes it produced."""
+        if batch.empty:
+            return b""
+        if self._header is None:
+            self._header = list(batch.columns)
+            self._columns = [_column_name(i) for i in range(len(self._header))]
+            self._write_row(self._header)
+        else:
+            batch = batch.reindex(columns=self._header)
+        for row in batch.itertuples(index=False, name=None):
+            self._write_row(row)
+        return self._sink.take()
+
+    def close(self):
+        self._sheet.write(_sheet_tail.encode("utf-8"))
+        self._sheet.close()
+        self._archive.close()
+        return self._sink.take()
+
+    def _write_row(self, values):
+        self._rows += 1
+        cells = "".join(_cell(column + str(self._rows), value) for column, value in zip(self._columns, values))
+        self._sheet.write(('<row r="%d">%s</row>' % (self._rows, cells)).encode("utf-8"))
+
+
+def _arrow_schema(batch):
+    """Schema of the first batch with rows, widened for what later batches may hold: integer
+    columns are float64 (a later batch may have NaN or decimals in them) and the columns the
+    batch left empty (typed null) text."""
+    schema = pyarrow.Schema.from_pandas(batch, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pyarrow.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pyarrow.string()))
+        elif pyarrow.types.is_integer(field.type):
+            schema = schema.set(i, field.with_type(pyarrow.float64()))
+    return schema
+
+
+def _text(value):
+    if value is None or isinstance(value, str) or (value != value) is True:
+        return value
+    return str(value)
+
+
+def _arrow_table(batch, schema):
+    """batch in schema: aligned on its columns (those it lacks are null), anything a text column
+    holds besides strings written as its str(), and the rest cast unchecked (safe=False), as the
+    widened schema leaves only lossless casts."""
+    batch = batch.reindex(columns=schema.names)
+    for field in schema:
+        column = batch[field.name]
+        if pyarrow.types.is_string(field.type):
+            batch[field.name] = column.astype(object).map(_text)
+        elif column.isna().all():
+            batch[field.name] = column.astype(object).where(column.notna(), None)
+    return pyarrow.Table.from_pandas(batch, schema=schema, preserve_index=False, safe=False)
+
+
+class ArrowReportWriter:
+    """Arrow IPC stream, one record batch per batch of rows."""
+
+    content_type = "application/vnd.apache.arrow.stream"
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._schema = None
+        self._writer = None
+
+    def write(self, batch):
+        if batch.empty:
+            return b""
+        if self._writer is None:
+            self._open(_arrow_schema(batch))
+        self._writer.write_table(_arrow_table(batch, self._schema))
+        return self._sink.take()
+
+    def close(self):
+        if self._writer is None:
+            self._open(pyarrow.schema([]))
+        self._writer.close()
+        return self._sink.take()
+
+    def _open(self, schema):
+        self._schema = schema
+        self._writer = pyarrow.ipc.new_stream(pyarrow.PythonFile(self._sink, mode="w"), schema)
+
+
+class ParquetReportWriter:
+    """zstd compressed Parquet. Rows are written a row group at a time, so the output comes in
+    bursts of row_group_size rows rather than with every batch."""
+
+    content_type = "application/vnd.apache.parquet"
+
+    def __init__(self, row_group_size=report_row_group_size):
+        self._row_group_size = row_group_size
+        self._sink = _Sink()
+        self._schema = None
+        self._writer = None
+        self._tables = []
+        self._rows = 0
+
+    def write(self, batch):
+        if batch.empty:
+            return b""
+        if self._writer is None:
+            self._open(_arrow_schema(batch))
+        self._tables.append(_arrow_table(batch, self._schema))
+        self._rows += len(batch)
+        if self._rows >= self._row_group_size:
+            self._write_row_group()
+        return self._sink.take()
+
+    def close(self):
+        if self._writer is None:
+            self._open(pyarrow.schema([]))
+        self._write_row_group()
+        self._writer.close()
+        return self._sink.take()
+
+    def _open(self, schema):
+        self._schema = schema
+        self._writer = pyarrow.parquet.ParquetWriter(
+            pyarrow.PythonFile(self._sink, mode="w"), schema, compression="zstd"
+        )
+
+    def _write_row_group(self):
+        if self._tables:
+            self._writer.write_table(pyarrow.concat_tables(self._tables), row_group_size=self._rows)
+        self._tables, self._rows = [], 0
+
+
+report_writers = {"xlsx": XlsxReportWriter, "csv": CsvReportWriter}
+if pyarrow is not None:
+    report_writers.update(parquet=ParquetReportWriter, arrow=ArrowReportWriter)
+
+
+def report_format(fmt):
+    """The format name, xlsx when empty. Raises ValueError on an unknown format."""
+    fmt = (fmt or "xlsx").lower()
+    if fmt not in report_writers:
+        raise ValueError("Unsupported report format: %s" % fmt)
+    return fmt
+
+
+def report_writer(fmt):
+    return report_writers[report_format(fmt)]()
+
+
+def iter_report(batches, writer, chunk_size=report_chunk_size):
+    """The encoded report of the batches DataFrames, in chunks of chunk_size bytes."""
+    chunks = ChunkBuffer(chunk_size)
+    for batch in batches:
+        yield from chunks.push(writer.write(batch))
+    yield from chunks.push(writer.close())
+    yield from chunks.flush()
@@ -0,0 +1,271 @@
+import os
+import time
+import uuid
+import hashlib
+import datetime
+import tempfile
+import threading
+from concurrent import futures
+
+from bson import json_util
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from logging import warning
+
+from matches_report import (
+    report_filters,
+    report_format,
+    report_writers,
+    report_writer,
+    report_ids,
+    id_batches,
+    report_batch,
+)
+
+report_workers = int(os.environ.get("REPORT_WORKERS", 2))
+# Jobs waiting for a worker of this replica; submissions past it are refused.
+report_queue_depth = int(os.environ.get("REPORT_QUEUE_DEPTH", 16))
+# Shared by every replica (a network volume), so any of them can serve a finished report.
+# Required: a replica-local directory would answer Fetch calls on other replicas NOT_FOUND.
+report_cache_dir = os.environ.get("REPORT_CACHE_DIR")
+report_cache_max_bytes = int(os.environ.get("REPORT_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+# Seconds a finished report is served again to whoever asks for the same one.
+report_cache_ttl = float(os.environ.get("REPORT_CACHE_TTL", 900))
+# A pending or running job its replica hasn't touched for this long is taken for dead.
+report_job_stall_seconds = float(os.environ.get("REPORT_JOB_STALL_SECONDS", 120))
+# Seconds between two looks at a watched report job.
+report_watch_interval = float(os.environ.get("REPORT_WATCH_INTERVAL", 0.5))
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+# One unfailed job per report: two replicas submitting it at once end up with the same job.
+report_key_index = [("key", 1)]
+
+
+class ReportQueueFull(Exception):
+    pass
+
+
+def _canonical(value):
+    """value with its $in and $nin lists sorted, so that the same ids in another order hash the same."""
+    if isinstance(value, dict):
+        return {
+            k: sorted(map(_canonical, v), key=json_util.dumps) if k in ("$in", "$nin") else _canonical(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def constraint_hash(constraint):
+    return hashlib.sha256(json_util.dumps(_canonical(constraint), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+class ReportJob:
+    """State of one report build, as read from the jobs collection. processed counts the
+    transactions written out of total; version changes with every update."""
+
+    def __init__(self, doc, directory):
+        self.id = doc["_id"]
+        self.constraint_hash = doc["constraint_hash"]
+        self.format = doc["format"]
+        self.content_type = doc["content_type"]
+        self.state = doc["state"]
+        self.processed = doc["processed"]
+        self.total = doc["total"]
+        self.error = doc["error"]
+        self.size = doc["size"]
+        self.version = doc["version"]
+        self.path = os.path.join(directory, doc["file"]) if doc.get("file") else None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+
+class ReportJobs:
+    """Matches reports built on a bounded worker pool of their own, outside the RPC threads.
+
+    Jobs are documents of a collection and finished reports files in a directory, both shared
+    by every replica: whichever replica a call lands on sees the job, wherever it runs. The
+    replica running a job refreshes it every few seconds; one left untouched for
+    report_job_stall_seconds (its replica went away) is failed by the next reader.
+
+    A report is identified by (access constraint hash, start date, end date, format): submitting
+    one that is pending, running or finished less than ttl seconds ago hands back the same job.
+    Past max_bytes the least recently requested reports are dropped.
+
+    Raises ValueError when no directory is given (REPORT_CACHE_DIR is unset)."""
+
+    def __init__(
+        self,
+        collection,
+        jobs,
+        workers=report_workers,
+        queue_depth=report_queue_depth,
+        directory=report_cache_dir,
+        max_bytes=report_cache_max_bytes,
+        ttl=report_cache_ttl,
+        stall_seconds=report_job_stall_seconds,
+    ):
+        if not directory:
+            raise ValueError("REPORT_CACHE_DIR must name a directory shared by every replica")
+        os.makedirs(directory, exist_ok=True)
+        self._collection = collection
+        self._jobs = jobs
+        self._executor = futures.ThreadPoolExecutor(workers, thread_name_prefix="report")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._stall = datetime.timedelta(seconds=stall_seconds)
+        # Ids of the jobs pending or running on this replica.
+        self._local = set()
+        self._lock = threading.Lock()
+        heartbeat = threading.Thread(target=self._heartbeat, name="report-heartbeat", daemon=True)
+        heartbeat.start()
+
+    def ensure_indexes(self):
+        self._jobs.create_index(report_key_index, unique=True, partialFilterExpression={"active": True})
+
+    def submit(self, constraint, start_date, end_date, fmt):
+        """The job of the report. Raises ValueError on an unknown format and ReportQueueFull when
+        too many reports are waiting."""
+        fmt = report_format(fmt)
+        key = "|".join((constraint_hash(constraint), start_date.isoformat(), end_date.isoformat(), fmt))
+        self._evict()
+        doc = self._jobs.find_one_and_update(
+            {"key": key, "active": True}, {"$set": {"requested_at": _now()}}, return_document=ReturnDocument.AFTER
+        )
+        if doc is not None and not self._fail_stalled(doc):
+            return ReportJob(doc, self._directory)
+        if not self._slots.acquire(blocking=False):
+            raise ReportQueueFull("Too many reports waiting, try again later")
+        now = _now()
+        doc = {
+            "_id": uuid.uuid4().hex,
+            "key": key,
+            "active": True,
+            "constraint_hash": key.split("|", 1)[0],
+            "format": fmt,
+            "content_type": report_writers[fmt].content_type,
+            "state": PENDING,
+            "processed": 0,
+            "total": 0,
+            "error": "",
+            "file": None,
+            "size": 0,
+            "version": 0,
+            "requested_at": now,
+            "updated_at": now,
+            "finished_at": None,
+        }
+        try:
+            self._jobs.insert_one(doc)
+        except DuplicateKeyError:
+            # Another replica submitted the same report in between.
+            self._slots.release()
+            return self.submit(constraint, start_date, end_date, fmt)
+        with self._lock:
+            self._local.add(doc["_id"])
+        self._executor.submit(self._run, doc["_id"], report_filters(constraint, start_date, end_date), fmt)
+        return ReportJob(doc, self._directory)
+
+    def get(self, job_id, constraint):
+        """The job, if it was submitted under the same access constraint."""
+        doc = self._jobs.find_one({"_id": job_id})
+        if doc is None or doc["constraint_hash"] != constraint_hash(constraint):
+            return None
+        if self._fail_stalled(doc):
+            doc = self._jobs.find_one({"_id": job_id}) or doc
+        return ReportJob(doc, self._directory)
+
+    def _update(self, job_id, **changes):
+        changes["updated_at"] = _now()
+        self._jobs.update_one({"_id": job_id}, {"$set": changes, "$inc": {"version": 1}})
+
+    def _run(self, job_id, filters, fmt):
+        path = None
+        try:
+            self._update(job_id, state=RUNNING, total=self._collection.count_documents(filters))
+            writer = report_writer(fmt)
+            os.makedirs(self._directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(dir=self._directory, suffix="." + fmt)
+            processed = 0
+            with os.fdopen(fd, "wb") as f:
+                for ids in id_batches(report_ids(self._collection, filters)):
+                    f.write(writer.write(report_batch(filters, ids)))
+                    processed += len(ids)
+                    self._update(job_id, processed=processed)
+                f.write(writer.close())
+            self._update(
+                job_id, state=DONE, file=os.path.basename(path), size=os.path.getsize(path), finished_at=_now()
+            )
+        except Exception as e:
+            warning(e)
+            if path:
+                _remove(path)
+            self._update(job_id, state=FAILED, active=False, error=str(e), finished_at=_now())
+        finally:
+            with self._lock:
+                self._local.discard(job_id)
+            self._slots.release()
+        self._evict()
+
+    def _heartbeat(self):
+        interval = self._stall.total_seconds() / 4
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                local = list(self._local)
+            if not local:
+                continue
+            try:
+                self._jobs.update_many({"_id": {"$in": local}}, {"$set": {"updated_at": _now()}})
+            except Exception as e:
+                warning(e)
+
+    def _fail_stalled(self, doc):
+        """Fails doc when its replica stopped refreshing it. True if it was stalled."""
+        if doc["state"] not in (PENDING, RUNNING) or _now() - doc["updated_at"] < self._stall:
+            return False
+        self._jobs.update_one(
+            {"_id": doc["_id"], "updated_at": doc["updated_at"]},
+            {
+                "$set": {"state": FAILED, "active": False, "error": "Report worker stopped", "finished_at": _now()},
+                "$inc": {"version": 1},
+            },
+        )
+        return True
+
+    def _evict(self):
+        """Drops the finished jobs past their ttl, then the least recently requested reports until
+        the files fit in max_bytes."""
+        expired = _now() - datetime.timedelta(seconds=self._ttl)
+        for doc in self._jobs.find({"finished_at": {"$lt": expired}}, {"file": 1}):
+            self._drop(doc)
+        size = 0
+        for doc in self._jobs.find({"state": DONE}, {"file": 1, "size": 1}).sort("requested_at", -1):
+            size += doc["size"]
+            if size > self._max_bytes:
+                self._drop(doc)
+
+    def _drop(self, doc):
+        # Only the replica whose delete went through removes the file.
+        if self._jobs.delete_one({"_id": doc["_id"]}).deleted_count and doc.get("file"):
+            _remove(os.path.join(self._directory, doc["file"]))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        warning(e)
@@ -0,0 +1,110 @@
+import os
+import json
+import datetime
+
+from bson import ObjectId, Decimal128
+
+from service.common.pagination import sort_keys
+
+transactions_summary = ["commerce_name", "invoice_number", "date", "total_sale", "expiration_date", "matches"]
+
+transactions_details = transactions_summary + [
+    "client_number",
+    "branch",
+    "invoice_amount",
+    "promotional_discount",
+    "physical_change",
+    "invoice_value",
+    "agreed_discount",
+    "invoice_clean_amount",
+    "ieps_tax",
+    "iva_tax",
+    "invoice_total",
+    "matches",
+]
+
+# Stored transactions the servers dump both ways at startup to check against TransactionSchema.
+parity_sample_size = int(os.environ.get("TRANSACTION_JSON_PARITY_SAMPLE", 100))
+
+# Field plans, compiled once per requested field set. Field sets come from requests, so the
+# cache is dropped whenever it grows past max_field_plans.
+_field_plans = {}
+max_field_plans = 256
+
+# Read along with any field set: the listing is paged by them.
+page_token_fields = tuple(key for key, _ in sort_keys)
+
+
+def _default(value):
+    """What json can't encode itself, turned into what the transaction schema dumped."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
+
+
+_encoder = json.JSONEncoder(default=_default)
+
+
+def schema_fields(schema_class):
+    """The fields a client may ask for: those schema_class dumps. Anything else stays on the
+    server."""
+    return frozenset(name for name, field in schema_class._declared_fields.items() if not field.load_only)
+
+
+class FieldPlan:
+    """The field names to dump, in order, and the Mongo projection reading only them."""
+
+    def __init__(self, names, allowed):
+        for name in names:
+            if name not in allowed:
+                raise ValueError("Unknown transaction field: %s" % name)
+        self.names = names
+        self.projection = dict.fromkeys(names + page_token_fields, 1)
+
+
+def field_plan(fields, allowed):
+    """Raises ValueError on names that are not in allowed (see schema_fields)."""
+    key = (tuple(fields), allowed)
+    plan = _field_plans.get(key)
+    if plan is None:
+        if len(_field_plans) >= max_field_plans:
+            _field_plans.clear()
+        plan = _field_plans[key] = FieldPlan(key[0], allowed)
+    return plan
+
+
+def transaction_json(transaction, plan):
+    """JSON of the plan's fields of one Mongo document; missing fields are left out."""
+    return _encoder.encode({name: transaction[name] for name in plan.names if name in transaction})
+
+
+class SchemaJSON:
+    """transaction_json through a marshmallow schema class instead, still one document at a
+    time, for when the schema dumps something transaction_json doesn't (see schema_mismatches)."""
+
+    def __init__(self, schema_class):
+        self._schema_class = schema_class
+        self._schemas = {}
+
+    def __call__(self, transaction, plan):
+        schema = self._schemas.get(plan.names)
+        if schema is None:
+            schema = self._schemas[plan.names] = self._schema_class(only=plan.names)
+        return json.dumps(schema.dump(transaction))
+
+
+def schema_mismatches(transactions, fields, schema_class):
+    """The fields whose JSON differs between transaction_json and schema_class(only=fields).dump
+    on the given documents: renamed, computed or differently formatted ones."""
+    plan = field_plan(fields, schema_fields(schema_class))
+    schema = schema_class(only=plan.names)
+    mismatches = set()
+    for transaction in transactions:
+        expected = json.loads(json.dumps(schema.dump(transaction)))
+        actual = json.loads(transaction_json(transaction, plan))
+        mismatches.update(name for name in set(expected) | set(actual) if expected.get(name) != actual.get(name))
+    return sorted(mismatches)
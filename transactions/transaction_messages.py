@@ -0,0 +1,76 @@
+import os
+import datetime
+from itertools import islice
+
+from bson import ObjectId, Decimal128
+from marshmallow import fields, ValidationError
+
+from transactions_pb2 import TransactionMessage, TransactionBatchResponse
+from service.common.converters import make_pb
+
+transactions_batch_size = int(os.environ.get("TRANSACTIONS_BATCH_SIZE", 500))
+
+timestamp_fields = ("date", "expiration_date")
+
+# Loads string dates the way TransactionSchema's DateTime fields do.
+_datetime_field = fields.DateTime()
+
+
+def _load_datetime(value):
+    """Raises ValueError when value is neither an ISO datetime nor an ISO date."""
+    try:
+        return _datetime_field.deserialize(value)
+    except ValidationError:
+        return datetime.datetime.fromisoformat(value)
+
+
+def _plain(value):
+    """value with what a Struct can't hold (ids, dates, decimals) turned into strings and floats."""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    return value
+
+
+def transaction_handler(d, message_type):
+    if d.get("matches"):
+        d["matches"] = [_plain(match) for match in d["matches"]]
+    for name, value in list(d.items()):
+        if isinstance(value, Decimal128):
+            d[name] = float(value.to_decimal())
+        elif name in timestamp_fields and isinstance(value, str):
+            try:
+                d[name] = _load_datetime(value)
+            except ValueError:
+                # Not a date after all: sent as is in <name>_text rather than dropped.
+                d[name + "_text"] = d.pop(name)
+    return d
+
+
+def transaction_message(transaction, fields):
+    """TransactionMessage of a Mongo document with _id and the given fields set."""
+    d = {name: transaction[name] for name in fields if name in transaction}
+    d["_id"] = transaction["_id"]
+    return make_pb(d, TransactionMessage, transaction_handler)
+
+
+def transaction_batch(transactions, fields):
+    return TransactionBatchResponse(transactions=[transaction_message(t, fields) for t in transactions])
+
+
+def batches(transactions, batch_size=0):
+    """Lists of batch_size transactions (the last one may be shorter)."""
+    transactions = iter(transactions)
+    batch_size = batch_size or transactions_batch_size
+    while True:
+        batch = list(islice(transactions, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,161 @@
+import sys
+import asyncio
+import datetime
+import json
+
+sys.path.insert(0, "/api-gateway/src/service/ocr")
+sys.path.insert(0, "/api-gateway/src/service/transactions")
+sys.path.insert(0, "/transactions/src/service/transactions")
+
+import grpc
+
+from service.transactions.transactions_pb2_grpc import TransactionsStub
+from service.common.channels import get_aio_channel
+from service.common.pagination import next_page_token
+from service.transactions.transactions_pb2 import (
+    GetManyTransactionsRequest,
+    GetAllTransactionsRequest,
+    GetTransactionsMetricsRequest,
+    ReportJobRequest,
+)
+from service.transactions.transactions_client import (
+    server_name,
+    port,
+    dt_to_pb,
+    matches_report_request,
+    report_job_to_dict,
+    report_poll_interval,
+    unfinished_report_states,
+    decoders,
+)
+
+
+class AsyncGRPCTransactionsClient:
+    """grpc.aio counterpart of GRPCTransactionsClient with the same methods and return values.
+    Streaming methods are async generators."""
+
+    stub = None
+    channel = None
+
+    def __init__(self):
+        self.channel = get_aio_channel(server_name + ":" + port)
+        self.stub = TransactionsStub(self.channel)
+
+    async def close(self):
+        """Lets go of the channel. It is shared, so it stays open for the other clients:
+        close_aio_channels closes the pool at shutdown."""
+        self.channel = self.stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get_all_transactions(self, user_id, skip=0, limit=0, fields=None, page_token=None):
+        response_iterator = self.stub.GetAllTransactions(
+            GetAllTransactionsRequest(
+                skip=skip, limit=limit, userId=user_id, fields=fields, pageToken=page_token
+            )
+        )
+        async for resp in response_iterator:
+            if len(resp.ListFields()):
+                yield json.loads(resp.jsonString)
+
+    async def iter_all_transactions(self, user_id, page_size=50, fields=None, page_token=None):
+        """Every transaction, fetched page_size at a time by page token."""
+        while True:
+            response_iterator = self.stub.GetAllTransactions(
+                GetAllTransactionsRequest(
+                    limit=page_size, userId=user_id, fields=fields, pageToken=page_token
+                )
+            )
+            async for resp in response_iterator:
+                if len(resp.ListFields()):
+                    yield json.loads(resp.jsonString)
+            page_token = next_page_token(await response_iterator.trailing_metadata())
+            if not page_token:
+                return
+
+    async def get_many_transactions(self, user_id, transaction_uuids, fields=None):
+        response_iterator = self.stub.GetManyTransactions(
+            GetManyTransactionsRequest(userId=user_id, transactionIds=transaction_uuids, fields=fields)
+        )
+        async for resp in response_iterator:
+            if len(resp.ListFields()):
+                yield json.loads(resp.jsonString)
+
+    async def get_all_transaction_messages(
+        self, user_id, skip=0, limit=0, fields=None, page_token=None, batch_size=0, output="dict"
+    ):
+        decoder = decoders[output]
+        response_iterator = self.stub.GetAllTransactionBatches(
+            GetAllTransactionsRequest(
+                skip=skip, limit=limit, userId=user_id, fields=fields, pageToken=page_token, batchSize=batch_size
+            )
+        )
+        async for resp in response_iterator:
+            for transaction in resp.transactions:
+                yield decoder(transaction)
+
+    async def get_many_transaction_messages(
+        self, user_id, transaction_uuids, fields=None, batch_size=0, output="dict"
+    ):
+        decoder = decoders[output]
+        response_iterator = self.stub.GetManyTransactionBatches(
+            GetManyTransactionsRequest(
+                userId=user_id, transactionIds=transaction_uuids, fields=fields, batchSize=batch_size
+            )
+        )
+        async for resp in response_iterator:
+            for transaction in resp.transactions:
+                yield decoder(transaction)
+
+    async def get_transactions_metrics(self, user_id, start_date=None, end_date=None):
+        end_date = end_date or datetime.datetime.now()
+        start_date = start_date or end_date - datetime.timedelta(days=1)
+
+        resp = await self.stub.GetTransactionsMetrics(
+            GetTransactionsMetricsRequest(
+                userId=user_id, startDate=dt_to_pb(start_date), endDate=dt_to_pb(end_date)
+            )
+        )
+        return {
+            "transactions_total_count": resp.total or 0,
+            "transactions_matched_count": resp.matched or 0,
+            "transactions_matched_all_fields_count": resp.matched_all_fields or 0,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        }
+
+    async def get_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        job = await self.submit_matches_report(user_id, start_date, end_date, format)
+        while job["state"] in unfinished_report_states:
+            await asyncio.sleep(report_poll_interval)
+            job = await self.get_report_job(job["job_id"], user_id)
+        return b"".join([chunk async for chunk in self.fetch_report_job(job["job_id"], user_id)])
+
+    async def stream_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        response_iterator = self.stub.StreamMatchesReport(
+            matches_report_request(user_id, start_date, end_date, format)
+        )
+        async for resp in response_iterator:
+            yield resp.data
+
+    async def submit_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        resp = await self.stub.SubmitMatchesReport(matches_report_request(user_id, start_date, end_date, format))
+        return report_job_to_dict(resp)
+
+    async def get_report_job(self, job_id, user_id):
+        resp = await self.stub.GetReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        return report_job_to_dict(resp)
+
+    async def watch_report_job(self, job_id, user_id):
+        response_iterator = self.stub.WatchReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        async for resp in response_iterator:
+            yield report_job_to_dict(resp)
+
+    async def fetch_report_job(self, job_id, user_id):
+        response_iterator = self.stub.FetchReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        async for resp in response_iterator:
+            yield resp.data
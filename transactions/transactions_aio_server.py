@@ -0,0 +1,309 @@
+import sys
+import asyncio
+import logging
+
+import grpc
+
+from logging import warning
+
+sys.path.insert(0, "/transactions/src/service/transactions")
+
+from transactions_pb2 import (
+    JSONResponse,
+    TransactionsMetricsResponse,
+    MatchesReportResponse,
+    InvalidateAccessConstraintsResponse,
+)
+from transactions_pb2_grpc import TransactionsServicer, add_TransactionsServicer_to_server
+
+from models.transaction_model import TransactionSchema
+from utils.configmanager import ConfigManager
+from database.mongo import make_db
+from transaction_json import (
+    parity_sample_size,
+    field_plan,
+    transaction_json,
+    schema_mismatches,
+    SchemaJSON,
+)
+from transaction_messages import transaction_batch, transactions_batch_size
+from matches_report import (
+    report_batch_size,
+    report_filters,
+    report_ids,
+    report_batch,
+    report_writer,
+    report_chunk_size,
+    ChunkBuffer,
+)
+from report_jobs import ReportJobs, ReportQueueFull, DONE, report_watch_interval
+
+from transactions_server import (
+    transactions_summary,
+    transactions_details,
+    transaction_fields,
+    transactions_counters,
+    report_job_response,
+    method_limits,
+)
+from service.common.server import make_aio_server, run_sync
+from service.common.async_mongo import make_async_db, AsyncMongoDAO
+from service.common.access_constraints import access_constraint_cache
+from service.common.metrics import user_created_at_index, metrics_pipeline, read_metrics
+from service.common.rollups import AsyncMetricsRollup, rollups_enabled
+from service.common.pagination import sort_keys, sort_index, after_page_token, trailing_page_token
+from service.user_identity.user_identity_aio_client import AsyncGRPCUserIdentityClient
+
+
+class AsyncGRPCTransactions(TransactionsServicer):
+    """grpc.aio implementation of GRPCTransactions. Mongo is read through motor; the matches
+    report is built by the blocking pandas helpers on the default executor, and report jobs on the
+    worker threads of ReportJobs."""
+
+    _collection = None
+    _dao = None
+    _identity_client = None
+    _rollup = None
+    _report_jobs = None
+    _transaction_json = None
+
+    def __init__(self):
+        self._transaction_json = transaction_json
+        self._collection = make_async_db(ConfigManager.get_config_value("database", "mongo"))["transaction"]
+        self._dao = AsyncMongoDAO(self._collection)
+        self._identity_client = AsyncGRPCUserIdentityClient()
+        self._rollup = AsyncMetricsRollup(
+            self._collection, self._collection.database["transaction_metrics_rollup"], transactions_counters
+        )
+        # Report jobs run on worker threads, where pymongo is the client to use.
+        sync_db = make_db(ConfigManager.get_config_value("database", "mongo"))
+        self._report_jobs = ReportJobs(sync_db["transaction"], sync_db["report_jobs"])
+
+    async def ensure_indexes(self):
+        await self._collection.create_index(user_created_at_index)
+        await self._collection.create_index(sort_index)
+        await run_sync(self._report_jobs.ensure_indexes)
+
+    async def check_transaction_json(self):
+        sample = await self._collection.find({}, limit=parity_sample_size).to_list(None)
+        mismatches = schema_mismatches(sample, sorted(transaction_fields), TransactionSchema)
+        if mismatches:
+            warning("transaction_json differs from TransactionSchema on %s" % ", ".join(mismatches))
+            self._transaction_json = SchemaJSON(TransactionSchema)
+
+    def _json_projection(self, plan):
+        # The schema may compute fields out of others, so it gets whole documents.
+        if isinstance(self._transaction_json, SchemaJSON):
+            return None
+        return plan.projection
+
+    async def GetAllTransactions(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        skip = request.skip or 0
+        limit = request.limit or 50
+        plan = await self._get_request_field_plan(list(request.fields) or transactions_summary, context)
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cursor = self._dao.get_many_by(
+            filters, skip=skip, limit=limit, sort_by=sort_keys, projection=self._json_projection(plan)
+        )
+        last, count = None, 0
+        async for transaction in cursor:
+            last, count = transaction, count + 1
+            yield JSONResponse(jsonString=self._transaction_json(transaction, plan))
+        context.set_trailing_metadata(trailing_page_token(last, count, limit))
+
+    async def GetManyTransactions(self, request, context):
+        plan = await self._get_request_field_plan(list(request.fields) or transactions_details, context)
+        filters = await self._get_request_access_constraint(request)
+        filters["_id"] = {"$in": list(request.transactionIds)}
+        async for transaction in self._dao.get_many_by(filters, projection=self._json_projection(plan)):
+            yield JSONResponse(jsonString=self._transaction_json(transaction, plan))
+
+    async def GetAllTransactionBatches(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+        limit = request.limit or 50
+        plan = await self._get_request_field_plan(list(request.fields) or transactions_summary, context)
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cursor = self._dao.get_many_by(
+            filters, skip=request.skip or 0, limit=limit, sort_by=sort_keys, projection=plan.projection
+        )
+        last, count = None, 0
+        async for transactions in _batches(cursor, request.batchSize):
+            last, count = transactions[-1], count + len(transactions)
+            yield transaction_batch(transactions, plan.names)
+        context.set_trailing_metadata(trailing_page_token(last, count, limit))
+
+    async def GetManyTransactionBatches(self, request, context):
+        plan = await self._get_request_field_plan(list(request.fields) or transactions_details, context)
+        filters = await self._get_request_access_constraint(request)
+        filters["_id"] = {"$in": list(request.transactionIds)}
+        cursor = self._dao.get_many_by(filters, projection=plan.projection)
+        async for transactions in _batches(cursor, request.batchSize):
+            yield transaction_batch(transactions, plan.names)
+
+    async def GetTransactionsMetrics(self, request, context):
+        filters = await self._get_request_access_constraint(request)
+
+        end_date = request.endDate.ToDatetime()
+        start_date = request.startDate.ToDatetime()
+        if rollups_enabled:
+            metrics = await self._rollup.metrics(filters, start_date, end_date)
+        else:
+            filters["created_at"] = {"$gte": start_date, "$lte": end_date}
+            cursor = self._collection.aggregate(metrics_pipeline(filters, transactions_counters))
+            metrics = read_metrics(await cursor.to_list(None), transactions_counters)
+        return TransactionsMetricsResponse(**metrics)
+
+    async def GetMatchesReport(self, request, context):
+        writer, chunks = await self._get_matches_report(request, context)
+        data = b"".join([chunk async for chunk in chunks])
+        return MatchesReportResponse(data=data, contentType=writer.content_type)
+
+    async def StreamMatchesReport(self, request, context):
+        writer, chunks = await self._get_matches_report(request, context)
+        content_type = writer.content_type
+        async for chunk in chunks:
+            yield MatchesReportResponse(data=chunk, contentType=content_type)
+            content_type = ""
+
+    async def SubmitMatchesReport(self, request, context):
+        constraint = await self._get_request_access_constraint(request)
+        try:
+            job = await run_sync(
+                self._report_jobs.submit,
+                constraint,
+                request.startDate.ToDatetime(),
+                request.endDate.ToDatetime(),
+                request.format,
+            )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except ReportQueueFull as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        return report_job_response(job)
+
+    async def GetReportJob(self, request, context):
+        return report_job_response(await self._get_report_job(request, context))
+
+    async def WatchReportJob(self, request, context):
+        job = await self._get_report_job(request, context)
+        version = None
+        while True:
+            if job.version != version:
+                version = job.version
+                yield report_job_response(job)
+                if job.finished:
+                    return
+            await asyncio.sleep(report_watch_interval)
+            job = await self._get_report_job(request, context)
+
+    async def FetchReportJob(self, request, context):
+        job = await self._get_report_job(request, context)
+        if job.state != DONE:
+            message = "Report job is %s %s" % (job.state, job.error)
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, message.strip())
+        try:
+            f = await run_sync(open, job.path, "rb")
+        except OSError:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Report expired")
+        content_type = job.content_type
+        with f:
+            while True:
+                chunk = await run_sync(f.read, report_chunk_size)
+                if not chunk:
+                    return
+                yield MatchesReportResponse(data=chunk, contentType=content_type)
+                content_type = ""
+
+    async def InvalidateAccessConstraints(self, request, context):
+        count = access_constraint_cache.invalidate(list(request.userIds))
+        return InvalidateAccessConstraintsResponse(count=count)
+
+    async def _get_matches_report(self, request, context):
+        try:
+            writer = report_writer(request.format)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        filters = report_filters(
+            await self._get_request_access_constraint(request),
+            request.startDate.ToDatetime(),
+            request.endDate.ToDatetime(),
+        )
+        return writer, self._iter_matches_report(filters, writer)
+
+    async def _iter_matches_report(self, filters, writer):
+        chunks, ids = ChunkBuffer(), []
+        async for transaction in report_ids(self._collection, filters):
+            ids.append(transaction["_id"])
+            if len(ids) == report_batch_size:
+                for chunk in chunks.push(await run_sync(_write_report_batch, writer, filters, ids)):
+                    yield chunk
+                ids = []
+        if ids:
+            for chunk in chunks.push(await run_sync(_write_report_batch, writer, filters, ids)):
+                yield chunk
+        for chunk in chunks.push(await run_sync(writer.close)) + chunks.flush():
+            yield chunk
+
+    async def _get_report_job(self, request, context):
+        constraint = await self._get_request_access_constraint(request)
+        job = await run_sync(self._report_jobs.get, request.jobId, constraint)
+        if job is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Unknown report job")
+        return job
+
+    @staticmethod
+    async def _get_request_field_plan(fields, context):
+        try:
+            return field_plan(fields, transaction_fields)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    async def _get_request_access_constraint(self, request):
+        user_id = request.userId
+        if user_id == "root":
+            return {}
+        associates = await access_constraint_cache.get_async(
+            user_id, self._identity_client.get_branch_office_associate_list
+        )
+        return {"user_id": {"$in": associates}}
+
+
+async def _batches(cursor, batch_size=0):
+    """Async counterpart of transaction_messages.batches over a motor cursor."""
+    batch_size = batch_size or transactions_batch_size
+    batch = []
+    async for transaction in cursor:
+        batch.append(transaction)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_report_batch(writer, filters, ids):
+    return writer.write(report_batch(filters, ids))
+
+
+async def serve():
+    server = make_aio_server(limits=method_limits)
+    servicer = AsyncGRPCTransactions()
+    await servicer.ensure_indexes()
+    await servicer.check_transaction_json()
+    add_TransactionsServicer_to_server(servicer, server)
+    server.add_insecure_port("[::]:50054")
+    print("Starting asyncio transactions gRPC server listening at '[::]:50054'...")
+    await server.start()
+    await server.wait_for_termination()
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    asyncio.run(serve())
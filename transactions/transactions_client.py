@@ -1,4 +1,5 @@
 import sys
+import time
 import datetime
 import json
 import base64
@@ -11,16 +12,26 @@ import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from service.transactions.transactions_pb2_grpc import TransactionsStub
+from service.common.channels import get_channel, broadcast, broadcast_timeout
+from service.common.pagination import next_page_token
+from service.common.decoders import decode, MessageView
 from service.transactions.transactions_pb2 import (
     GetManyTransactionsRequest,
     GetAllTransactionsRequest,
     GetTransactionsMetricsRequest,
     GetMatchesReportRequest,
+    ReportJobRequest,
+    ReportJobState,
+    InvalidateAccessConstraintsRequest,
 )
 
 server_name = "transactions"
 port = "50054"
 
+# Seconds between two looks at a report job get_matches_report waits for.
+report_poll_interval = 1
+unfinished_report_states = ("PENDING", "RUNNING")
+
 
 def dt_to_pb(dt):
     pb = Timestamp()
@@ -28,25 +39,57 @@ def dt_to_pb(dt):
     return pb
 
 
+# How the *_transaction_messages methods hand back a transaction: a plain dict (_id as an
+# ObjectId, dates as datetimes), the TransactionMessage itself, or a lazy read-only view.
+decoders = {"dict": decode, "message": lambda pb: pb, "view": MessageView}
+
+
+def matches_report_request(user_id, start_date=None, end_date=None, format="xlsx"):
+    end_date = end_date or datetime.datetime.now()
+    start_date = start_date or end_date - datetime.timedelta(days=1)
+    return GetMatchesReportRequest(
+        userId=user_id, startDate=dt_to_pb(start_date), endDate=dt_to_pb(end_date), format=format
+    )
+
+
+def report_job_to_dict(resp):
+    return {
+        "job_id": resp.jobId,
+        "state": ReportJobState.Name(resp.state),
+        "processed": resp.processed,
+        "total": resp.total,
+        "error": resp.error,
+        "content_type": resp.contentType,
+        "size": resp.size,
+    }
+
+
 class GRPCTransactionsClient:
     stub = None
     channel = None
 
     def __init__(self):
-        self.channel = grpc.insecure_channel(server_name + ":" + port)
+        self.channel = get_channel(server_name + ":" + port)
         self.stub = TransactionsStub(self.channel)
 
-    def __del__(self):
-        self.channel.close()
-
-    def get_all_transactions(self, user_id, skip=0, limit=0, fields=None):
+    def get_all_transactions(self, user_id, skip=0, limit=0, fields=None, page_token=None):
         response_iterator = self.stub.GetAllTransactions(
-            GetAllTransactionsRequest(skip=skip, limit=limit, userId=user_id, fields=fields)
+            GetAllTransactionsRequest(
+                skip=skip, limit=limit, userId=user_id, fields=fields, pageToken=page_token
+            )
         )
         for resp in response_iterator:
             if len(resp.ListFields()):
                 data = json.loads(resp.jsonString)
                 yield data
+        return next_page_token(response_iterator.trailing_metadata())
+
+    def iter_all_transactions(self, user_id, page_size=50, fields=None, page_token=None):
+        """Every transaction, fetched page_size at a time by page token."""
+        while True:
+            page_token = yield from self.get_all_transactions(user_id, 0, page_size, fields, page_token)
+            if not page_token:
+                return
 
     def get_many_transactions(self, user_id, transaction_uuids, fields=None):
         response_iterator = self.stub.GetManyTransactions(
@@ -57,6 +100,35 @@ class GRPCTransactionsClient:
                 data = json.loads(resp.jsonString)
                 yield data
 
+    def get_all_transaction_messages(
+        self, user_id, skip=0, limit=0, fields=None, page_token=None, batch_size=0, output="dict"
+    ):
+        """get_all_transactions over typed messages sent batch_size at a time instead of one JSON
+        string per transaction. Returns the next page token too."""
+        decoder = decoders[output]
+        response_iterator = self.stub.GetAllTransactionBatches(
+            GetAllTransactionsRequest(
+                skip=skip, limit=limit, userId=user_id, fields=fields, pageToken=page_token, batchSize=batch_size
+            )
+        )
+        for resp in response_iterator:
+            for transaction in resp.transactions:
+                yield decoder(transaction)
+        return next_page_token(response_iterator.trailing_metadata())
+
+    def get_many_transaction_messages(
+        self, user_id, transaction_uuids, fields=None, batch_size=0, output="dict"
+    ):
+        decoder = decoders[output]
+        response_iterator = self.stub.GetManyTransactionBatches(
+            GetManyTransactionsRequest(
+                userId=user_id, transactionIds=transaction_uuids, fields=fields, batchSize=batch_size
+            )
+        )
+        for resp in response_iterator:
+            for transaction in resp.transactions:
+                yield decoder(transaction)
+
     def get_transactions_metrics(self, user_id, start_date=None, end_date=None):
         end_date = end_date or datetime.datetime.now()
         start_date = start_date or end_date - datetime.timedelta(days=1)
@@ -74,13 +146,50 @@ class GRPCTransactionsClient:
             "end_date": end_date.isoformat(),
         }
 
-    def get_matches_report(self, user_id, start_date=None, end_date=None):
-        end_date = end_date or datetime.datetime.now()
-        start_date = start_date or end_date - datetime.timedelta(days=1)
+    def get_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        """Blocking wrapper over the report jobs: submits the report, polls it until it is built
+        and downloads it. Raises grpc.RpcError when the job failed."""
+        job = self.submit_matches_report(user_id, start_date, end_date, format)
+        while job["state"] in unfinished_report_states:
+            time.sleep(report_poll_interval)
+            job = self.get_report_job(job["job_id"], user_id)
+        return b"".join(self.fetch_report_job(job["job_id"], user_id))
+
+    def stream_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        """Yields the report file in chunks as the server builds it."""
+        response_iterator = self.stub.StreamMatchesReport(
+            matches_report_request(user_id, start_date, end_date, format)
+        )
+        for resp in response_iterator:
+            yield resp.data
 
-        resp = self.stub.GetMatchesReport(
-            GetMatchesReportRequest(
-                userId=user_id, startDate=dt_to_pb(start_date), endDate=dt_to_pb(end_date)
-            )
+    def submit_matches_report(self, user_id, start_date=None, end_date=None, format="xlsx"):
+        """Starts building the report in the background; returns its job."""
+        resp = self.stub.SubmitMatchesReport(matches_report_request(user_id, start_date, end_date, format))
+        return report_job_to_dict(resp)
+
+    def get_report_job(self, job_id, user_id):
+        resp = self.stub.GetReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        return report_job_to_dict(resp)
+
+    def watch_report_job(self, job_id, user_id):
+        """Yields the job each time it progresses, until it is DONE or FAILED."""
+        response_iterator = self.stub.WatchReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        for resp in response_iterator:
+            yield report_job_to_dict(resp)
+
+    def fetch_report_job(self, job_id, user_id):
+        """Yields the report file of a DONE job in chunks."""
+        response_iterator = self.stub.FetchReportJob(ReportJobRequest(jobId=job_id, userId=user_id))
+        for resp in response_iterator:
+            yield resp.data
+
+    def invalidate_access_constraints(self, user_ids=None):
+        """Sent to every replica, each caching on its own. Returns the entries dropped over all of
+        them; raises grpc.RpcError when some replica could not be reached."""
+        request = InvalidateAccessConstraintsRequest(userIds=user_ids)
+        counts = broadcast(
+            server_name + ":" + port,
+            lambda channel: TransactionsStub(channel).InvalidateAccessConstraints(request, timeout=broadcast_timeout).count,
         )
-        return resp.data
+        return sum(counts)
@@ -0,0 +1,22 @@
+"""Builds and maintains the per user hour/day rollups read by GetTransactionsMetrics when
+METRICS_ROLLUPS=1.
+
+    python transactions_metrics_rollup.py backfill [start [end]]
+    python transactions_metrics_rollup.py watch
+"""
+import sys
+import logging
+
+sys.path.insert(0, "/transactions/src/service/transactions")
+
+from database.mongo import make_db
+from utils.configmanager import ConfigManager
+
+from transactions_server import transactions_counters
+from service.common.rollups import MetricsRollup, run_job
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    db = make_db(ConfigManager.get_config_value("database", "mongo"))
+    run_job(MetricsRollup(db["transaction"], db["transaction_metrics_rollup"], transactions_counters))
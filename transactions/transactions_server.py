@@ -1,124 +1,275 @@
-import os
 import sys
+import time
 import grpc
-import json
 import logging
-import uuid
 import base64
 from concurrent import futures
 
 from bson import json_util
+from logging import warning
 
 sys.path.insert(0, "/transactions/src/service/transactions")
 
-from transactions_pb2 import JSONResponse, TransactionsMetricsResponse, MatchesReportResponse
+from transactions_pb2 import (
+    JSONResponse,
+    TransactionsMetricsResponse,
+    MatchesReportResponse,
+    ReportJobResponse,
+    ReportJobState,
+    InvalidateAccessConstraintsResponse,
+)
 from transactions_pb2_grpc import TransactionsServicer, add_TransactionsServicer_to_server
 from google.protobuf.timestamp_pb2 import Timestamp
 
 
-from models.interface.mongodao import MongoDAO
 from models.transaction_model import Transaction, TransactionSchema
 from database.mongo import make_db
 from utils.configmanager import ConfigManager
-from tasks.transactions_handler import make_matches_report, write_df_to_xlsx
+from transaction_json import (
+    transactions_summary,
+    transactions_details,
+    parity_sample_size,
+    field_plan,
+    schema_fields,
+    transaction_json,
+    schema_mismatches,
+    SchemaJSON,
+)
+from transaction_messages import transaction_batch, batches
+from matches_report import report_filters, report_batches, report_writer, report_chunk_size, iter_report
+from report_jobs import ReportJobs, ReportQueueFull, DONE, report_watch_interval
 
 from service.user_identity.user_identity_client import GRPCUserIdentityClient
+from service.common.server import make_server, server_mode
+from service.common.access_constraints import access_constraint_cache
+from service.common.metrics import user_created_at_index, matched, any_in, metrics_pipeline, read_metrics
+from service.common.rollups import MetricsRollup, rollups_enabled
+from service.common.pagination import sort_keys, sort_index, after_page_token, trailing_page_token
 
 identity_grpc_client = GRPCUserIdentityClient()
 
-transactions_summary = ["commerce_name", "invoice_number", "date", "total_sale", "expiration_date", "matches"]
+# What GetAllTransactions and friends accept in fields; transactions_details is only the default.
+transaction_fields = schema_fields(TransactionSchema)
 
-transactions_details = transactions_summary + [
-    "client_number",
-    "branch",
-    "invoice_amount",
-    "promotional_discount",
-    "physical_change",
-    "invoice_value",
-    "agreed_discount",
-    "invoice_clean_amount",
-    "ieps_tax",
-    "iva_tax",
-    "invoice_total",
-    "matches",
-]
+# matched_all_fields: some match rated A or B on each of these fields.
+transactions_counters = {
+    "total": True,
+    "matched": matched,
+    "matched_all_fields": {
+        "$and": [
+            any_in("$matches.line_qualities." + field, ["A", "B"])
+            for field in ("branch", "date", "invoice_total", "client_number")
+        ]
+    },
+}
+
+
+# Concurrent calls allowed per method, on top of GRPC_METHOD_LIMITS. Each watcher holds a worker
+# thread while it polls its job, so they are capped as well.
+method_limits = {"GetMatchesReport": 2, "StreamMatchesReport": 2, "WatchReportJob": 8}
+
+
+def report_job_response(job):
+    return ReportJobResponse(
+        jobId=job.id,
+        state=ReportJobState.Value(job.state),
+        processed=job.processed,
+        total=job.total,
+        error=job.error,
+        contentType=job.content_type,
+        size=job.size,
+    )
 
 
 class GRPCTransactions(TransactionsServicer):
-    _dao = None
+    _collection = None
+    _rollup = None
+    _report_jobs = None
+    _transaction_json = None
 
     def __init__(self):
-        self._dao = MongoDAO(make_db(ConfigManager.get_config_value("database", "mongo"))["transaction"])
+        self._transaction_json = transaction_json
+        self._collection = make_db(ConfigManager.get_config_value("database", "mongo"))["transaction"]
+        self._rollup = MetricsRollup(
+            self._collection, self._collection.database["transaction_metrics_rollup"], transactions_counters
+        )
+        self._report_jobs = ReportJobs(self._collection, self._collection.database["report_jobs"])
+
+    def ensure_indexes(self):
+        self._collection.create_index(user_created_at_index)
+        self._collection.create_index(sort_index)
+        self._rollup.ensure_indexes()
+        self._report_jobs.ensure_indexes()
+
+    def check_transaction_json(self):
+        """Dumps through TransactionSchema when transaction_json doesn't give the same JSON for a
+        sample of the stored transactions."""
+        sample = list(self._collection.find({}, limit=parity_sample_size))
+        mismatches = schema_mismatches(sample, sorted(transaction_fields), TransactionSchema)
+        if mismatches:
+            warning("transaction_json differs from TransactionSchema on %s" % ", ".join(mismatches))
+            self._transaction_json = SchemaJSON(TransactionSchema)
+
+    def _json_projection(self, plan):
+        # The schema may compute fields out of others, so it gets whole documents.
+        if isinstance(self._transaction_json, SchemaJSON):
+            return None
+        return plan.projection
 
     def GetAllTransactions(self, request, context):
         filters = self._get_request_access_constraint(request)
         skip = request.skip or 0
         limit = request.limit or 50
-        fields = list(request.fields) or transactions_summary
-        transactions = self._dao.get_many_by(filters, skip=skip, limit=limit)
-        transactions = TransactionSchema(many=True, only=fields).dump(transactions)
-        for transaction in transactions:
-            yield JSONResponse(jsonString=json.dumps(transaction))
+        plan = self._get_request_field_plan(list(request.fields) or transactions_summary, context)
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cursor = self._collection.find(filters, self._json_projection(plan), skip=skip, limit=limit).sort(sort_keys)
+        last, count = None, 0
+        for transaction in cursor:
+            last, count = transaction, count + 1
+            yield JSONResponse(jsonString=self._transaction_json(transaction, plan))
+        context.set_trailing_metadata(trailing_page_token(last, count, limit))
 
     def GetManyTransactions(self, request, context):
-        fields = list(request.fields) or transactions_details
+        plan = self._get_request_field_plan(list(request.fields) or transactions_details, context)
         filters = self._get_request_access_constraint(request)
         filters["_id"] = {"$in": list(request.transactionIds)}
-        transactions = self._dao.get_many_by(filters)
-        transactions = TransactionSchema(many=True, only=fields).dump(transactions)
-        for transaction in transactions:
-            yield JSONResponse(jsonString=json.dumps(transaction))
+        for transaction in self._collection.find(filters, self._json_projection(plan)):
+            yield JSONResponse(jsonString=self._transaction_json(transaction, plan))
+
+    def GetAllTransactionBatches(self, request, context):
+        filters = self._get_request_access_constraint(request)
+        limit = request.limit or 50
+        plan = self._get_request_field_plan(list(request.fields) or transactions_summary, context)
+        try:
+            filters = after_page_token(filters, request.pageToken)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cursor = self._collection.find(filters, plan.projection, skip=request.skip or 0, limit=limit).sort(sort_keys)
+        last, count = None, 0
+        for transactions in batches(cursor, request.batchSize):
+            last, count = transactions[-1], count + len(transactions)
+            yield transaction_batch(transactions, plan.names)
+        context.set_trailing_metadata(trailing_page_token(last, count, limit))
+
+    def GetManyTransactionBatches(self, request, context):
+        plan = self._get_request_field_plan(list(request.fields) or transactions_details, context)
+        filters = self._get_request_access_constraint(request)
+        filters["_id"] = {"$in": list(request.transactionIds)}
+        cursor = self._collection.find(filters, plan.projection)
+        for transactions in batches(cursor, request.batchSize):
+            yield transaction_batch(transactions, plan.names)
 
     def GetTransactionsMetrics(self, request, context):
         filters = self._get_request_access_constraint(request)
 
         end_date = request.endDate.ToDatetime()
         start_date = request.startDate.ToDatetime()
+        if rollups_enabled:
+            return TransactionsMetricsResponse(**self._rollup.metrics(filters, start_date, end_date))
         filters["created_at"] = {"$gte": start_date, "$lte": end_date}
-        total = self._dao.count(filters)
+        results = self._collection.aggregate(metrics_pipeline(filters, transactions_counters))
+        return TransactionsMetricsResponse(**read_metrics(results, transactions_counters))
 
-        filters["matches"] = {"$not": {"$size": 0}}
-        matched = self._dao.count(filters)
+    def GetMatchesReport(self, request, context):
+        writer, chunks = self._get_matches_report(request, context)
+        return MatchesReportResponse(data=b"".join(chunks), contentType=writer.content_type)
 
-        filters = self._get_request_access_constraint(request)
-        filters["created_at"] = {"$gte": start_date, "$lte": end_date}
-        filters["matches.line_qualities.branch"] = {"$in": ["A", "B"]}
-        filters["matches.line_qualities.date"] = {"$in": ["A", "B"]}
-        filters["matches.line_qualities.invoice_total"] = {"$in": ["A", "B"]}
-        filters["matches.line_qualities.client_number"] = {"$in": ["A", "B"]}
-        matched_all_fields = self._dao.count(filters)
-        return TransactionsMetricsResponse(
-            total=total, matched=matched, matched_all_fields=matched_all_fields
+    def StreamMatchesReport(self, request, context):
+        writer, chunks = self._get_matches_report(request, context)
+        content_type = writer.content_type
+        for chunk in chunks:
+            yield MatchesReportResponse(data=chunk, contentType=content_type)
+            content_type = ""
+
+    def SubmitMatchesReport(self, request, context):
+        constraint = self._get_request_access_constraint(request)
+        try:
+            job = self._report_jobs.submit(
+                constraint, request.startDate.ToDatetime(), request.endDate.ToDatetime(), request.format
+            )
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except ReportQueueFull as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        return report_job_response(job)
+
+    def GetReportJob(self, request, context):
+        return report_job_response(self._get_report_job(request, context))
+
+    def WatchReportJob(self, request, context):
+        job = self._get_report_job(request, context)
+        version = None
+        while context.is_active():
+            if job.version != version:
+                version = job.version
+                yield report_job_response(job)
+                if job.finished:
+                    return
+            time.sleep(report_watch_interval)
+            job = self._get_report_job(request, context)
+
+    def FetchReportJob(self, request, context):
+        job = self._get_report_job(request, context)
+        if job.state != DONE:
+            message = "Report job is %s %s" % (job.state, job.error)
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, message.strip())
+        try:
+            f = open(job.path, "rb")
+        except OSError:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Report expired")
+        content_type = job.content_type
+        with f:
+            for chunk in iter(lambda: f.read(report_chunk_size), b""):
+                yield MatchesReportResponse(data=chunk, contentType=content_type)
+                content_type = ""
+
+    def InvalidateAccessConstraints(self, request, context):
+        count = access_constraint_cache.invalidate(list(request.userIds))
+        return InvalidateAccessConstraintsResponse(count=count)
+
+    def _get_matches_report(self, request, context):
+        """The report writer and the chunks of the encoded report, built as they are read."""
+        try:
+            writer = report_writer(request.format)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        filters = report_filters(
+            self._get_request_access_constraint(request), request.startDate.ToDatetime(), request.endDate.ToDatetime()
         )
+        return writer, iter_report(report_batches(self._collection, filters), writer)
 
-    def GetMatchesReport(self, request, context):
-        end_date = request.endDate.ToDatetime()
-        start_date = request.startDate.ToDatetime()
-        filters = self._get_request_access_constraint(request)
-        filters["matches"] = {"$not": {"$size": 0}}
-        filters["created_at"] = {"$gte": start_date, "$lte": end_date}
-        print("writing report...")
-        report = make_matches_report(filters)
-        print("report written")
-        path = "/tmp/" + str(uuid.uuid4()) + ".xlsx"
-        write_df_to_xlsx(report, path)
-        with open(path, "rb") as f:
-            data = f.read()
-        os.remove(path)
-        return MatchesReportResponse(data=data)
+    def _get_report_job(self, request, context):
+        job = self._report_jobs.get(request.jobId, self._get_request_access_constraint(request))
+        if job is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Unknown report job")
+        return job
+
+    @staticmethod
+    def _get_request_field_plan(fields, context):
+        try:
+            return field_plan(fields, transaction_fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
 
     @staticmethod
     def _get_request_access_constraint(request):
         user_id = request.userId
         if user_id == "root":
             return {}
-        constraint = {'user_id': {'$in': identity_grpc_client.get_branch_office_associate_list(user_id)}}
+        associates = access_constraint_cache.get(user_id, identity_grpc_client.get_branch_office_associate_list)
+        constraint = {'user_id': {'$in': associates}}
         return constraint
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), maximum_concurrent_rpcs=160)
-    add_TransactionsServicer_to_server(GRPCTransactions(), server)
+    server = make_server(limits=method_limits)
+    servicer = GRPCTransactions()
+    servicer.ensure_indexes()
+    servicer.check_transaction_json()
+    add_TransactionsServicer_to_server(servicer, server)
     server.add_insecure_port("[::]:50054")
     print("Starting transactions gRPC server listening at '[::]:50054'...")
     server.start()
@@ -127,4 +278,10 @@ def serve():
 
 if __name__ == "__main__":
     logging.basicConfig()
-    serve()
+    if server_mode == "aio":
+        import asyncio
+        from transactions_aio_server import serve as aio_serve
+
+        asyncio.run(aio_serve())
+    else:
+        serve()
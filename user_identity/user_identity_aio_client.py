@@ -0,0 +1,179 @@
+# pylint: disable=import-error
+import sys
+
+sys.path.insert(0, "/user_identity/src/service/user_identity")
+sys.path.insert(0, "/transactions/src/service/user_identity")
+sys.path.insert(0, "/ocr/src/service/user_identity")
+sys.path.insert(0, "/api-gateway/src/service/user_identity")
+
+import grpc
+
+from service.user_identity.user_identity_pb2_grpc import UserIdentityServiceStub
+from service.common.channels import get_aio_channel
+from service.user_identity.user_identity_pb2 import (
+    CreateUserIdentityRequest,
+    GetUserIdentityByUUIDRequest,
+    UpdateUserIdentityRequest,
+    DeleteUserIdentityRequest,
+    CreateBranchOfficeIdentityRequest,
+    GetBranchOfficeIdentityByUUIDRequest,
+    UpdateBranchOfficeIdentityRequest,
+    DeleteBranchOfficeIdentityRequest,
+    CreateOrganizationIdentityRequest,
+    GetOrganizationsRequest,
+    GetOrganizationIdentityByUUIDRequest,
+    UpdateOrganizationIdentityRequest,
+    DeleteOrganizationIdentityRequest,
+    GetBranchOfficesByEmailRequest,
+    GetBranchOfficeAssociateListRequest,
+    GetKratosUserIdentityRequest
+)
+from service.user_identity.user_identity_client import server_name, port, pb_to_dict, serialized
+
+
+class AsyncGRPCUserIdentityClient:
+    """grpc.aio counterpart of GRPCUserIdentityClient with the same methods and return values.
+    Streaming methods are async generators."""
+
+    stub = None
+    channel = None
+
+    def __init__(self):
+        self.channel = get_aio_channel(server_name + ":" + port)
+        self.stub = UserIdentityServiceStub(self.channel)
+
+    async def close(self):
+        """Lets go of the channel. It is shared, so it stays open for the other clients:
+        close_aio_channels closes the pool at shutdown."""
+        self.channel = self.stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def create_user_identity(self, uuid, first_name, last_name, email, role, branch_office_uuid=None):
+        response = await self.stub.CreateUser(
+            CreateUserIdentityRequest(
+                uuid=uuid,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                role=role,
+                branch_office_uuid=branch_office_uuid
+            )
+        )
+        return response.uuid
+
+    async def get_user_identity_by_uuid(self, uuid):
+        response = await self.stub.GetUserByUUID(GetUserIdentityByUUIDRequest(uuid=uuid))
+        return pb_to_dict(response) if len(response.ListFields()) else None
+
+    async def update_user_identity(self, uuid, first_name, last_name, role, branch_office_uuid=None):
+        response = await self.stub.UpdateUser(
+            UpdateUserIdentityRequest(
+                uuid=uuid,
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                branch_office_uuid=branch_office_uuid
+            )
+        )
+        return response.uuid
+
+    async def delete_user_identity(self, uuid):
+        response = await self.stub.DeleteUser(DeleteUserIdentityRequest(uuid=uuid))
+        return response.uuid
+
+    async def create_branch_office_identity(self, name, street, number, city, state, zip_code, organization_uuid=None):
+        response = await self.stub.CreateBranchOffice(
+            CreateBranchOfficeIdentityRequest(
+                name=name,
+                street=street,
+                number=number,
+                city=city,
+                state=state,
+                zip_code=zip_code,
+                organization_uuid=organization_uuid
+            )
+        )
+        return response.uuid
+
+    async def get_branch_office_identity_list(self, organization_domain):
+        response_iterator = self.stub.GetBranchOfficesByEmail(
+            GetBranchOfficesByEmailRequest(organization_domain=organization_domain)
+        )
+        async for response in response_iterator:
+            if len(response.name):
+                yield pb_to_dict(response)
+
+    async def get_branch_office_identity_by_uuid(self, uuid):
+        response = await self.stub.GetBranchOfficeByUUID(GetBranchOfficeIdentityByUUIDRequest(uuid=uuid))
+        return pb_to_dict(response) if len(response.ListFields()) else None
+
+    async def update_branch_office_identity(self, uuid, name, street, number, city, state, zip_code):
+        response = await self.stub.UpdateBranchOffice(
+            UpdateBranchOfficeIdentityRequest(
+                uuid=uuid,
+                name=name,
+                street=street,
+                number=number,
+                city=city,
+                state=state,
+                zip_code=zip_code
+            )
+        )
+        return response.uuid
+
+    async def delete_branch_office_identity(self, uuid):
+        response = await self.stub.DeleteBranchOffice(DeleteBranchOfficeIdentityRequest(uuid=uuid))
+        return response.uuid
+
+    async def create_organization_identity(self, organization_domain, name):
+        response = await self.stub.CreateOrganization(
+            CreateOrganizationIdentityRequest(organization_domain=organization_domain, name=name)
+        )
+        return response.uuid
+
+    async def get_organizations(self):
+        async for response in self.stub.GetOrganizations(GetOrganizationsRequest()):
+            if len(response.name):
+                yield pb_to_dict(response)
+
+    async def get_organization_identity_by_uuid(self, uuid):
+        response = await self.stub.GetOrganizationByUUID(GetOrganizationIdentityByUUIDRequest(uuid=uuid))
+        return pb_to_dict(response) if len(response.ListFields()) else None
+
+    async def update_organization_identity(self, uuid, organization_domain, name):
+        response = await self.stub.UpdateOrganization(
+            UpdateOrganizationIdentityRequest(uuid=uuid, organization_domain=organization_domain, name=name)
+        )
+        return response.uuid
+
+    async def delete_organization_identity(self, uuid):
+        response = await self.stub.DeleteOrganization(DeleteOrganizationIdentityRequest(uuid=uuid))
+        return response.uuid
+
+    async def get_branch_office_associate_list(self, user_uuid):
+        if not user_uuid:
+            return None
+
+        # Mongo exclusive.
+        if user_uuid == "root":
+            return {}
+
+        response_iterator = self.stub.GetBranchOfficeAssociateList(
+            GetBranchOfficeAssociateListRequest(uuid=user_uuid)
+        )
+        branch_office_associate_list = []
+        async for response in response_iterator:
+            if len(response.email):
+                branch_office_associate_list.append(serialized(pb_to_dict(response))["email"])
+        return branch_office_associate_list
+
+    async def get_kratos_user_identity(self, ory_kratos_cookie, type="email"):
+        kratos_user_identity = await self.stub.GetKratosUserIdentity(
+            GetKratosUserIdentityRequest(ory_kratos_cookie=ory_kratos_cookie, type=type)
+        )
+        return kratos_user_identity.user_identity
@@ -0,0 +1,139 @@
+# pylint: disable=import-error
+# pylint: disable=no-name-in-module
+import sys
+import asyncio
+import logging
+
+sys.path.insert(0, "/user_identity/src/service/user_identity")
+
+from user_identity_pb2 import (
+    CreateUserIdentityResponse,
+    UpdateUserIdentityResponse,
+    DeleteUserIdentityResponse,
+    GetKratosUserIdentityResponse,
+)
+from user_identity_pb2_grpc import add_UserIdentityServiceServicer_to_server
+
+from models.users import Users
+from user_identity_server import (
+    GRPCUserIdentity,
+    make_pb,
+    save_user,
+    find_user_to_update,
+    update_user,
+    invalidate_access_constraints,
+    add_user_role,
+    delete_user_role,
+    get_kratos_user_identity,
+)
+from service.common.server import make_aio_server, run_sync, iterate_sync
+
+from logging import warning
+
+
+class AsyncGRPCUserIdentity(GRPCUserIdentity):
+    """grpc.aio implementation of GRPCUserIdentity. Kratos and Keto are called with aiohttp on the
+    server's event loop. The mongoengine models have no async driver, so model reads and writes
+    run on the default executor, and streams are pulled from it a few responses at a time."""
+
+    async def CreateUser(self, request, context):
+        try:
+            user_identity = await run_sync(save_user, request)
+            if not user_identity:
+                return make_pb({}, CreateUserIdentityResponse)
+            await add_user_role(user_identity.uuid, user_identity.role)
+        except Exception as e:
+            warning(e)
+            raise e
+        if request.branch_office_uuid:
+            invalidate_access_constraints()
+        return CreateUserIdentityResponse(uuid=user_identity.uuid)
+
+    async def GetUserByUUID(self, request, context):
+        return await run_sync(super().GetUserByUUID, request, context)
+
+    async def UpdateUser(self, request, context):
+        try:
+            user_identity = await run_sync(find_user_to_update, request)
+            if not user_identity:
+                return make_pb({}, UpdateUserIdentityResponse)
+            old_role = user_identity.role
+            old_branch_office_uuid = user_identity.branch_office_uuid
+            if old_role != request.role:
+                await delete_user_role(request.uuid, old_role)
+            await run_sync(update_user, user_identity, request)
+            if old_role != request.role:
+                await add_user_role(request.uuid, request.role)
+            if old_branch_office_uuid != request.branch_office_uuid:
+                invalidate_access_constraints()
+        except Exception as e:
+            warning(e)
+            raise e
+        return UpdateUserIdentityResponse(uuid=user_identity.uuid)
+
+    async def DeleteUser(self, request, context):
+        try:
+            user_identity = await run_sync(Users.get_identity_resource, {"uuid": request.uuid})
+            if not user_identity:
+                return DeleteUserIdentityResponse(uuid=user_identity)
+            await delete_user_role(request.uuid, user_identity.role)
+            await run_sync(user_identity.disable)
+            invalidate_access_constraints()
+        except Exception as e:
+            warning(e)
+            raise e
+        return DeleteUserIdentityResponse(uuid=user_identity.uuid)
+
+    async def CreateBranchOffice(self, request, context):
+        return await run_sync(super().CreateBranchOffice, request, context)
+
+    async def GetBranchOfficeByUUID(self, request, context):
+        return await run_sync(super().GetBranchOfficeByUUID, request, context)
+
+    async def UpdateBranchOffice(self, request, context):
+        return await run_sync(super().UpdateBranchOffice, request, context)
+
+    async def DeleteBranchOffice(self, request, context):
+        return await run_sync(super().DeleteBranchOffice, request, context)
+
+    async def CreateOrganization(self, request, context):
+        return await run_sync(super().CreateOrganization, request, context)
+
+    async def GetOrganizations(self, request, context):
+        async for response in iterate_sync(super().GetOrganizations(request, context)):
+            yield response
+
+    async def GetOrganizationByUUID(self, request, context):
+        return await run_sync(super().GetOrganizationByUUID, request, context)
+
+    async def UpdateOrganization(self, request, context):
+        return await run_sync(super().UpdateOrganization, request, context)
+
+    async def DeleteOrganization(self, request, context):
+        return await run_sync(super().DeleteOrganization, request, context)
+
+    async def GetBranchOfficesByEmail(self, request, context):
+        async for response in iterate_sync(super().GetBranchOfficesByEmail(request, context)):
+            yield response
+
+    async def GetBranchOfficeAssociateList(self, request, context):
+        async for response in iterate_sync(super().GetBranchOfficeAssociateList(request, context)):
+            yield response
+
+    async def GetKratosUserIdentity(self, request, context):
+        kratos_user_identity = await get_kratos_user_identity(request.ory_kratos_cookie, request.type)
+        return GetKratosUserIdentityResponse(user_identity=kratos_user_identity)
+
+
+async def serve():
+    server = make_aio_server()
+    add_UserIdentityServiceServicer_to_server(AsyncGRPCUserIdentity(), server)
+    server.add_insecure_port("[::]:50055")
+    print("Starting asyncio user_identity gRPC server listening at '[::]:50055'...")
+    await server.start()
+    await server.wait_for_termination()
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    asyncio.run(serve())
@@ -16,6 +16,7 @@ import grpc
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from service.user_identity.user_identity_pb2_grpc import UserIdentityServiceStub
+from service.common.channels import get_channel
 from service.user_identity.user_identity_pb2 import (
     CreateUserIdentityRequest,
     GetUserIdentityByUUIDRequest,
@@ -88,12 +89,9 @@ class GRPCUserIdentityClient:
     channel = None
 
     def __init__(self):
-        self.channel = grpc.insecure_channel(server_name + ":" + port)
+        self.channel = get_channel(server_name + ":" + port)
         self.stub = UserIdentityServiceStub(self.channel)
 
-    def __del__(self):
-        self.channel.close()
-
     def create_user_identity(self, uuid, first_name, last_name, email, role, branch_office_uuid=None):
         
         response = self.stub.CreateUser(
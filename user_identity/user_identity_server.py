@@ -7,8 +7,10 @@ import grpc
 import json
 import logging
 import base64
+import queue
 import asyncio
 import aiohttp
+import threading
 from concurrent import futures
 
 from bson import json_util
@@ -58,6 +60,7 @@ from models.schemas.identity_schema import (
 from marshmallow.exceptions import ValidationError
 
 from utils.configmanager import ConfigManager
+from service.common.server import make_server, server_mode
 
 from logging import warning
 
@@ -66,6 +69,17 @@ keto_url = os.environ["KETO_URL"]
 kratos_admin_url = os.environ["KRATOS_ADMIN_URL"]
 kratos_public_url = os.environ["KRATOS_PUBLIC_URL"]
 
+# Clients of the services caching branch office associate lists, told to drop them on membership
+# changes. Every replica of each is told. One that can't be reached keeps serving its entries until
+# they expire, ACCESS_CONSTRAINT_TTL + ACCESS_CONSTRAINT_STALE_TTL (330s by default) at most.
+# Built on first use: those services call this one, so it must not need them to start.
+_access_constraint_clients = None
+
+# Invalidations waiting for the thread sending them, so that handlers don't wait on every replica.
+_invalidations = queue.Queue()
+_invalidations_thread = None
+_invalidations_lock = threading.Lock()
+
 # Chepe's way... This is the way.
 nested_fields = {
     "users": UserMessage,
@@ -88,6 +102,130 @@ def dt_to_pb(dt_str):
     pb.FromDatetime(dt)
     return pb
 
+def access_constraint_clients():
+    global _access_constraint_clients
+    if _access_constraint_clients is None:
+        from service.ocr.dataset_client import GRPCDatasetClient
+        from service.transactions.transactions_client import GRPCTransactionsClient
+
+        _access_constraint_clients = [GRPCDatasetClient(), GRPCTransactionsClient()]
+    return _access_constraint_clients
+
+def invalidate_access_constraints():
+    """Queues an invalidation for the background thread and returns at once."""
+    global _invalidations_thread
+    with _invalidations_lock:
+        if _invalidations_thread is None:
+            _invalidations_thread = threading.Thread(
+                target=send_invalidations, name="access-constraint-invalidations", daemon=True
+            )
+            _invalidations_thread.start()
+    _invalidations.put(None)
+
+def send_invalidations():
+    """Sends the queued invalidations. Each one drops every cached list, so those queued while one
+    is sent are covered by the next. The calls time out after GRPC_BROADCAST_TIMEOUT seconds."""
+    while True:
+        _invalidations.get()
+        while True:
+            try:
+                _invalidations.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            clients = access_constraint_clients()
+        except Exception as e:
+            warning(e)
+            continue
+        for client in clients:
+            try:
+                client.invalidate_access_constraints()
+            except grpc.RpcError as e:
+                warning(e)
+
+def save_user(request):
+    """Creates the user of a CreateUser request, or makes a deleted one with the same uuid
+    visible again. None when the requested branch office doesn't exist."""
+    user_dict = dict()
+    user_dict["uuid"] = request.uuid
+    user_dict["first_name"] = request.first_name
+    user_dict["last_name"] = request.last_name
+    user_dict["email"] = request.email
+    user_dict["role"] = request.role or "associate"
+    
+    if request.branch_office_uuid:
+        user_dict["branch_office"] = dict()
+        user_dict["branch_office"]["uuid"] = request.branch_office_uuid
+
+        branch_office_identity = BranchOffice.get_identity_resource(
+            {
+                "uuid": request.branch_office_uuid,
+                "visible": True
+            }
+        )
+
+        if not branch_office_identity:
+            return None
+
+    user_identity = Users.get_identity_resource(
+        {
+            "uuid": request.uuid,
+            "visible": False
+        }
+    )
+    if user_identity:
+
+        user_identity.first_name = request.first_name
+        user_identity.last_name = request.last_name
+        user_identity.email = request.email
+        user_identity.role = request.role or "associate"
+        user_identity.branch_office_uuid = request.branch_office_uuid
+
+        user_identity.updated_at = datetime.datetime.now()
+        user_identity.visible = True
+
+        user_identity.save()
+    else:
+        
+        user_identity = UserSchema().load(user_dict)
+        user_identity.save()
+    return user_identity
+
+def find_user_to_update(request):
+    """The user of an UpdateUser request; None when it or the requested branch office doesn't
+    exist."""
+    user_identity = Users.get_identity_resource(
+        {
+            "uuid": request.uuid,
+            "visible": True
+        }
+    )
+
+    if not user_identity:
+        return None
+    
+    if request.branch_office_uuid:
+
+        branch_office_identity = BranchOffice.get_identity_resource(
+            {
+                "uuid": request.branch_office_uuid,
+                "visible": True
+            }
+        )
+
+        if not branch_office_identity:
+            return None
+    return user_identity
+
+def update_user(user_identity, request):
+    user_identity.first_name =request.first_name
+    user_identity.last_name = request.last_name
+    user_identity.role = request.role or "associate"
+    user_identity.branch_office_uuid = request.branch_office_uuid
+    user_identity.updated_at = datetime.datetime.now()
+
+    user_identity.save()
+
 def make_pb(d, message_type):
 
     for key, value in d.items():
@@ -105,53 +243,13 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
     def CreateUser(self, request, context):
         
         try:
-            user_dict = dict()
-            user_dict["uuid"] = request.uuid
-            user_dict["first_name"] = request.first_name
-            user_dict["last_name"] = request.last_name
-            user_dict["email"] = request.email
-            user_dict["role"] = request.role or "associate"
-            
-            if request.branch_office_uuid:
-                user_dict["branch_office"] = dict()
-                user_dict["branch_office"]["uuid"] = request.branch_office_uuid
-
-                branch_office_identity = BranchOffice.get_identity_resource(
-                    {
-                        "uuid": request.branch_office_uuid,
-                        "visible": True
-                    }
-                )
-
-                if not branch_office_identity:
-                    return make_pb({}, CreateUserIdentityResponse)
-
-            user_identity = Users.get_identity_resource(
-                {
-                    "uuid": request.uuid,
-                    "visible": False
-                }
-            )
-            if user_identity:
-
-                user_identity.first_name = request.first_name
-                user_identity.last_name = request.last_name
-                user_identity.email = request.email
-                user_identity.role = request.role or "associate"
-                user_identity.branch_office_uuid = request.branch_office_uuid
-
-                user_identity.updated_at = datetime.datetime.now()
-                user_identity.visible = True
-
-                user_identity.save()
-            else:
-                
-                user_identity = UserSchema().load(user_dict)
-                user_identity.save()
-
+            user_identity = save_user(request)
         except Exception as e:
             warning(e)
             raise e
+
+        if not user_identity:
+            return make_pb({}, CreateUserIdentityResponse)
         
         try:
             loop = asyncio.new_event_loop()
@@ -159,6 +257,8 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
         except Exception as e:
             warning(e)
             raise e
+        if request.branch_office_uuid:
+            invalidate_access_constraints()
         return CreateUserIdentityResponse(uuid=user_identity.uuid)
 
     def GetUserByUUID(self, request, context):
@@ -177,46 +277,27 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
 
         try:
             
-            user_identity = Users.get_identity_resource(
-                {
-                    "uuid": request.uuid,
-                    "visible": True
-                }
-            )
+            user_identity = find_user_to_update(request)
 
             if not user_identity:
                 return make_pb({}, UpdateUserIdentityResponse)
-            
-            if request.branch_office_uuid:
-
-                branch_office_identity = BranchOffice.get_identity_resource(
-                    {
-                        "uuid": request.branch_office_uuid,
-                        "visible": True
-                    }
-                )
-
-                if not branch_office_identity:
-                    return make_pb({}, UpdateUserIdentityResponse)
 
             old_role = user_identity.role
+            old_branch_office_uuid = user_identity.branch_office_uuid
 
             if old_role != request.role:
 
                 loop = asyncio.new_event_loop()
                 loop.run_until_complete(delete_user_role(request.uuid, old_role))
             
-            user_identity.first_name =request.first_name
-            user_identity.last_name = request.last_name
-            user_identity.role = request.role or "associate"
-            user_identity.branch_office_uuid = request.branch_office_uuid
-            user_identity.updated_at = datetime.datetime.now()
-
-            user_identity.save()
+            update_user(user_identity, request)
             
             if old_role != request.role:
                 loop.run_until_complete(add_user_role(request.uuid, request.role))
 
+            if old_branch_office_uuid != request.branch_office_uuid:
+                invalidate_access_constraints()
+
         except Exception as e:
             warning(e)
             raise e
@@ -241,6 +322,7 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
             loop.run_until_complete(delete_user_role(filter_dict["uuid"], old_role))
 
             user_identity.disable()
+            invalidate_access_constraints()
         
         except Exception as e:
             warning(e)
@@ -337,6 +419,7 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
                 return DeleteBranchOfficeIdentityResponse(uuid=branch_office_identity)
             
             branch_office_identity.disable()
+            invalidate_access_constraints()
         
         except Exception as e:
             warning(e)
@@ -482,7 +565,7 @@ class GRPCUserIdentity(UserIdentityServiceServicer):
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), maximum_concurrent_rpcs=160)
+    server = make_server()
     add_UserIdentityServiceServicer_to_server(GRPCUserIdentity(), server)
     server.add_insecure_port("[::]:50055")
     print("Starting user_identity gRPC server listening at '[::]:50055'...")
@@ -544,4 +627,9 @@ async def get_kratos_user_identity(request_cookie, type):
 
 if __name__ == "__main__":
     logging.basicConfig()
-    serve()
+    if server_mode == "aio":
+        from user_identity_aio_server import serve as aio_serve
+
+        asyncio.run(aio_serve())
+    else:
+        serve()